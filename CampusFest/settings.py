@@ -60,6 +60,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    # One read of the shared data version per request (cache invalidation)
+    'app.middleware.DataVersionMiddleware',
 ]
 
 
@@ -104,16 +107,30 @@ if DATABASE_URL:
     DATABASES = {
         'default': dj_database_url.config(
             default=DATABASE_URL,
-            conn_max_age=600,
+            # Persistent per-thread connections leak under ASGI, where
+            # sync code runs in short-lived threads; use a pool instead.
+            conn_max_age=0,
             ssl_require=True
         )
     }
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = True
 else:
     # Local SQLite
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Concurrent writers queue on the lock instead of failing
+            # with "database is locked".
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # A file, not :memory:, so threads and worker processes in
+            # the tests share one database.
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 
@@ -148,6 +165,25 @@ USE_I18N = True
 USE_TZ = True
 
 
+# ===============================
+# CACHE
+# ===============================
+# Shared by all gunicorn workers on the host through one SQLite file in
+# WAL mode (no Redis needed). Holds the computed standings and read
+# model, so only one worker rebuilds them after a change.
+CACHES = {
+    'default': {
+        'BACKEND': 'app.cache_backends.SQLiteCache',
+        'LOCATION': os.environ.get('FEST_CACHE_PATH', str(BASE_DIR / 'cache.sqlite3')),
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+            'CULL_FREQUENCY': 4,
+        },
+    }
+}
+
+
 # ===============================
 # STATIC FILES (RENDER SAFE)
 # ===============================
@@ -177,3 +213,34 @@ LOGOUT_REDIRECT_URL = 'login'
 # DEFAULT PRIMARY KEY
 # ===============================
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# ===============================
+# FEST SCORING
+# ===============================
+# Points for each placed position, and the most a result at that
+# position may be given (0 off the podium). The clinch calculator uses
+# the first-place value as the most a team can still earn per event.
+FEST_POSITION_POINTS = {1: 5, 2: 3, 3: 1}
+
+
+# ===============================
+# FEST RULES
+# ===============================
+# Most events one student may enter, keyed by (stage_type, event_type);
+# '*' matches any. Enforced through utils.quotas counters.
+FEST_EVENT_LIMITS = {
+    ('ON_STAGE', 'SINGLE'): 3,
+    ('OFF_STAGE', 'SINGLE'): 3,
+}
+
+
+# ===============================
+# STATIC PUBLIC SITE
+# ===============================
+# Directory that `render_static` writes plain-HTML copies of the public
+# pages into (any static host or CDN can serve it). When set, every
+# change to public data refreshes the affected pages in a background
+# thread once it commits; running `render_static` from cron as well
+# catches anything a worker missed.
+FEST_STATIC_SITE_DIR = os.environ.get('FEST_STATIC_SITE_DIR', '')
@@ -0,0 +1,312 @@
+from collections import defaultdict
+from functools import wraps
+
+from django.db.models import Exists, F, OuterRef
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+
+from .models import Event, Participation, Result, Team
+from .utils.cache import data_changed_at, data_version
+from .utils.clinch import championship_race
+from .utils.pagination import keyset_page, page_size
+from .utils.standings import individual_standings, standings
+
+
+# Seconds a client or proxy may reuse a response without asking; after
+# that a conditional request costs one cache lookup and an empty 304.
+API_MAX_AGE = 5
+
+
+# =====================================================
+# HELPERS
+# =====================================================
+def _choice(value, allowed):
+    return value if value in allowed else None
+
+
+def _etag(request, *args, **kwargs):
+    # Every public payload is derived from fest data, so one version
+    # number validates them all.
+    return f'"fest-{data_version()}"'
+
+
+def _last_modified(request, *args, **kwargs):
+    return data_changed_at()
+
+
+def api_view(view):
+    """
+    Read-only (GET and HEAD), conditional endpoint: answers ``If-None-Match`` /
+    ``If-Modified-Since`` with 304 before the view runs and lets
+    clients and proxies cache for ``API_MAX_AGE`` seconds.
+    """
+    conditional = condition(etag_func=_etag, last_modified_func=_last_modified)(view)
+
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(response, public=True, max_age=API_MAX_AGE)
+        return response
+    return wrapper
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'separators': (',', ':')})
+
+
+def _not_found():
+    return _json({'detail': 'Not found.'}, status=404)
+
+
+def _select(request, fields):
+    """Fields asked for with ``?fields=id,name`` (unknown names ignored); all by default."""
+    wanted = {f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()}
+    chosen = [name for name in fields if name in wanted]
+    return chosen or list(fields)
+
+
+def _values(queryset, names, fields):
+    """
+    ``.values()`` projection of ``names``; ``fields`` maps each API name
+    to a model field path or an expression.
+    """
+    plain = []
+    renamed = {}
+    for name in names:
+        source = fields[name]
+        if source == name:
+            plain.append(name)
+        else:
+            renamed[name] = F(source) if isinstance(source, str) else source
+    return queryset.values(*plain, **renamed)
+
+
+def _page(request, queryset, fields, ordering, extra=(), fill=None):
+    """
+    One cursor page of a projection; ``?cursor=`` comes from the
+    previous page's ``next``. ``extra`` names are not columns:
+    ``fill(rows, names)`` adds them before unrequested sort keys are
+    dropped from the rows.
+    """
+    names = _select(request, list(fields) + list(extra))
+    columns = [n for n in names if n in fields]
+    keys = [f.lstrip('-') for f in ordering]
+
+    page = keyset_page(
+        _values(queryset, list(dict.fromkeys(columns + keys)), fields),
+        ordering,
+        cursor=request.GET.get('cursor'),
+        size=page_size(request, default=50, maximum=500),
+    )
+    rows = list(page)
+    if fill is not None:
+        fill(rows, [n for n in names if n in extra])
+    hidden = [k for k in keys if k not in names]
+    for row in rows:
+        for key in hidden:
+            del row[key]
+    return rows, page.next_cursor
+
+
+# =====================================================
+# PUBLIC JSON API (v1)
+# =====================================================
+EVENT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'stage_type': 'stage_type',
+    'event_type': 'event_type',
+    'venue': 'venue',
+    'start_time': 'start_time',
+    'end_time': 'end_time',
+    'min_team_size': 'min_team_size',
+    'max_team_size': 'max_team_size',
+    'published': Exists(Result.objects.published().filter(event=OuterRef('pk'))),
+}
+
+RESULT_FIELDS = {
+    'id': 'id',
+    'event_id': 'event_id',
+    'event_name': 'event__name',
+    'team_id': 'team_id',
+    'team_name': 'team__team_name',
+    'position': 'position',
+    'points': 'points',
+    'published_at': 'published_at',
+}
+
+TEAM_FIELDS = {
+    'id': 'id',
+    'name': 'team_name',
+    'department': 'department',
+}
+
+TEAM_TALLY = ('rank', 'points', 'gold', 'silver', 'bronze')
+
+
+@api_view
+def standings_api(request):
+    """
+    Ranked standings for one slice of the cube:
+    ``?level=team|department&stage=ON_STAGE&type=GROUP``.
+    """
+    cube = standings()
+    level = 'department' if request.GET.get('level') == 'department' else 'team'
+    stage = _choice(request.GET.get('stage'), cube.stage_types)
+    event_type = _choice(request.GET.get('type'), cube.event_types)
+
+    return _json({
+        'version': data_version(),
+        'level': level,
+        'stage_type': stage,
+        'event_type': event_type,
+        'stage_types': [v for v, _ in Event.STAGE_TYPE_CHOICES if v in cube.stage_types],
+        'event_types': sorted(cube.event_types),
+        'results': cube.table(level, stage, event_type),
+    })
+
+
+@api_view
+def individual_api(request):
+    """Individual championship leaderboard, best first: ``?size=100``."""
+    rows = individual_standings()
+    size = page_size(request, default=100, maximum=1000)
+
+    return _json({
+        'version': data_version(),
+        'count': len(rows),
+        'results': rows[:size],
+    })
+
+
+@api_view
+def race_api(request):
+    """Maximum reachable points and clinch/elimination status per team."""
+    race = championship_race()
+
+    return _json({
+        'version': data_version(),
+        'remaining_events': race.remaining_events,
+        'champion': race.champion['id'] if race.champion else None,
+        'contenders': race.contenders,
+        'results': race.rows,
+    })
+
+
+@api_view
+def events_api(request):
+    """Events in programme order: ``?stage=ON_STAGE&type=SINGLE&fields=id,name``."""
+    events = Event.objects.all()
+    stage = _choice(request.GET.get('stage'), dict(Event.STAGE_TYPE_CHOICES))
+    event_type = _choice(request.GET.get('type'), dict(Event.EVENT_TYPE_CHOICES))
+    if stage:
+        events = events.filter(stage_type=stage)
+    if event_type:
+        events = events.filter(event_type=event_type)
+
+    rows, next_cursor = _page(request, events, EVENT_FIELDS, ['stage_type', 'name', 'id'])
+    return _json({'version': data_version(), 'next': next_cursor, 'results': rows})
+
+
+@api_view
+def event_api(request, event_id):
+    """One event with its published podium and each placed team's entrants."""
+    names = _select(request, list(EVENT_FIELDS) + ['results'])
+    event = _values(
+        Event.objects.filter(pk=event_id),
+        [n for n in names if n in EVENT_FIELDS] or ['id'],
+        EVENT_FIELDS,
+    ).first()
+    if event is None:
+        return _not_found()
+
+    if 'results' in names:
+        results = list(
+            Result.objects.published()
+            .filter(event_id=event_id)
+            .order_by('position', 'team__team_name')
+            .values('position', 'points', 'team_id', team_name=F('team__team_name'))
+        )
+        entrants = defaultdict(list)
+        for team_id, name in (
+            Participation.objects
+            .filter(event_id=event_id, team_id__in=[r['team_id'] for r in results])
+            .order_by('participant_name')
+            .values_list('team_id', 'participant_name')
+        ):
+            entrants[team_id].append(name)
+        for row in results:
+            row['participants'] = entrants[row['team_id']]
+        event['results'] = results
+
+    return _json({'version': data_version(), **event})
+
+
+@api_view
+def results_api(request):
+    """Published results, oldest first: ``?event=<id>&team=<id>``."""
+    results = Result.objects.published()
+    for param, field in (('event', 'event_id'), ('team', 'team_id')):
+        value = request.GET.get(param)
+        if value and value.isdigit():
+            results = results.filter(**{field: int(value)})
+
+    rows, next_cursor = _page(request, results, RESULT_FIELDS, ['id'])
+    return _json({'version': data_version(), 'next': next_cursor, 'results': rows})
+
+
+@api_view
+def teams_api(request):
+    """Teams by name with overall rank, points and medals from the standings cube."""
+    def fill(rows, tally):
+        if not tally:
+            return
+        ranked = {row['id']: row for row in standings().table()}
+        for row in rows:
+            for name in tally:
+                row[name] = ranked.get(row['id'], {}).get(name)
+
+    rows, next_cursor = _page(
+        request, Team.objects.all(), TEAM_FIELDS, ['name', 'id'], extra=TEAM_TALLY, fill=fill
+    )
+    return _json({'version': data_version(), 'next': next_cursor, 'results': rows})
+
+
+@api_view
+def team_api(request, team_id):
+    """One team: overall tally and rank plus every published placing with its entrants."""
+    team = Team.objects.filter(pk=team_id).values('id', 'department', name=F('team_name')).first()
+    if team is None:
+        return _not_found()
+
+    cube = standings()
+    team.update(cube.tally(team=team_id), rank=cube.rank_of(team_id))
+
+    events = list(
+        Result.objects.published()
+        .filter(team_id=team_id)
+        .order_by('event__stage_type', 'event__name')
+        .values(
+            'event_id',
+            'position',
+            'points',
+            event_name=F('event__name'),
+            stage_type=F('event__stage_type'),
+            event_type=F('event__event_type'),
+        )
+    )
+    entrants = defaultdict(list)
+    for event_id, name in (
+        Participation.objects
+        .filter(team_id=team_id, event_id__in=[e['event_id'] for e in events])
+        .order_by('participant_name')
+        .values_list('event_id', 'participant_name')
+    ):
+        entrants[event_id].append(name)
+    for row in events:
+        row['participants'] = entrants[row['event_id']]
+
+    return _json({'version': data_version(), **team, 'events': events})
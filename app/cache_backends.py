@@ -0,0 +1,251 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+"""
+
+# A read refreshes ``accessed`` only when it is older than this, so hot
+# keys do not turn every get into a write. Eviction is LRU to within
+# this many seconds.
+TOUCH_INTERVAL = 5.0
+
+
+class SQLiteCache(BaseCache):
+    """
+    Cache shared by every process on one host through a SQLite file in
+    WAL mode: readers never block each other or the writer, and a value
+    stored by one gunicorn worker is visible to the others at once.
+
+    Keys expire after their timeout and, once there are more than
+    ``MAX_ENTRIES``, the least recently used ``1/CULL_FREQUENCY`` of them
+    are dropped. ``add`` and ``incr`` are single statements, so they
+    (and ``get_or_set``, built on ``add``) are atomic across processes.
+    Integers are stored as SQL integers for ``incr``; everything else
+    is pickled, and ``incr`` on it raises ``TypeError``.
+
+        CACHES = {'default': {
+            'BACKEND': 'app.cache_backends.SQLiteCache',
+            'LOCATION': '/var/tmp/fest-cache.sqlite3',
+        }}
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    _missing = object()
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        self._local = threading.local()
+        self._writes = 0
+        # Check the size roughly every this many writes instead of counting on each set.
+        self._cull_every = max(1, min(100, self._max_entries // 10))
+
+    # ----- connection -----
+    def _db(self):
+        # One connection per thread and process; a forked worker must
+        # not reuse its parent's connection.
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _one(self, sql, params):
+        # fetchall() steps every statement to the end: a half-read one
+        # keeps its transaction (and, for a write, the lock) open.
+        rows = self._db().execute(sql, params).fetchall()
+        return rows[0] if rows else None
+
+    def close(self, **kwargs):
+        # Connections are kept for the life of the thread; Django calls
+        # this after every request.
+        pass
+
+    # ----- encoding -----
+    def _encode(self, value):
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, value):
+        if isinstance(value, bytes):
+            return pickle.loads(value)
+        return value
+
+    # ----- reads -----
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version)
+        now = time.time()
+        row = self._one(
+            "SELECT value, accessed FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, now),
+        )
+        if row is None:
+            return default
+        if now - row[1] > TOUCH_INTERVAL:
+            self._db().execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return self._decode(row[0])
+
+    def get_many(self, keys, version=None):
+        mapping = {self.make_and_validate_key(k, version): k for k in keys}
+        if not mapping:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(mapping))
+        rows = self._db().execute(
+            f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+            "AND (expires IS NULL OR expires > ?)",
+            (*mapping, now),
+        ).fetchall()
+        return {mapping[key]: self._decode(value) for key, value in rows}
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version)
+        return self._one(
+            "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ) is not None
+
+    # ----- writes -----
+    def _after_write(self, count=1):
+        self._writes += count
+        if self._writes >= self._cull_every:
+            self._writes = 0
+            self._cull()
+
+    def _cull(self):
+        db = self._db()
+        db.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        total = self._one("SELECT COUNT(*) FROM cache", ())[0]
+        if total > self._max_entries:
+            if self._cull_frequency == 0:
+                db.execute("DELETE FROM cache")
+                return
+            db.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                (total // self._cull_frequency,),
+            )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        self._db().execute(
+            "INSERT INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+            "expires = excluded.expires, accessed = excluded.accessed",
+            (key, self._encode(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._after_write()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        rows = [
+            (self.make_and_validate_key(key, version), self._encode(value), expires, now)
+            for key, value in data.items()
+        ]
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "expires = excluded.expires, accessed = excluded.accessed",
+                rows,
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._after_write(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Store only if the key is missing or expired; True if this call stored it."""
+        key = self.make_and_validate_key(key, version)
+        now = time.time()
+        cursor = self._db().execute(
+            "INSERT INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+            "expires = excluded.expires, accessed = excluded.accessed "
+            "WHERE cache.expires IS NOT NULL AND cache.expires <= ?",
+            (key, self._encode(value), self.get_backend_timeout(timeout), now, now),
+        )
+        if cursor.rowcount:
+            self._after_write()
+        return cursor.rowcount > 0
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, self._missing, version=version)
+        if value is not self._missing:
+            return value
+        if callable(default):
+            default = default()
+        # If another process stored a value first, everyone returns that one.
+        self.add(key, default, timeout=timeout, version=version)
+        return self.get(key, default, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version)
+        row = self._one(
+            "UPDATE cache SET value = value + ? WHERE key = ? "
+            "AND typeof(value) = 'integer' AND (expires IS NULL OR expires > ?) "
+            "RETURNING value",
+            (delta, key, time.time()),
+        )
+        if row is not None:
+            return row[0]
+        if self._one(
+            "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ) is not None:
+            # Like the built-in backends: a value that is not an integer
+            # is a TypeError, only a missing key is a ValueError.
+            raise TypeError("Value of key '%s' is not an integer" % key)
+        raise ValueError("Key '%s' not found" % key)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        now = time.time()
+        cursor = self._db().execute(
+            "UPDATE cache SET expires = ?, accessed = ? "
+            "WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), now, key, now),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version)
+        cursor = self._db().execute("DELETE FROM cache WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(k, version) for k in keys]
+        if keys:
+            self._db().execute(
+                f"DELETE FROM cache WHERE key IN ({','.join('?' * len(keys))})", keys
+            )
+
+    def clear(self):
+        self._db().execute("DELETE FROM cache")
@@ -1,7 +1,51 @@
 from django import forms
 from django.core.exceptions import ValidationError
 
-from .models import Event, Team, Participation, Result
+from .models import Event, Team, Participation, Result, participant_key
+from .utils.cache import cached
+from .utils.quotas import entry_errors
+from .utils.results import max_points
+
+
+# =====================================================
+# SHARED CHOICES
+# =====================================================
+# A 15-row group formset would otherwise run the Event and Team
+# SELECTs once per row when rendering. Build each list once and
+# reuse it until fest data changes.
+def event_choices():
+    return cached('choices:event', lambda: [
+        (pk, name)
+        for pk, name in Event.objects.order_by('pk').values_list('pk', 'name')
+    ])
+
+
+def team_choices():
+    return cached('choices:team', lambda: [
+        (team.pk, str(team))
+        for team in Team.objects.order_by('pk').only('team_name', 'department')
+    ])
+
+
+def use_shared_choices(form):
+    for name, choices in (('event', event_choices), ('team', team_choices)):
+        field = form.fields.get(name)
+        if field is not None:
+            field.choices = [('', field.empty_label)] + choices()
+
+
+# =====================================================
+# ROW VERSIONS
+# =====================================================
+# Edit forms carry the version of the row they were rendered from so
+# the save can be refused if another desk changed it in the meantime.
+def add_version_field(form):
+    form.fields['version'] = forms.IntegerField(
+        widget=forms.HiddenInput,
+        required=False,
+        min_value=0,
+        initial=form.instance.version if form.instance.pk else None,
+    )
 
 
 class EventForm(forms.ModelForm):
@@ -13,6 +57,10 @@ class EventForm(forms.ModelForm):
             'event_type',
             'min_team_size',
             'max_team_size',
+            'scoring',
+            'venue',
+            'start_time',
+            'end_time',
         ]
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
@@ -20,8 +68,33 @@ class EventForm(forms.ModelForm):
             'event_type': forms.Select(attrs={'class': 'form-control'}),
             'min_team_size': forms.NumberInput(attrs={'class': 'form-control'}),
             'max_team_size': forms.NumberInput(attrs={'class': 'form-control'}),
+            'scoring': forms.Select(attrs={'class': 'form-control'}),
+            'venue': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Stage / hall'}),
+            'start_time': forms.DateTimeInput(
+                attrs={'class': 'form-control', 'type': 'datetime-local'},
+                format='%Y-%m-%dT%H:%M',
+            ),
+            'end_time': forms.DateTimeInput(
+                attrs={'class': 'form-control', 'type': 'datetime-local'},
+                format='%Y-%m-%dT%H:%M',
+            ),
         }
 
+    def clean_venue(self):
+        return " ".join(self.cleaned_data.get('venue', '').split())
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start_time')
+        end = cleaned_data.get('end_time')
+
+        if bool(start) != bool(end):
+            raise ValidationError("Give both a start and an end time, or neither.")
+        if start and end and end <= start:
+            raise ValidationError("The event must end after it starts.")
+
+        return cleaned_data
+
 
 
 class TeamForm(forms.ModelForm):
@@ -56,6 +129,21 @@ class ParticipationForm(forms.ModelForm):
             self.fields['team'].disabled = True
             self.initial['team'] = self.fixed_team
 
+        # Group rows all share one event and team. Drop both fields so
+        # each row skips its own lookups; save_group_participation()
+        # validates the whole roster in one pass instead.
+        if (
+            self.fixed_event and self.fixed_team
+            and self.fixed_event.event_type == 'GROUP'
+        ):
+            del self.fields['event']
+            del self.fields['team']
+            self.instance.event = self.fixed_event
+            self.instance.team = self.fixed_team
+
+        use_shared_choices(self)
+        add_version_field(self)
+
     def clean(self):
         cleaned_data = super().clean()
 
@@ -66,20 +154,93 @@ class ParticipationForm(forms.ModelForm):
         if not event or not team:
             return cleaned_data
 
+        # Event limits; utils.quotas re-checks atomically on save.
+        name = cleaned_data.get('participant_name')
+        if name and event.event_type == 'SINGLE':
+            key = participant_key(name)
+            if not self.instance.pk or self.instance.participant_key != key:
+                errors = entry_errors(event, team.pk, key, name)
+                if errors:
+                    raise ValidationError(errors)
 
+        return cleaned_data
 
 
-from django.forms import modelformset_factory
+
+
+from django.forms import BaseModelFormSet, modelformset_factory
+
+
+class _LoadedRowField(forms.ModelChoiceField):
+    """Resolve a row id from the formset's already loaded queryset."""
+
+    def __init__(self, *args, lookup, **kwargs):
+        self.lookup = lookup
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        obj = self.lookup(value)
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
+
+
+class ParticipationBaseFormSet(BaseModelFormSet):
+    """
+    Model formset whose hidden id fields reuse the formset queryset
+    instead of running one ``queryset.get()`` per row on validation.
+    """
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        name = self._pk_field.name
+        field = form.fields[name]
+        form.fields[name] = _LoadedRowField(
+            field.queryset,
+            initial=field.initial,
+            required=False,
+            widget=field.widget,
+            lookup=self._lookup_row,
+        )
+
+    def _lookup_row(self, value):
+        try:
+            pk = self._pk_field.to_python(value)
+        except ValidationError:
+            return None
+        return self._existing_object(pk)
 
 
 ParticipationFormSet = modelformset_factory(
     Participation,
     form=ParticipationForm,
+    formset=ParticipationBaseFormSet,
     extra=3,          # number of participant rows shown initially
     can_delete=False
 )
 
 
+class ParticipationImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV or XLSX with columns: team, department, event, participant",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'})
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        help_text="Validate only, do not save anything"
+    )
+    partial = forms.BooleanField(
+        required=False,
+        help_text="Save valid rows even if some rows have errors"
+    )
+
+
 class ResultForm(forms.ModelForm):
     class Meta:
         model = Result
@@ -90,10 +251,22 @@ class ResultForm(forms.ModelForm):
             'points',
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        use_shared_choices(self)
+        add_version_field(self)
+
     def clean(self):
         cleaned_data = super().clean()
         event = cleaned_data.get('event')
         team = cleaned_data.get('team')
+        position = cleaned_data.get('position')
+        points = cleaned_data.get('points')
+
+        if position is not None and points is not None and points > max_points(position):
+            self.add_error(
+                'points', f"Position {position} is worth at most {max_points(position)} points."
+            )
 
         if event and team:
             # Ensure team actually participated in the event
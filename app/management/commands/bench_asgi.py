@@ -0,0 +1,179 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils import bench
+
+
+MODES = {
+    'wsgi': ('sync', 'CampusFest.wsgi:application'),
+    'asgi': ('uvicorn_worker.UvicornWorker', 'CampusFest.asgi:application'),
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+async def _read_status(reader):
+    head = await reader.readuntil(b"\r\n")
+    await reader.read()     # Connection: close, so read to EOF
+    return int(head.split()[1])
+
+
+async def _slow_client(port, path, seconds, stop):
+    """Trickle a request over ``seconds``, like a phone on bad Wi-Fi, again and again."""
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode()
+    step = seconds / len(request)
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            for i in range(len(request)):
+                if stop.is_set():
+                    break
+                writer.write(request[i:i + 1])
+                await writer.drain()
+                await asyncio.sleep(step)
+            writer.close()
+        except OSError:
+            await asyncio.sleep(0.1)
+
+
+async def _fast_client(port, path, stop, samples, failures, timeout):
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection('127.0.0.1', port), timeout
+            )
+            writer.write(request)
+            await writer.drain()
+            status = await asyncio.wait_for(_read_status(reader), timeout)
+            writer.close()
+            if status == 200:
+                samples.append((time.perf_counter() - start) * 1000)
+            else:
+                failures.append(status)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            failures.append('timeout')
+
+
+async def _load(port, options):
+    stop = asyncio.Event()
+    samples, failures = [], []
+    slow = [
+        asyncio.create_task(_slow_client(port, options['path'], options['slow_seconds'], stop))
+        for _ in range(options['slow'])
+    ]
+    await asyncio.sleep(0.5)    # let the slow clients occupy their connections
+    fast = [
+        asyncio.create_task(_fast_client(port, options['path'], stop, samples, failures, options['timeout']))
+        for _ in range(options['clients'])
+    ]
+    start = time.perf_counter()
+    await asyncio.sleep(options['duration'])
+    stop.set()
+    await asyncio.gather(*fast)
+    elapsed = time.perf_counter() - start
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+    return samples, failures, elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with sync WSGI workers and with uvicorn ASGI workers "
+        "(same worker count), hold many slow connections open and measure "
+        "how many normal requests each still serves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='*', default=list(MODES), choices=list(MODES))
+        parser.add_argument('--path', default='/', help="Page to request (default: home page).")
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--slow', type=int, default=50,
+                            help="Connections that trickle their request in.")
+        parser.add_argument('--slow-seconds', type=float, default=5.0,
+                            help="Time a slow client takes to send one request.")
+        parser.add_argument('--clients', type=int, default=10,
+                            help="Concurrent normal clients.")
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--timeout', type=float, default=5.0,
+                            help="A normal request slower than this counts as failed.")
+        parser.add_argument('--save', metavar='PATH', help="Write the JSON report.")
+
+    def handle(self, *args, **options):
+        results = {}
+        for mode in options['modes']:
+            results[mode] = self.run(mode, options)
+            row = results[mode]
+            self.stdout.write(
+                f"{mode}: {row['ok']:>6} ok  {row['failed']:>5} failed  "
+                f"{row['rps']:>8.1f} req/s  p50 {row['p50_ms']:>8.2f}ms  "
+                f"p99 {row['p99_ms']:>8.2f}ms  (with {options['slow']} slow connections)"
+            )
+
+        if options['save']:
+            bench.write_report(options['save'], {
+                'meta': dict(
+                    bench.environment(),
+                    **{k: options[k] for k in ('path', 'workers', 'slow', 'slow_seconds', 'clients', 'duration')},
+                ),
+                'results': results,
+            })
+            self.stdout.write(f"Report written to {options['save']}")
+
+    def run(self, mode, options):
+        worker_class, app = MODES[mode]
+        port = _free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn',
+                '--config', 'gunicorn.conf.py',
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(options['workers']),
+                '--worker-class', worker_class,
+                '--log-level', 'warning',
+                app,
+            ],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, GUNICORN_WORKER_CLASS=worker_class),
+        )
+        try:
+            if not _wait_for(port):
+                raise CommandError(f"gunicorn ({mode}) did not start on port {port}")
+            samples, failures, elapsed = asyncio.run(_load(port, options))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+        return dict(
+            bench.summarize(samples),
+            ok=len(samples),
+            failed=len(failures),
+            rps=round(len(samples) / elapsed, 1),
+        )
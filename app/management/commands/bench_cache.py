@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Worker processes are spawned fresh and import this module before
+# django.setup(), so app imports live inside the functions.
+
+DB_TABLE = "bench_cache_table"
+
+
+def _backends(tmp):
+    return {
+        'sqlite': ('app.cache_backends.SQLiteCache', os.path.join(tmp, 'sqlite', 'cache.sqlite3')),
+        'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'bench'),
+        'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(tmp, 'file')),
+        'db': ('django.core.cache.backends.db.DatabaseCache', DB_TABLE),
+    }
+
+
+def _make(backend, location, max_entries):
+    from django.utils.module_loading import import_string
+
+    return import_string(backend)(location, {
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    })
+
+
+def _worker(spec, seed, ready, go, results):
+    import django
+    django.setup()
+
+    backend, location, keys, ops, read_ratio, payload, max_entries = spec
+    cache = _make(backend, location, max_entries)
+    rng = random.Random(seed)
+    cache.get('warm-up')           # open connections / files before timing
+    gets, sets, errors, hits = [], [], 0, 0
+
+    ready.put(os.getpid())
+    go.wait()
+    for _ in range(ops):
+        key = f"k{rng.randrange(keys)}"
+        start = time.perf_counter()
+        try:
+            if rng.random() < read_ratio:
+                hits += cache.get(key) is not None
+                gets.append((time.perf_counter() - start) * 1000)
+            else:
+                cache.set(key, payload)
+                sets.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            errors += 1
+    results.put((gets, sets, errors, hits))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark cache backends (the shared SQLite cache, LocMem, file and "
+        "database) with several processes hitting the same keys at once: "
+        "get/set latency percentiles, throughput and cross-process hit rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='*', default=['sqlite', 'locmem', 'file', 'db'])
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--ops', type=int, default=5000,
+                            help="Operations per process.")
+        parser.add_argument('--keys', type=int, default=500)
+        parser.add_argument('--read-ratio', type=float, default=0.9)
+        parser.add_argument('--value-size', type=int, default=4096,
+                            help="Bytes per cached value.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--save', metavar='PATH',
+                            help="Write the JSON report.")
+
+    def handle(self, *args, **options):
+        from app.utils import bench
+
+        tmp = tempfile.mkdtemp(prefix='bench-cache-')
+        available = _backends(tmp)
+        unknown = set(options['backends']) - set(available)
+        if unknown:
+            raise CommandError(f"Unknown backend(s): {', '.join(sorted(unknown))}")
+
+        results = {}
+        try:
+            for name in options['backends']:
+                results[name] = self.run(name, *available[name], options)
+                row = results[name]
+                self.stdout.write(
+                    f"{name:<7} get p50 {row['get']['p50_ms']:>7.3f}ms p99 {row['get']['p99_ms']:>7.3f}ms  "
+                    f"set p50 {row['set']['p50_ms']:>7.3f}ms p99 {row['set']['p99_ms']:>7.3f}ms  "
+                    f"{row['ops_per_s']:>8.0f} ops/s  hit {row['hit_rate']:>4.0%}  "
+                    f"errors {row['errors']}"
+                )
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.stdout.write(
+            "hit = share of reads that found the value another process stored; "
+            "LocMem keeps a separate cache per process."
+        )
+        if options['save']:
+            bench.write_report(options['save'], {
+                'meta': dict(
+                    bench.environment(),
+                    **{k: options[k] for k in ('processes', 'ops', 'keys', 'read_ratio', 'value_size')},
+                ),
+                'results': results,
+            })
+            self.stdout.write(f"Report written to {options['save']}")
+
+    def run(self, name, backend, location, options):
+        from django.core.management.commands.createcachetable import Command as CreateCacheTable
+        from django.db import connection
+
+        from app.utils import bench
+
+        max_entries = options['keys'] * 2
+        payload = os.urandom(options['value_size'])
+        if name == 'db':
+            creator = CreateCacheTable()
+            creator.verbosity = 0
+            creator.create_table('default', DB_TABLE, dry_run=False)
+
+        try:
+            # Every key exists before the clock starts, so each read can hit.
+            cache = _make(backend, location, max_entries)
+            cache.set_many({f"k{i}": payload for i in range(options['keys'])})
+            if name == 'db':
+                connection.close()
+
+            ctx = multiprocessing.get_context('spawn')
+            ready, go, queue = ctx.Queue(), ctx.Event(), ctx.Queue()
+            spec = (backend, location, options['keys'], options['ops'],
+                    options['read_ratio'], payload, max_entries)
+            procs = [
+                ctx.Process(target=_worker, args=(spec, options['seed'] + i, ready, go, queue))
+                for i in range(max(1, options['processes']))
+            ]
+            for proc in procs:
+                proc.start()
+            for _ in procs:
+                ready.get()
+            start = time.perf_counter()
+            go.set()
+            answers = [queue.get() for _ in procs]
+            elapsed = time.perf_counter() - start
+            for proc in procs:
+                proc.join()
+        finally:
+            if name == 'db':
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(DB_TABLE)}")
+
+        gets = [s for a in answers for s in a[0]]
+        sets = [s for a in answers for s in a[1]]
+        hits = sum(a[3] for a in answers)
+        return {
+            'get': bench.summarize(gets),
+            'set': bench.summarize(sets),
+            'errors': sum(a[2] for a in answers),
+            'hit_rate': round(hits / len(gets), 3) if gets else 0.0,
+            'ops_per_s': round((len(gets) + len(sets)) / elapsed, 1),
+        }
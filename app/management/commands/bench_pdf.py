@@ -0,0 +1,264 @@
+import io
+import re
+import resource
+import sys
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from app import views
+from app.models import Event, Team, Result
+from app.utils import bench
+from app.utils.catalog import load_catalog
+from app.utils.seed import seed_fest
+
+
+PAGE_RE = re.compile(rb"/Type\s*/Page[^s]")
+
+FONTS = {
+    "Montserrat-Bold": "Montserrat-Bold.ttf",
+    "Montserrat-SemiBold": "Montserrat-SemiBold.ttf",
+    "GreatVibes": "GreatVibes-Regular.ttf",
+    "AlexBrush": "AlexBrush-Regular.ttf",
+}
+
+SAMPLE_NAMES = [
+    "Diya K",
+    "Sreehari Navaneeth Krishnan",
+    "Muhammed Fathima Zainab Basheer Rahman Thekkeveettil",
+]
+
+
+def count_pages(payload):
+    if payload[:2] == b"PK":
+        with zipfile.ZipFile(io.BytesIO(payload)) as zf:
+            return sum(count_pages(zf.read(n)) for n in zf.namelist())
+    return len(PAGE_RE.findall(payload))
+
+
+def reset_peak_rss():
+    # Linux lets a process reset its own VmHWM; elsewhere we only
+    # get the lifetime peak, which is still useful as an upper bound.
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return bench.summarize(samples)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark PDF and certificate rendering over synthetic fests of "
+        "growing size, plus font, image and text-fitting sub-costs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default="4,12,32",
+                            help="Comma separated team counts, one dataset each.")
+        parser.add_argument('--roster', type=int, default=40)
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', metavar='PATH',
+                            help="Write the JSON report here.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        load_catalog()
+
+        try:
+            report = {
+                'meta': dict(bench.environment(), iterations=options['iterations']),
+                'subcosts': self.subcosts(options['iterations']),
+                'datasets': [],
+            }
+            self.print_subcosts(report['subcosts'])
+
+            user = User.objects.create_superuser("bench-pdf", "bench@example.com", "x")
+            for size in [int(s) for s in options['sizes'].split(',') if s]:
+                counts = seed_fest(
+                    teams=size,
+                    roster_size=options['roster'],
+                    seed=options['seed'],
+                    clear=True,
+                )
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"Dataset: {size} teams, {counts['participations']} participations"
+                ))
+                report['datasets'].append({
+                    'teams': size,
+                    'counts': counts,
+                    'artifacts': self.artifacts(user, options['iterations']),
+                })
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            bench.write_report(options['output'], report)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    # =====================================================
+    # ARTIFACTS
+    # =====================================================
+    def targets(self):
+        single = (
+            Result.objects
+            .filter(event__event_type='SINGLE', position=1)
+            .order_by('id').first()
+        )
+        group = (
+            Result.objects
+            .filter(event__event_type='GROUP', position=1)
+            .order_by('id').first()
+        )
+        busiest_event = (
+            Event.objects
+            .annotate(n=Count('participations'))
+            .filter(results__isnull=False)
+            .order_by('-n').first()
+        )
+        busiest_team = (
+            Team.objects
+            .annotate(n=Count('participations'))
+            .order_by('-n').first()
+        )
+
+        targets = [('fest_full_report', views.fest_full_report, {})]
+        if busiest_event:
+            targets.append(('event_result_pdf', views.event_result_pdf,
+                            {'event_id': busiest_event.id}))
+        if busiest_team:
+            targets.append(('team_participation_pdf', views.team_participation_pdf,
+                            {'team_id': busiest_team.id}))
+        if single:
+            targets.append(('certificate_single', views.generate_winner_certificate,
+                            {'result_id': single.id}))
+        if group:
+            targets.append(('certificate_group_zip', views.generate_winner_certificate,
+                            {'result_id': group.id}))
+        return targets
+
+    def artifacts(self, user, iterations):
+        factory = RequestFactory()
+        rows = {}
+
+        for label, view, kwargs in self.targets():
+            def render():
+                request = factory.get('/')
+                request.user = user
+                return view(request, **kwargs).content
+
+            payload = render()  # warm up fonts, images and query plans
+            timing = timed(render, iterations)
+
+            reset_peak_rss()
+            rss_before = peak_rss_kb()
+            tracemalloc.start()
+            render()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            pages = count_pages(payload)
+            seconds = timing['p50_ms'] / 1000
+            rows[label] = dict(
+                timing,
+                bytes=len(payload),
+                pages=pages,
+                pages_per_sec=round(pages / seconds, 1) if seconds else None,
+                peak_rss_kb=peak_rss_kb(),
+                rss_growth_kb=peak_rss_kb() - rss_before,
+                traced_peak_kb=round(traced_peak / 1024, 1),
+            )
+            row = rows[label]
+            self.stdout.write(
+                f"  {label:<24} p50 {row['p50_ms']:>9.2f}ms  {row['pages']:>4} pages  "
+                f"{row['pages_per_sec'] or 0:>8.1f} p/s  {row['bytes']:>9}B  "
+                f"rss {row['peak_rss_kb']}KB (+{row['rss_growth_kb']})"
+            )
+
+        return rows
+
+    # =====================================================
+    # SUB-COSTS
+    # =====================================================
+    def subcosts(self, iterations):
+        static = Path(settings.BASE_DIR) / "static"
+        font_dir = static / "fonts"
+        cert_dir = static / "certificates"
+        width, height = A4
+        max_width = width - 220
+
+        images = {
+            'background': cert_dir / "certificate_bg.jpeg",
+            'medal_gold': cert_dir / "medals" / "gold.png",
+        }
+
+        costs = {}
+
+        for name, filename in FONTS.items():
+            costs[f'font_load:{name}'] = timed(
+                lambda f=filename, n=name: TTFont(n, font_dir / f), iterations
+            )
+
+        for label, path in images.items():
+            costs[f'image_decode:{label}'] = timed(
+                lambda p=path: ImageReader(str(p)).getRGBData(), iterations
+            )
+
+        p = canvas.Canvas(io.BytesIO(), pagesize=A4)
+        for name in SAMPLE_NAMES:
+            costs[f'fit_name:{len(name)}ch'] = timed(
+                lambda n=name: views._fit_name_font(p, n, max_width), iterations * 20
+            )
+            body = [
+                f"This is to certify that {name} of Computer Science Department has",
+                "secured 1st Position in the event “Semi-Classical Dance (Group)” on ,",
+                "RAMITHAM Campus Fest conducted by Department Students Union,",
+                "Dr. Janaki Ammal Campus, Kannur University, Palayad",
+            ]
+            costs[f'fit_body:{len(name)}ch'] = timed(
+                lambda b=body: views._fit_body_font(p, b, max_width), iterations * 20
+            )
+
+        return costs
+
+    def print_subcosts(self, costs):
+        self.stdout.write(self.style.MIGRATE_HEADING("Sub-costs"))
+        for label, row in costs.items():
+            self.stdout.write(f"  {label:<32} p50 {row['p50_ms']:>9.3f}ms  p95 {row['p95_ms']:>9.3f}ms")
@@ -0,0 +1,230 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import URLPattern, reverse
+
+from app import urls as app_urls
+from app.models import Participation, Result
+from app.utils import bench
+from app.utils.catalog import load_catalog
+from app.utils.seed import seed_fest
+
+
+BENCH_USERNAME = "bench-runner"
+
+# Views that write on GET, or whose page sits one click from a write;
+# never hit them on a live database.
+LIVE_SKIP = {'logout', 'create-superuser'}
+
+
+def _live_safe(label):
+    return label not in LIVE_SKIP and not label.endswith('_delete')
+
+
+def _consume(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _sample_kwargs():
+    """Pick ids that give every parametrised view real data to render."""
+    result = Result.objects.order_by('id').first()
+    if result:
+        return {
+            'event_id': result.event_id,
+            'team_id': result.team_id,
+            'result_id': result.id,
+        }
+
+    participation = Participation.objects.order_by('id').first()
+    if participation:
+        return {
+            'event_id': participation.event_id,
+            'team_id': participation.team_id,
+        }
+    return {}
+
+
+def collect_targets(sample):
+    targets = []
+
+    for pattern in app_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+
+        params = list(pattern.pattern.converters)
+        label = pattern.name or str(pattern.pattern).strip('/')
+
+        if any(p not in sample for p in params):
+            targets.append((label, None))
+            continue
+
+        if pattern.name:
+            url = reverse(pattern.name, kwargs={p: sample[p] for p in params})
+        else:
+            url = '/' + str(pattern.pattern)
+
+        targets.append((label, url))
+
+    return targets
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every URL in app/urls.py through the Django test client "
+        "and report latency percentiles, query counts and memory. "
+        "Runs against a throwaway test database seeded with synthetic data "
+        "unless --live is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', nargs='*', default=None,
+                            help="Restrict to these URL names.")
+        parser.add_argument('--live', metavar='USERNAME',
+                            help="Run against the configured database, logged in as this "
+                                 "existing account. Nothing is created and views that write "
+                                 "on GET are skipped.")
+        parser.add_argument('--teams', type=int, default=12,
+                            help="Teams to seed in the test database.")
+        parser.add_argument('--roster', type=int, default=40,
+                            help="Students per team to seed in the test database.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--save', metavar='PATH',
+                            help="Write the JSON report (use as a baseline later).")
+        parser.add_argument('--compare', metavar='PATH',
+                            help="Baseline JSON to check for regressions.")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed relative p95 growth before flagging (default 0.2).")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = None
+
+        try:
+            if not options['live']:
+                old_name = connection.settings_dict['NAME']
+                connection.creation.create_test_db(verbosity=0, autoclobber=True)
+                load_catalog()
+                counts = seed_fest(
+                    teams=options['teams'],
+                    roster_size=options['roster'],
+                    seed=options['seed'],
+                )
+                self.stdout.write(
+                    "Seeded test database: {participations} participations, "
+                    "{results} results".format(**counts)
+                )
+
+            report = self.run(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['save']:
+            bench.write_report(options['save'], report)
+            self.stdout.write(f"Report written to {options['save']}")
+
+        if options['compare']:
+            baseline = bench.load_report(options['compare'])
+            regressions = bench.find_regressions(
+                baseline, report, threshold=options['threshold']
+            )
+            if regressions:
+                for name, metric, before, after in regressions:
+                    self.stdout.write(self.style.ERROR(
+                        f"REGRESSION {name}: {metric} {before} -> {after}"
+                    ))
+                raise CommandError(f"{len(regressions)} regression(s) found")
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
+
+    def run(self, options):
+        live = options['live']
+        if live:
+            user = User.objects.filter(username=live).first()
+            if user is None:
+                raise CommandError(f"No user named {live!r} to run as")
+        else:
+            user = User.objects.create_superuser(username=BENCH_USERNAME)
+        client = Client()
+        client.force_login(user)
+
+        results = {}
+        targets = collect_targets(_sample_kwargs())
+        only = set(options['only'] or [])
+
+        try:
+            for label, url in targets:
+                if only and label not in only:
+                    continue
+                if url is None:
+                    self.stdout.write(self.style.WARNING(f"skip {label}: no data for URL parameters"))
+                    continue
+                if live and not _live_safe(label):
+                    self.stdout.write(self.style.WARNING(f"skip {label}: not read-only"))
+                    continue
+
+                results[label] = self.measure(client, user, url, options)
+                row = results[label]
+                self.stdout.write(
+                    f"{label:<28} {row['status']}  p50 {row['p50_ms']:>9.2f}ms  "
+                    f"p95 {row['p95_ms']:>9.2f}ms  p99 {row['p99_ms']:>9.2f}ms  "
+                    f"q {row['queries']:>4}  peak {row['peak_kb']:>8.1f}KB  "
+                    f"{row['bytes']}B"
+                )
+        finally:
+            # Drops the session row the login created.
+            client.logout()
+
+        return {
+            'meta': dict(bench.environment(), iterations=options['iterations']),
+            'results': results,
+        }
+
+    def measure(self, client, user, url, options):
+        # logout_view ends the session, so log in again after it.
+        def relogin():
+            if '_auth_user_id' not in client.session:
+                client.force_login(user)
+
+        for _ in range(options['warmup']):
+            relogin()
+            _consume(client.get(url))
+
+        samples = []
+        for _ in range(options['iterations']):
+            relogin()
+            start = time.perf_counter()
+            size = _consume(client.get(url))
+            samples.append((time.perf_counter() - start) * 1000)
+
+        # One extra pass for queries and memory, so tracing
+        # overhead does not pollute the timings above.
+        relogin()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+            _consume(response)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return dict(
+            bench.summarize(samples),
+            url=url,
+            status=response.status_code,
+            queries=len(ctx.captured_queries),
+            peak_kb=round(peak / 1024, 1),
+            bytes=size,
+        )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.schedule import describe, describe_venue, person_clashes, venue_clashes
+
+
+class Command(BaseCommand):
+    help = (
+        "List every student booked into overlapping events and every "
+        "venue booked twice at the same time, across the whole fest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-venues', action='store_true',
+                            help="Only check students, not venues.")
+        parser.add_argument('--fail', action='store_true',
+                            help="Exit with an error if any clash is found (for CI/deploys).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        clashes = person_clashes()
+        venues = [] if options['no_venues'] else venue_clashes()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        for clash in clashes:
+            self.stdout.write(
+                f"{clash['events'][0]['start_time']:%d %b %H:%M}  {describe(clash)}"
+            )
+        for pair in venues:
+            self.stdout.write(
+                f"{pair[0]['start_time']:%d %b %H:%M}  {describe_venue(pair)}"
+            )
+
+        summary = (
+            f"{len(clashes)} student clash(es), {len(venues)} venue clash(es) "
+            f"in {elapsed:.1f}ms"
+        )
+        if not clashes and not venues:
+            self.stdout.write(self.style.SUCCESS(summary))
+        elif options['fail']:
+            raise CommandError(summary)
+        else:
+            self.stdout.write(self.style.WARNING(summary))
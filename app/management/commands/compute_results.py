@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Event
+from app.utils.concurrency import ConflictError
+from app.utils.judging import compute_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute positions and points from judges' marks for every event "
+        "without published results (or the given events) and write them "
+        "as draft results."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('events', nargs='*', type=int,
+                            help="Event ids to recompute, even if already published.")
+        parser.add_argument('--publish', action='store_true',
+                            help="Publish the computed results straight away.")
+
+    def handle(self, *args, **options):
+        events = None
+        if options['events']:
+            events = list(Event.objects.filter(pk__in=options['events']))
+
+        try:
+            summary = compute_results(events, publish=options['publish'])
+        except ConflictError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            "{events} events, {marks} marks -> {results} results "
+            "({removed} stale removed); ranking {rank_ms}ms, total {total_ms}ms".format(**summary)
+        )
+        if options['publish']:
+            self.stdout.write(self.style.SUCCESS("Results published"))
+        else:
+            self.stdout.write("Results saved as drafts; publish them from the results sheet")
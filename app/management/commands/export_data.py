@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from app.utils.exports import DATASETS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream registrations, results or standings to a CSV, JSON lines "
+        "or XLSX file (or stdout) without loading them into memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', metavar='PATH',
+                            help="File to write; defaults to stdout.")
+
+    def handle(self, *args, **options):
+        chunks, _ = export(options['dataset'], options['fmt'])
+
+        if not options['output']:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+
+        size = 0
+        with open(options['output'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                size += len(chunk)
+        self.stderr.write(self.style.SUCCESS(
+            f"Wrote {options['dataset']} to {options['output']} ({size / 1024:.1f} KB)"
+        ))
@@ -0,0 +1,54 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.snapshot import SnapshotError, export_snapshot, import_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Back up or restore all fest data (events, teams, participations, "
+        "results, judges' marks) as a gzipped JSON-lines snapshot. Use it "
+        "to move a fest between PostgreSQL and SQLite."
+    )
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        export = actions.add_parser('export', help="Write a snapshot of this database.")
+        export.add_argument('path')
+        export.add_argument('--level', type=int, default=5, choices=range(1, 10),
+                            help="gzip level; lower is faster, higher is smaller (default 5).")
+
+        load = actions.add_parser('import', help="Load a snapshot into this database.")
+        load.add_argument('path')
+        load.add_argument('--replace', action='store_true',
+                          help="Delete the existing fest data first.")
+        load.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        path = options['path']
+
+        try:
+            if options['action'] == 'export':
+                counts = export_snapshot(path, compresslevel=options['level'])
+            else:
+                if not os.path.exists(path):
+                    raise CommandError(f"{path} does not exist.")
+                counts = import_snapshot(
+                    path,
+                    replace=options['replace'],
+                    batch_size=options['batch_size'],
+                )
+        except SnapshotError as exc:
+            raise CommandError(str(exc))
+
+        elapsed = time.perf_counter() - started
+        for label, rows in counts.items():
+            self.stdout.write(f"{label:<22} {rows:>8}")
+        verb = "Exported to" if options['action'] == 'export' else "Imported from"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {path} ({os.path.getsize(path) / 1024:.1f} KB) in {elapsed:.2f}s"
+        ))
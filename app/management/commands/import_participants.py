@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.importer import import_file
+
+
+class Command(BaseCommand):
+    help = "Bulk import teams and participations from a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Validate only, write nothing.")
+        parser.add_argument('--partial', action='store_true',
+                            help="Save valid rows even if other rows have errors.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        try:
+            with open(options['path'], 'rb') as fh:
+                report = import_file(
+                    fh,
+                    options['path'],
+                    dry_run=options['dry_run'],
+                    partial=options['partial'],
+                    batch_size=options['batch_size'],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for row_no, message in report.errors:
+            self.stderr.write(f"row {row_no}: {message}")
+
+        elapsed = time.perf_counter() - start
+        summary = (
+            f"{report.rows} rows, {report.teams_created} new teams, "
+            f"{report.participations_created} participants, "
+            f"{len(report.errors)} errors in {elapsed:.2f}s"
+        )
+
+        if report.errors and not options['partial'] and not options['dry_run']:
+            raise CommandError(f"Import aborted: {summary}")
+
+        prefix = "Dry run: " if options['dry_run'] else "Imported "
+        self.stdout.write(self.style.SUCCESS(prefix + summary))
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.catalog import DEFAULT_CATALOG, load_catalog
+
+
+def _show(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='minutes')
+    return repr(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update events from the declarative catalog "
+        "(app/data/events.json) in one upsert and print what changed. "
+        "Does nothing when the database already matches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=str(DEFAULT_CATALOG))
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only show the differences.")
+
+    def handle(self, *args, **options):
+        try:
+            diff = load_catalog(options['path'], dry_run=options['dry_run'])
+        except ValidationError as exc:
+            raise CommandError("Invalid catalog:\n  " + "\n  ".join(exc.messages))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        for name in diff.created:
+            self.stdout.write(self.style.SUCCESS(f"+ {name}"))
+        for name, changes in diff.updated:
+            detail = ", ".join(f"{f}: {_show(old)} -> {_show(new)}" for f, (old, new) in changes.items())
+            self.stdout.write(self.style.WARNING(f"~ {name} ({detail})"))
+        for name in diff.missing:
+            self.stdout.write(f"? {name} (in the database, not in the catalog; left alone)")
+
+        summary = (
+            f"{len(diff.created)} created, {len(diff.updated)} updated, "
+            f"{diff.unchanged} unchanged"
+        )
+        if options['dry_run'] and diff.changed:
+            summary += " (dry run, nothing written)"
+        self.stdout.write(summary)
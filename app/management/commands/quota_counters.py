@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.utils.quotas import over_limit, rebuild_counters, verify_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the per-student event counters against the participations, "
+        "or rebuild them, and list students above FEST_EVENT_LIMITS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Recount every counter from the participations.")
+        parser.add_argument('--fail', action='store_true',
+                            help="Exit with an error if counters drifted or a limit is exceeded.")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            with transaction.atomic():
+                rows = rebuild_counters()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} counters"))
+
+        drift = verify_counters()
+        for (team_id, key, stage, etype), stored, actual in drift:
+            self.stdout.write(
+                f"team {team_id} / {key} ({stage}/{etype}): counter {stored}, actual {actual}"
+            )
+
+        over = over_limit()
+        for (team_id, key), stage, etype, total, limit in over:
+            self.stdout.write(
+                f"team {team_id} / {key}: {total} {stage}/{etype} events, limit {limit}"
+            )
+
+        summary = f"{len(drift)} drifted counter(s), {len(over)} student(s) over a limit"
+        if not drift and not over:
+            self.stdout.write(self.style.SUCCESS(summary))
+        elif options['fail']:
+            raise CommandError(summary)
+        else:
+            self.stdout.write(self.style.WARNING(summary))
+            if drift:
+                self.stdout.write("Run with --rebuild to fix the counters")
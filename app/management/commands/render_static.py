@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.utils.static_site import output_dir, render_site
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the public pages (home, event list, every event result and "
+        "team page) to static HTML. Only pages whose data changed since the "
+        "last run are rewritten; each file is swapped in atomically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default=None,
+                            help="Target directory (default: FEST_STATIC_SITE_DIR or ./public_site).")
+        parser.add_argument('--full', action='store_true',
+                            help="Re-render every page.")
+        parser.add_argument('--verbose-pages', action='store_true',
+                            help="List each rendered and removed page.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        report = render_site(options['output'], full=options['full'])
+        elapsed = time.perf_counter() - start
+
+        if options['verbose_pages']:
+            for page in report['rendered']:
+                self.stdout.write(f"+ {page}")
+            for page in report['removed']:
+                self.stdout.write(f"- {page}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(report['rendered'])} rendered, {report['skipped']} unchanged, "
+            f"{len(report['removed'])} removed in {elapsed:.2f}s "
+            f"-> {output_dir(options['output'])}"
+        ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.seed import seed_fest
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic fest (teams, participations, results) for testing and benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=12,
+                            help="Number of teams to create.")
+        parser.add_argument('--teams-per-event', type=int, default=None,
+                            help="Teams entering each event (default: all).")
+        parser.add_argument('--roster', type=int, default=40,
+                            help="Students per team, reused across events.")
+        parser.add_argument('--result-ratio', type=float, default=0.6,
+                            help="Fraction of events that get podium results.")
+        parser.add_argument('--seed', type=int, default=None,
+                            help="Random seed for reproducible data.")
+        parser.add_argument('--clear', action='store_true',
+                            help="Delete existing teams, participations and results first.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['result_ratio'] <= 1:
+            raise CommandError("--result-ratio must be between 0 and 1")
+
+        try:
+            counts = seed_fest(
+                teams=options['teams'],
+                teams_per_event=options['teams_per_event'],
+                roster_size=options['roster'],
+                result_ratio=options['result_ratio'],
+                seed=options['seed'],
+                clear=options['clear'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded {events} events, {teams} teams, "
+            "{participations} participations, {results} results".format(**counts)
+        ))
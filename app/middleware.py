@@ -0,0 +1,38 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .utils.cache import abegin_request, begin_request, end_request
+
+
+class DataVersionMiddleware:
+    """
+    Read the shared fest data version once per request. In-process
+    caches compare against it, so a write made by any worker is
+    noticed by every other worker on its next request.
+
+    Works natively under WSGI and ASGI; under ASGI the read goes
+    through the async ORM, so async views never leave the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            end_request(token)
+
+    async def __acall__(self, request):
+        token = await abegin_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            end_request(token)
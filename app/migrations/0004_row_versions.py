@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_add_campus_fest_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participation',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:19
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def publish_existing(apps, schema_editor):
+    # Everything entered before drafts existed was already public.
+    Result = apps.get_model('app', 'Result')
+    Result.objects.update(is_published=True, published_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_row_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='is_published',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(publish_existing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['event', 'position'], name='result_published_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['team', 'points'], name='result_published_team_idx'),
+        ),
+    ]
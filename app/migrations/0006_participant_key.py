@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:23
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def participant_key(name):
+    # Frozen copy of app.models.participant_key as of this migration; if
+    # the live one changes, a later migration must recompute the keys.
+    name = unicodedata.normalize('NFKC', str(name or '')).casefold()
+    return " ".join(re.sub(r"[.,'`]", " ", name).split())
+
+
+def fill_keys(apps, schema_editor):
+    Participation = apps.get_model('app', 'Participation')
+    batch = []
+    for row in Participation.objects.only('id', 'participant_name').iterator(chunk_size=2000):
+        row.participant_key = participant_key(row.participant_name)
+        batch.append(row)
+        if len(batch) >= 2000:
+            Participation.objects.bulk_update(batch, ['participant_key'])
+            batch = []
+    if batch:
+        Participation.objects.bulk_update(batch, ['participant_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_result_publishing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participation',
+            name='participant_key',
+            field=models.CharField(default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='participation',
+            index=models.Index(fields=['team', 'participant_key'], name='participation_person_idx'),
+        ),
+    ]
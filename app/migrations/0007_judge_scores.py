@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_participant_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='scoring',
+            field=models.CharField(choices=[('SUM', 'Total of judges'), ('MEAN', 'Average of judges'), ('TRIMMED', 'Average without highest and lowest')], default='SUM', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='JudgeScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('judge', models.CharField(max_length=100)),
+                ('score', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='judge_scores', to='app.event')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='judge_scores', to='app.team')),
+            ],
+            options={
+                'unique_together': {('event', 'team', 'judge')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Participation = apps.get_model('app', 'Participation')
+    ParticipantCounter = apps.get_model('app', 'ParticipantCounter')
+    rows = (
+        Participation.objects
+        .values_list('team_id', 'participant_key', 'event__stage_type', 'event__event_type')
+        .annotate(entries=Count('id'))
+        .order_by()
+    )
+    ParticipantCounter.objects.bulk_create(
+        [
+            ParticipantCounter(
+                team_id=team_id,
+                participant_key=key,
+                stage_type=stage,
+                event_type=etype,
+                entries=entries,
+            )
+            for team_id, key, stage, etype, entries in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_event_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_key', models.CharField(max_length=150)),
+                ('stage_type', models.CharField(max_length=10)),
+                ('event_type', models.CharField(max_length=10)),
+                ('entries', models.IntegerField(default=0)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participant_counters', to='app.team')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('team', 'participant_key', 'stage_type', 'event_type'), name='participant_counter_unique')],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
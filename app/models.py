@@ -1,6 +1,18 @@
+import re
+import unicodedata
+
 from django.db import models
 
 
+def participant_key(name):
+    """
+    Canonical form of a participant name, used to recognise the same
+    student across events: "Anjali  K." and "anjali k" share a key.
+    """
+    name = unicodedata.normalize('NFKC', str(name or '')).casefold()
+    return " ".join(re.sub(r"[.,'`]", " ", name).split())
+
+
 class Event(models.Model):
     STAGE_TYPE_CHOICES = (
         ('ON_STAGE', 'On Stage'),
@@ -21,8 +33,26 @@ class Event(models.Model):
         max_length=10,
         choices=EVENT_TYPE_CHOICES
     )
+    SCORING_CHOICES = (
+        ('SUM', 'Total of judges'),
+        ('MEAN', 'Average of judges'),
+        ('TRIMMED', 'Average without highest and lowest'),
+    )
+
     min_team_size = models.PositiveIntegerField(default=1)
     max_team_size = models.PositiveIntegerField(default=1)
+    # How judges' marks are combined by utils.judging.compute_results
+    scoring = models.CharField(
+        max_length=10,
+        choices=SCORING_CHOICES,
+        default='SUM'
+    )
+
+    # Schedule; utils.schedule reports students booked into
+    # overlapping events and double-booked venues.
+    venue = models.CharField(max_length=100, blank=True)
+    start_time = models.DateTimeField(null=True, blank=True)
+    end_time = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.name
@@ -48,14 +78,65 @@ class Participation(models.Model):
         related_name='participations'
     )
     participant_name = models.CharField(max_length=150)
+    # participant_key(participant_name); set by save() and by every
+    # bulk path, since bulk_create/bulk_update skip save().
+    participant_key = models.CharField(max_length=150, default='', editable=False)
+    # Bumped on every update; writers send the version they read and
+    # the UPDATE only applies if nobody changed the row in between.
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('event', 'team', 'participant_name')
+        indexes = [
+            models.Index(fields=['team', 'participant_key'], name='participation_person_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.participant_key = participant_key(self.participant_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'participant_name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'participant_key'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.participant_name} - {self.team.team_name}"
 
 
+class ParticipantCounter(models.Model):
+    """
+    How many events of one stage/event type a student has entered.
+
+    A student is ``(team, participant_key)``. Rows are kept in step
+    with participation inserts and deletes by utils.quotas, inside the
+    same transaction, so quota checks read one row instead of counting.
+    """
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name='participant_counters'
+    )
+    participant_key = models.CharField(max_length=150)
+    stage_type = models.CharField(max_length=10)
+    event_type = models.CharField(max_length=10)
+    entries = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['team', 'participant_key', 'stage_type', 'event_type'],
+                name='participant_counter_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.participant_key} ({self.stage_type}/{self.event_type}): {self.entries}"
+
+
+class ResultQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_published=True)
+
+
 class Result(models.Model):
     event = models.ForeignKey(
         Event,
@@ -69,10 +150,63 @@ class Result(models.Model):
     )
     position = models.PositiveIntegerField()
     points = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+    # Results are entered as drafts and only reach public pages once
+    # the whole event is published (see utils.results.publish_event_results).
+    is_published = models.BooleanField(default=False)
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ResultQuerySet.as_manager()
 
     class Meta:
         unique_together = ('event', 'team')
         ordering = ['position']
+        indexes = [
+            models.Index(
+                fields=['event', 'position'],
+                condition=models.Q(is_published=True),
+                name='result_published_event_idx',
+            ),
+            models.Index(
+                fields=['team', 'points'],
+                condition=models.Q(is_published=True),
+                name='result_published_team_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.event.name} - {self.team.team_name} (Position {self.position})"
+
+
+class JudgeScore(models.Model):
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='judge_scores'
+    )
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name='judge_scores'
+    )
+    judge = models.CharField(max_length=100)
+    score = models.DecimalField(max_digits=6, decimal_places=2)
+
+    class Meta:
+        unique_together = ('event', 'team', 'judge')
+
+    def __str__(self):
+        return f"{self.event.name} - {self.team.team_name} ({self.judge}: {self.score})"
+
+
+class DataVersion(models.Model):
+    """
+    Single row (pk=1) counting writes to fest data. Every process
+    compares it with the version its in-memory caches were built for,
+    so a write in one gunicorn worker invalidates them all.
+    """
+    version = models.PositiveBigIntegerField(default=1)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Data version {self.version}"
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Event, Team, Participation, Result
+from .utils.cache import bump_on_commit
+
+
+# Sent once after an event's results go public (or are withdrawn), when
+# the transaction has committed. Anything that pushes updates to viewers
+# should listen here instead of on per-row saves. Arguments: event,
+# published (bool), count.
+results_published = Signal()
+
+
+# Every bump also refreshes the static site when FEST_STATIC_SITE_DIR is
+# set (see utils.cache.bump_on_commit).
+#
+# Bulk paths (bulk_create / bulk_update / queryset.update) do not send
+# these signals and call bump_on_commit() themselves. Participation has
+# no post_delete receiver on purpose: it would stop Django from deleting
+# rosters with a single query, so deleting code bumps explicitly.
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Participation)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Team)
+def fest_data_changed(sender, **kwargs):
+    bump_on_commit()
+
+
+# Draft results are invisible to public pages, so saving or deleting
+# one does not invalidate anything.
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, instance, **kwargs):
+    if instance.is_published:
+        bump_on_commit()
+
@@ -1,10 +1,1042 @@
-from django.test import TestCase
-
-# Create your tests here.
-    # Y_TITLE      = height - 300
-    # Y_FEST       = height - 205
-    # Y_SUBTITLE   = height - 235
-    # Y_NAME       = height - 350
-    # Y_BODY_START = height - 400
-    # Y_SIGNATURE  = 160
-    # Y_FOOTER     = 95
\ No newline at end of file
+import gzip
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import (
+    AsyncClient,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from app.cache_backends import SQLiteCache
+from app.forms import ResultForm
+from app.models import (
+    Event,
+    JudgeScore,
+    ParticipantCounter,
+    Participation,
+    Result,
+    Team,
+    participant_key,
+)
+from app.signals import results_published
+from app.utils import importer, snapshot, static_site
+from app.utils.cache import data_version
+from app.utils.catalog import load_catalog
+from app.utils.clinch import ALIVE, CLINCHED, ELIMINATED, Race
+from app.utils.concurrency import ConflictError, create_or_conflict, save_versioned
+from app.utils.pagination import encode_cursor
+from app.utils.participations import save_group_participation, save_single_participation
+from app.utils.quotas import (
+    entry_errors,
+    move_event,
+    over_limit,
+    rebuild_counters,
+    release,
+    verify_counters,
+)
+from app.utils.readmodel import fest
+from app.utils.results import publish_event_results, save_event_results
+from app.utils.seed import seed_fest
+from app.utils.standings import build_individual
+
+
+def run_threads(target, count):
+    """Run ``target(n)`` in ``count`` threads, each on its own connection; re-raise the first error."""
+    errors = []
+
+    def wrapper(n):
+        try:
+            target(n)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=wrapper, args=(n,)) for n in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+# ===============================
+# CONCURRENT RESULT ENTRY
+# ===============================
+class ConcurrentResultEntryTests(TransactionTestCase):
+    """Several desks editing the same results at once must not lose a save."""
+
+    THREADS = 6
+    EDITS = 15
+    RETRIES = 100
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=4, roster_size=5, result_ratio=1, seed=1)
+
+    def _edit_until_saved(self, edit, rng):
+        """Call ``edit()`` until it saves, reloading on conflict like a desk would."""
+        for _ in range(self.RETRIES):
+            try:
+                edit()
+            except ConflictError:
+                time.sleep(rng.uniform(0, 0.002))
+                continue
+            return True
+        return False
+
+    def test_versioned_saves_lose_no_updates(self):
+        ids = list(Result.objects.order_by('id').values_list('id', flat=True)[:3])
+        Result.objects.filter(id__in=ids).update(points=0, version=0)
+        saved = []
+
+        def desk(n):
+            rng = random.Random(n)
+
+            def edit():
+                result = Result.objects.only('id', 'points', 'version').get(pk=rng.choice(ids))
+                time.sleep(rng.uniform(0, 0.002))
+                result.points += 1
+                save_versioned(result, ['points'])
+
+            for _ in range(self.EDITS):
+                if self._edit_until_saved(edit, rng):
+                    saved.append(n)
+
+        run_threads(desk, self.THREADS)
+
+        rows = Result.objects.filter(id__in=ids)
+        self.assertEqual(sum(rows.values_list('points', flat=True)), len(saved))
+        self.assertEqual(sum(rows.values_list('version', flat=True)), len(saved))
+
+    def test_result_sheets_lose_no_updates(self):
+        # Every save bumps the version once, so versions count the saves.
+        result = Result.objects.order_by('id').first()
+        event, team_id = result.event, result.team_id
+        saved = []
+
+        def desk(n):
+            rng = random.Random(n)
+
+            def edit():
+                position, points, version = (
+                    Result.objects.filter(event=event, team_id=team_id)
+                    .values_list('position', 'points', 'version')
+                    .get()
+                )
+                time.sleep(rng.uniform(0, 0.002))
+                save_event_results(event, [{
+                    'team': team_id,
+                    'position': position,
+                    'points': points,
+                    'version': version,
+                }])
+
+            for _ in range(self.EDITS):
+                if self._edit_until_saved(edit, rng):
+                    saved.append(n)
+
+        run_threads(desk, self.THREADS)
+
+        version = result.version
+        result.refresh_from_db()
+        self.assertEqual(result.version - version, len(saved))
+
+    def test_create_race_has_one_winner(self):
+        event_id, team_id = (
+            Participation.objects
+            .values_list('event_id', 'team_id')
+            .order_by('event_id', 'team_id')
+            .first()
+        )
+        Result.objects.filter(event_id=event_id, team_id=team_id).delete()
+        barrier = threading.Barrier(self.THREADS)
+        outcome = []
+
+        def desk(n):
+            barrier.wait()
+            try:
+                create_or_conflict(Result(event_id=event_id, team_id=team_id, position=n + 1))
+            except ConflictError:
+                outcome.append('lost')
+            else:
+                outcome.append('won')
+
+        run_threads(desk, self.THREADS)
+
+        self.assertEqual(outcome.count('won'), 1)
+        self.assertEqual(Result.objects.filter(event_id=event_id, team_id=team_id).count(), 1)
+
+
+# ===============================
+# CACHE INVALIDATION ACROSS WORKERS
+# ===============================
+# Stands in for one gunicorn worker: each line on stdin is a request
+# for a team id, answered with the data version it saw and whether its
+# cached read model has that team.
+INVALIDATION_WORKER = """
+import os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CampusFest.settings')
+import django
+django.setup()
+
+from django.db import connection
+from django.test import override_settings
+
+connection.settings_dict['NAME'] = sys.argv[1]
+
+with override_settings(CACHES={'default': {
+    'BACKEND': 'app.cache_backends.SQLiteCache', 'LOCATION': sys.argv[2],
+}}):
+    from app.utils.cache import begin_request, data_version, end_request
+    from app.utils.readmodel import fest
+
+    for line in sys.stdin:
+        token = begin_request()
+        try:
+            print(data_version(), int(int(line) in fest().teams), flush=True)
+        finally:
+            end_request(token)
+"""
+
+
+class CrossProcessInvalidationTests(TransactionTestCase):
+    """A write in one process must reach every worker's warm cache on its next request."""
+
+    WORKERS = 3
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.cache_path = os.path.join(tmpdir.name, 'cache.sqlite3')
+        override = override_settings(CACHES={'default': {
+            'BACKEND': 'app.cache_backends.SQLiteCache', 'LOCATION': self.cache_path,
+        }})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.workers = [self._spawn() for _ in range(self.WORKERS)]
+
+    def _spawn(self):
+        proc = subprocess.Popen(
+            [sys.executable, '-c', INVALIDATION_WORKER,
+             str(connection.settings_dict['NAME']), self.cache_path],
+            cwd=settings.BASE_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(self._stop, proc)
+        return proc
+
+    def _stop(self, proc):
+        proc.stdin.close()
+        proc.stdout.close()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    def _ask(self, team_id):
+        for proc in self.workers:
+            proc.stdin.write(f"{team_id}\n")
+            proc.stdin.flush()
+        return [tuple(int(x) for x in proc.stdout.readline().split()) for proc in self.workers]
+
+    def test_workers_drop_stale_data_on_next_request(self):
+        warm = self._ask(0)
+        self.assertEqual(warm, [(data_version(), 0)] * self.WORKERS)
+
+        team = Team.objects.create(team_name="Probe", department="-")
+        self.assertEqual(self._ask(team.pk), [(data_version(), 1)] * self.WORKERS)
+
+        team_id = team.pk
+        team.delete()
+        self.assertEqual(self._ask(team_id), [(data_version(), 0)] * self.WORKERS)
+
+
+# ===============================
+# JUDGING TO RESULTS
+# ===============================
+class ComputedResultsTests(TestCase):
+    """Results computed from judges' marks must survive being saved from the results sheet."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=4, roster_size=5, result_ratio=0, seed=1)
+        self.event = Event.objects.filter(scoring='SUM').order_by('pk').first()
+        self.teams = sorted(set(
+            Participation.objects.filter(event=self.event).values_list('team_id', flat=True)
+        ))
+        self.client.force_login(User.objects.create_user("desk", password="x"))
+
+    def test_tied_results_can_be_saved_after_compute(self):
+        marks = {team_id: mark for team_id, mark in zip(self.teams, [9, 9, 5, 1])}
+        response = self.client.post(reverse('score_sheet', args=[self.event.pk]), dict(
+            {f'mark-{team_id}-0': mark for team_id, mark in marks.items()},
+            **{'judge-0': "Judge A", 'action': 'compute'},
+        ))
+        self.assertRedirects(response, reverse('result_bulk', args=[self.event.pk]))
+
+        computed = list(
+            Result.objects.filter(event=self.event)
+            .order_by('position', 'team_id')
+            .values_list('team_id', 'position', 'points', 'version')
+        )
+        self.assertEqual([row[1] for row in computed], [1, 1, 3])
+
+        form = {'action': 'save'}
+        for team_id, position, points, version in computed:
+            form[f'position-{team_id}'] = position
+            form[f'points-{team_id}'] = points
+            form[f'version-{team_id}'] = version
+        response = self.client.post(reverse('result_bulk', args=[self.event.pk]), form)
+        self.assertRedirects(response, reverse('result_list'))
+        self.assertEqual(
+            list(Result.objects.filter(event=self.event).order_by('position', 'team_id')
+                 .values_list('team_id', 'position', 'points')),
+            [row[:3] for row in computed],
+        )
+
+    def test_positions_inside_a_tie_are_rejected(self):
+        rows = [
+            {'team': self.teams[0], 'position': 1},
+            {'team': self.teams[1], 'position': 1},
+            {'team': self.teams[2], 'position': 2},
+        ]
+        with self.assertRaisesMessage(ValidationError, "2 teams tie at position 1"):
+            save_event_results(self.event, rows)
+        self.assertFalse(Result.objects.filter(event=self.event).exists())
+
+    def test_non_finite_marks_are_rejected(self):
+        url = reverse('score_sheet', args=[self.event.pk])
+        for value in ["nan", "NaN", "inf", "-Infinity", "sNaN", "1e30"]:
+            with self.subTest(value=value):
+                response = self.client.post(url, {
+                    f'mark-{self.teams[0]}-0': value,
+                    'judge-0': "Judge A",
+                })
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "is not a number")
+        self.assertFalse(JudgeScore.objects.filter(event=self.event).exists())
+
+
+# ===============================
+# EXPORTS
+# ===============================
+class ExportStreamingTests(TestCase):
+    """Exports stream chunk by chunk under both WSGI and ASGI."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, seed=1)
+        self.user = User.objects.create_user("desk", password="x")
+
+    def test_asgi_export_is_async_and_matches_wsgi(self):
+        url = reverse('export_data', args=['participations', 'csv'])
+        self.client.force_login(self.user)
+        wsgi = b"".join(self.client.get(url).streaming_content)
+
+        async def fetch():
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            response = await client.get(url)
+            self.assertTrue(response.is_async)
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(async_to_sync(fetch)(), wsgi)
+        self.assertEqual(wsgi.count(b"\n"), Participation.objects.count() + 1)
+
+
+# ===============================
+# PAGINATION
+# ===============================
+TAMPERED_CURSORS = [
+    "not-base64!",
+    encode_cursor({"a": 1}),
+    encode_cursor(["x", "y", "z"]),
+    encode_cursor(["x", "y", "z", "w"]),
+    encode_cursor([["x"], {}, None]),
+    encode_cursor([["x"], {}, None, 1]),
+    encode_cursor(["a", 1, 2 ** 70]),
+    "WyJhIiwxZTQwMCwiYiJd",         # ["a",1e400,"b"]
+]
+
+
+class TamperedCursorTests(TestCase):
+    """A cursor edited by hand gives the first page, never an error."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, seed=1)
+        self.client.force_login(User.objects.create_user("desk", password="x"))
+
+    def test_admin_lists_fall_back_to_first_page(self):
+        for name in ['event_list', 'team_list', 'participation_list', 'result_list']:
+            first = self.client.get(reverse(name), {'size': 5})
+            for cursor in TAMPERED_CURSORS:
+                with self.subTest(name=name, cursor=cursor):
+                    response = self.client.get(reverse(name), {'size': 5, 'after': cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.content, first.content)
+
+
+class ApiCursorTests(TestCase):
+    """The public API pages safely and answers HEAD like GET."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, result_ratio=1, seed=1)
+        Result.objects.update(is_published=True)
+
+    def test_tampered_cursor_gives_first_page(self):
+        for name in ['api_events', 'api_results', 'api_teams']:
+            first = self.client.get(reverse(name), {'size': 5}).json()
+            for cursor in TAMPERED_CURSORS:
+                with self.subTest(name=name, cursor=cursor):
+                    response = self.client.get(reverse(name), {'size': 5, 'cursor': cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json(), first)
+
+    def test_head_is_allowed(self):
+        get = self.client.get(reverse('api_results'))
+        head = self.client.head(reverse('api_results'))
+        self.assertEqual(head.status_code, 200)
+        self.assertEqual(head['ETag'], get['ETag'])
+        self.assertEqual(self.client.post(reverse('api_results')).status_code, 405)
+
+
+# ===============================
+# SEEDING
+# ===============================
+class SeedInvalidationTests(TestCase):
+    def test_seeding_refreshes_cached_public_data(self):
+        load_catalog()
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_fest(teams=3, roster_size=5, seed=1)
+        self.assertEqual(len(fest().teams), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_fest(teams=2, roster_size=5, seed=2)
+        self.assertEqual(len(fest().teams), 5)
+
+
+# ===============================
+# IMPORTS
+# ===============================
+class ImportRaceTests(TestCase):
+    def test_participant_added_meanwhile_is_a_row_error(self):
+        load_catalog()
+        seed_fest(teams=1, roster_size=5, seed=1)
+        team = Team.objects.get()
+        event = Event.objects.filter(min_team_size=1).order_by('pk').first()
+        Participation.objects.filter(event=event).delete()
+        rows = [(2, {'team': team.team_name, 'event': event.name, 'participant': "Zed Example"})]
+
+        write = importer._write
+
+        def other_desk_first(*args):
+            Participation.objects.create(event=event, team=team, participant_name="Zed Example")
+            write(*args)
+
+        with mock.patch.object(importer, '_write', other_desk_first):
+            report = importer.import_rows(rows, partial=True)
+
+        self.assertEqual(
+            report.errors,
+            [(2, f"'Zed Example' was registered for {event.name} at another desk during this import.")],
+        )
+        self.assertEqual(report.participations_created, 0)
+
+
+# ===============================
+# STATIC SITE
+# ===============================
+class StaticSiteRefreshTests(TransactionTestCase):
+    """Publishing refreshes the static copy without waiting for it."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = tmpdir.name
+        override = override_settings(
+            FEST_STATIC_SITE_DIR=self.root,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, result_ratio=0, seed=1)
+        self.event = Event.objects.filter(min_team_size=1).order_by('pk').first()
+        team_id = Participation.objects.filter(event=self.event).values_list('team_id', flat=True)[0]
+        Result.objects.create(event=self.event, team_id=team_id, position=1, points=5)
+
+    def _join(self):
+        thread = static_site._refresh['thread']
+        if thread is not None:
+            thread.join(30)
+            self.assertFalse(thread.is_alive())
+
+    def test_publish_does_not_wait_for_rendering(self):
+        started = threading.Event()
+        release = threading.Event()
+        finished = threading.Event()
+
+        def slow_render(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            finished.set()
+
+        with mock.patch.object(static_site, 'render_site', slow_render):
+            self.assertEqual(publish_event_results(self.event), 1)
+            self.assertFalse(finished.is_set())
+            self.assertTrue(started.wait(5))
+            release.set()
+            self._join()
+        self.assertTrue(finished.is_set())
+
+    def test_published_event_page_is_rendered(self):
+        publish_event_results(self.event)
+        self._join()
+        url = reverse('public_event_result', args=[self.event.pk])
+        page = os.path.join(self.root, url.strip('/'), 'index.html')
+        with open(page, encoding='utf-8') as f:
+            self.assertIn(self.event.name, f.read())
+
+    def _page(self):
+        url = reverse('public_event_result', args=[self.event.pk])
+        with open(os.path.join(self.root, url.strip('/'), 'index.html'), encoding='utf-8') as f:
+            return f.read()
+
+    def test_editing_published_data_re_renders(self):
+        publish_event_results(self.event)
+        self._join()
+        self.assertIn("<td>1</td>", self._page())
+
+        # Saved from the results sheet without publishing: stays public.
+        result = Result.objects.get(event=self.event)
+        save_event_results(self.event, [{
+            'team': result.team_id, 'position': 2, 'points': 3, 'version': result.version,
+        }])
+        self._join()
+        self.assertIn("<td>2</td>", self._page())
+
+        team = result.team
+        team.team_name = "Renamed Team"
+        team.save()
+        self._join()
+        self.assertIn("Renamed Team", self._page())
+
+
+# ===============================
+# CHAMPIONSHIP RACE
+# ===============================
+class RaceTests(TestCase):
+    """Clinch and elimination with 5 points for a win and two events left."""
+
+    FIRST_PLACE = 5
+
+    def race(self, points, eligible):
+        rows = [{'id': i + 1, 'points': p} for i, p in enumerate(points)]
+        return Race(rows, [101, 102], np.array(eligible, dtype=np.int8), self.FIRST_PLACE)
+
+    def statuses(self, race):
+        return [race.teams[i + 1]['status'] for i in range(len(race.teams))]
+
+    def test_clinched_leader(self):
+        # The runner-up can reach 12 + 10 = 22 at most; the leader has 23.
+        race = self.race([23, 12, 4], [[0, 0], [1, 1], [1, 1]])
+        self.assertEqual(self.statuses(race), [CLINCHED, ELIMINATED, ELIMINATED])
+        self.assertEqual(race.champion['id'], 1)
+        self.assertEqual(race.contenders, 1)
+
+    def test_eliminated_team(self):
+        # Team 3 entered one remaining event: 10 + 5 = 15 < 16.
+        race = self.race([16, 14, 10], [[1, 1], [1, 1], [1, 0]])
+        self.assertEqual(self.statuses(race), [ALIVE, ALIVE, ELIMINATED])
+        self.assertEqual(race.teams[3]['max_total'], 15)
+        self.assertIsNone(race.champion)
+
+    def test_open_race(self):
+        # Reaching the leader exactly keeps a team alive: it could tie.
+        race = self.race([20, 15, 10], [[1, 1], [1, 0], [1, 1]])
+        self.assertEqual(self.statuses(race), [ALIVE, ALIVE, ALIVE])
+        self.assertEqual(race.contenders, 3)
+        self.assertEqual([race.teams[i]['remaining'] for i in (1, 2, 3)], [2, 1, 2])
+
+
+class PointsLimitTests(TestCase):
+    """Entered points may not beat what the position is worth; the race relies on it."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, result_ratio=0, seed=1)
+        self.event = Event.objects.filter(min_team_size=1).order_by('pk').first()
+        self.team_id = (
+            Participation.objects.filter(event=self.event)
+            .values_list('team_id', flat=True).first()
+        )
+
+    def test_sheet_rejects_points_above_position_value(self):
+        with self.assertRaisesMessage(ValidationError, "position 1 is worth at most 5 points"):
+            save_event_results(self.event, [{'team': self.team_id, 'position': 1, 'points': 15}])
+        with self.assertRaisesMessage(ValidationError, "position 4 is worth at most 0 points"):
+            save_event_results(self.event, [{'team': self.team_id, 'position': 4, 'points': 1}])
+        save_event_results(self.event, [{'team': self.team_id, 'position': 2, 'points': 3}])
+
+    def test_form_rejects_points_above_position_value(self):
+        form = ResultForm(data={
+            'event': self.event.pk, 'team': self.team_id, 'position': 1, 'points': 15,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn("worth at most 5 points", form.errors['points'][0])
+
+
+# ===============================
+# GROUP ROSTERS
+# ===============================
+class GroupRosterTests(TestCase):
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=1, roster_size=8, result_ratio=0, seed=1)
+        self.team = Team.objects.get()
+        self.event = (
+            Event.objects.filter(min_team_size__lte=3, max_team_size__gte=3, participations__team=self.team)
+            .exclude(event_type='SINGLE').order_by('pk').first()
+        )
+        roster = Participation.objects.filter(event=self.event, team=self.team).order_by('pk')
+        self.rows = list(roster.values_list('pk', 'participant_name', 'version'))
+
+    def roster(self):
+        return dict(
+            Participation.objects.filter(event=self.event, team=self.team)
+            .values_list('pk', 'participant_name')
+        )
+
+    def test_names_can_swap_and_rotate_in_one_save(self):
+        (a, name_a, va), (b, name_b, vb), (c, name_c, vc) = self.rows[:3]
+
+        save_group_participation(
+            self.event, self.team,
+            renames={a: name_b, b: name_a}, versions={a: va, b: vb},
+        )
+        self.assertEqual((self.roster()[a], self.roster()[b]), (name_b, name_a))
+
+        save_group_participation(
+            self.event, self.team,
+            renames={a: name_c, b: name_b, c: name_a},
+            versions={a: va + 1, b: vb + 1, c: vc},
+        )
+        self.assertEqual(
+            (self.roster()[a], self.roster()[b], self.roster()[c]), (name_c, name_b, name_a)
+        )
+        self.assertEqual(
+            set(Participation.objects.filter(event=self.event, team=self.team)
+                .values_list('participant_key', flat=True)),
+            {participant_key(name) for name in self.roster().values()},
+        )
+
+
+# ===============================
+# PUBLISHING A PARTIAL SHEET
+# ===============================
+class PartialSheetPublishTests(TestCase):
+    """publish=True publishes the event, not only the rows on the sheet."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, result_ratio=0, seed=1)
+        self.event = Event.objects.filter(min_team_size=1).order_by('pk').first()
+        self.teams = list(
+            Participation.objects.filter(event=self.event)
+            .values_list('team_id', flat=True).distinct().order_by('team_id')[:2]
+        )
+
+    def test_publish_without_replace_publishes_earlier_drafts(self):
+        first, second = self.teams
+        save_event_results(self.event, [{'team': first, 'position': 1, 'points': 5}])
+        sent = []
+        results_published.connect(lambda **kw: sent.append(kw['count']), weak=False,
+                                  dispatch_uid='partial-sheet-test')
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                summary = save_event_results(
+                    self.event, [{'team': second, 'position': 2, 'points': 3}], publish=True,
+                )
+        finally:
+            results_published.disconnect(dispatch_uid='partial-sheet-test')
+
+        self.assertTrue(summary['published'])
+        self.assertEqual(
+            set(Result.objects.filter(event=self.event).values_list('team_id', 'is_published')),
+            {(first, True), (second, True)},
+        )
+        self.assertEqual(sent, [2])
+
+
+# ===============================
+# EVENT LIMITS
+# ===============================
+class QuotaTests(TestCase):
+    """The participant counters enforce FEST_EVENT_LIMITS and stay equal to a recount."""
+
+    def setUp(self):
+        self.team = Team.objects.create(team_name="Quota", department="Test")
+        self.singles = [
+            Event.objects.create(name=f"Solo {i}", stage_type='ON_STAGE', event_type='SINGLE')
+            for i in range(4)
+        ]
+        self.off_stage = Event.objects.create(
+            name="Essay", stage_type='OFF_STAGE', event_type='SINGLE'
+        )
+        self.groups = [
+            Event.objects.create(
+                name=f"Group {i}", stage_type='ON_STAGE', event_type='GROUP',
+                min_team_size=2, max_team_size=5,
+            )
+            for i in range(2)
+        ]
+
+    def enter(self, event, name):
+        return save_single_participation(
+            Participation(event=event, team=self.team, participant_name=name)
+        )
+
+    def counter(self, name, stage='ON_STAGE', etype='SINGLE'):
+        return ParticipantCounter.objects.get(
+            team=self.team, participant_key=participant_key(name),
+            stage_type=stage, event_type=etype,
+        ).entries
+
+    def test_single_entry_past_the_limit_is_rejected(self):
+        for event, name in zip(self.singles, ["Asha", "ASHA", " asha  "]):
+            self.enter(event, name)
+        self.assertEqual(self.counter("Asha"), 3)
+        self.assertIn(
+            "the limit is 3",
+            entry_errors(self.singles[3], self.team.pk, participant_key("Asha"), "Asha")[0],
+        )
+
+        with self.assertRaisesMessage(ValidationError, "Asha would be in 4 on stage single events"):
+            self.enter(self.singles[3], "Asha")
+        self.assertFalse(Participation.objects.filter(event=self.singles[3]).exists())
+        self.assertEqual(self.counter("Asha"), 3)
+        # Other limits are untouched
+        self.enter(self.off_stage, "Asha")
+
+    @override_settings(FEST_EVENT_LIMITS={('*', 'GROUP'): 1})
+    def test_group_roster_over_the_limit_is_rejected(self):
+        save_group_participation(self.groups[0], self.team, inserts=["Asha", "Ben"])
+        with self.assertRaisesMessage(ValidationError, "would be in 2 group events; the limit is 1"):
+            save_group_participation(self.groups[1], self.team, inserts=["asha", "Cy"])
+        self.assertFalse(Participation.objects.filter(event=self.groups[1]).exists())
+        self.assertEqual(self.counter("Asha", etype='GROUP'), 1)
+        self.assertEqual(verify_counters(), [])
+
+    def test_deleting_entries_releases_counters(self):
+        for event in self.singles[:3]:
+            self.enter(event, "Asha")
+
+        entries = Participation.objects.filter(event=self.singles[0], team=self.team)
+        with transaction.atomic():
+            release(entries)
+            entries.delete()
+        self.assertEqual(self.counter("Asha"), 2)
+
+        with transaction.atomic():
+            release(Participation.objects.filter(event=self.singles[1]))
+            self.singles[1].delete()
+        self.assertEqual(self.counter("Asha"), 1)
+
+        self.enter(self.singles[3], "Asha")
+        self.assertEqual(verify_counters(), [])
+
+    def test_changing_event_type_moves_counters(self):
+        for event in self.singles[:3]:
+            self.enter(event, "Asha")
+        self.enter(self.off_stage, "Asha")
+
+        event = self.off_stage
+        event.stage_type = 'ON_STAGE'
+        event.save()
+        move_event(event, 'OFF_STAGE', 'SINGLE')
+
+        self.assertEqual(self.counter("Asha"), 4)
+        self.assertEqual(self.counter("Asha", stage='OFF_STAGE'), 0)
+        self.assertEqual(verify_counters(), [])
+        self.assertEqual(
+            over_limit(),
+            [((self.team.pk, participant_key("Asha")), 'ON_STAGE', 'SINGLE', 4, 3)],
+        )
+
+    def test_rebuild_matches_live_counts(self):
+        for event, name in zip(self.singles, ["Asha", "asha", "Ben", "Cy"]):
+            self.enter(event, name)
+        self.enter(self.off_stage, "Ben")
+        save_group_participation(self.groups[0], self.team, inserts=["Asha", "Ben"])
+
+        ParticipantCounter.objects.update(entries=7)
+        self.assertNotEqual(verify_counters(), [])
+
+        live = Counter(
+            Participation.objects.values_list(
+                'team_id', 'participant_key', 'event__stage_type', 'event__event_type'
+            )
+        )
+        self.assertEqual(rebuild_counters(), len(live))
+        self.assertEqual(verify_counters(), [])
+        self.assertEqual(
+            dict(Counter({
+                (c.team_id, c.participant_key, c.stage_type, c.event_type): c.entries
+                for c in ParticipantCounter.objects.all()
+            })),
+            dict(live),
+        )
+
+
+# ===============================
+# SNAPSHOTS
+# ===============================
+class SnapshotTests(TestCase):
+    """A snapshot restores the fest exactly, and a damaged one changes nothing."""
+
+    def setUp(self):
+        load_catalog()
+        seed_fest(teams=3, roster_size=5, result_ratio=1, seed=1)
+        result = Result.objects.order_by('pk').first()
+        JudgeScore.objects.create(
+            event_id=result.event_id, team_id=result.team_id, judge="Judge A", score='8.50',
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'fest.jsonl.gz')
+
+    def rows(self):
+        return {
+            model._meta.label_lower: list(model.objects.order_by('pk').values_list())
+            for model in snapshot.MODELS
+        }
+
+    def test_round_trip_restores_rows_and_sequences(self):
+        before = self.rows()
+        counts = snapshot.export_snapshot(self.path)
+        self.assertEqual(counts, {label: len(rows) for label, rows in before.items()})
+
+        Team.objects.order_by('pk').first().delete()
+        Event.objects.create(name="Added later", stage_type='ON_STAGE', event_type='SINGLE')
+
+        self.assertEqual(snapshot.import_snapshot(self.path, replace=True), counts)
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(verify_counters(), [])
+
+        # Sequences continue after the restored keys
+        team = Team.objects.create(team_name="New", department="New")
+        self.assertGreater(team.pk, max(row[0] for row in before['app.team']))
+        event = Event.objects.create(name="New", stage_type='ON_STAGE', event_type='SINGLE')
+        self.assertGreater(event.pk, max(row[0] for row in before['app.event']))
+
+    def test_damaged_snapshot_leaves_database_untouched(self):
+        snapshot.export_snapshot(self.path)
+        with open(self.path, 'rb') as src:
+            data = src.read()
+        with gzip.open(self.path, 'rt', encoding='utf-8') as src:
+            lines = src.read().splitlines()
+        # Teams follow events, so a broken line there comes after real inserts
+        team_header = next(
+            i for i, line in enumerate(lines) if line.startswith('{"model": "app.team"')
+        )
+        before = self.rows()
+
+        cut = '[1, "cut'
+        damaged = {
+            'truncated': data[:len(data) // 2],
+            'bad json': self.gzip_lines(lines[:team_header + 2] + [cut] + lines[team_header + 2:]),
+            'short row': self.gzip_lines(lines[:team_header + 1] + ['[999]'] + lines[team_header + 1:]),
+        }
+        for label, content in damaged.items():
+            with self.subTest(label):
+                with open(self.path, 'wb') as out:
+                    out.write(content)
+                with self.assertRaises(snapshot.SnapshotError):
+                    snapshot.import_snapshot(self.path, replace=True)
+                self.assertEqual(self.rows(), before)
+
+    def gzip_lines(self, lines):
+        return gzip.compress(("\n".join(lines) + "\n").encode('utf-8'))
+
+
+# ===============================
+# INDIVIDUAL CHAMPIONSHIP
+# ===============================
+class IndividualStandingsTests(TestCase):
+    """build_individual adds up a student's published single-event results."""
+
+    def test_name_variants_collapse_into_one_student(self):
+        home = Team.objects.create(team_name="Home", department="Arts")
+        away = Team.objects.create(team_name="Away", department="Science")
+        solos = [
+            Event.objects.create(name=f"Solo {i}", stage_type='ON_STAGE', event_type='SINGLE')
+            for i in range(4)
+        ]
+        group = Event.objects.create(
+            name="Chorus", stage_type='ON_STAGE', event_type='GROUP', max_team_size=5,
+        )
+
+        for event, name in zip(solos, ["Anjali K.", "anjali  k", " ANJALI K "]):
+            Participation.objects.create(event=event, team=home, participant_name=name)
+        Participation.objects.create(event=solos[0], team=away, participant_name="Anjali K")
+        Participation.objects.create(event=solos[3], team=home, participant_name="Ben")
+        Participation.objects.create(event=group, team=home, participant_name="Anjali K.")
+
+        for event, team, position, points, published in [
+            (solos[0], home, 1, 5, True),
+            (solos[0], away, 2, 3, True),
+            (solos[1], home, 1, 5, True),
+            (solos[2], home, 3, 1, True),
+            (solos[3], home, 1, 5, False),
+            (group, home, 1, 5, True),
+        ]:
+            Result.objects.create(
+                event=event, team=team, position=position, points=points, is_published=published,
+            )
+
+        rows = {
+            (row['team_id'], row['participant_key']): row for row in build_individual()
+        }
+        self.assertEqual(set(rows), {(home.pk, "anjali k"), (away.pk, "anjali k")})
+
+        student = rows[(home.pk, "anjali k")]
+        self.assertEqual(
+            {k: student[k] for k in ('points', 'events', 'gold', 'silver', 'bronze', 'rank')},
+            {'points': 11, 'events': 3, 'gold': 2, 'silver': 0, 'bronze': 1, 'rank': 1},
+        )
+        self.assertEqual(student['team_name'], "Home")
+        namesake = rows[(away.pk, "anjali k")]
+        self.assertEqual((namesake['points'], namesake['silver'], namesake['rank']), (3, 1, 2))
+
+
+# ===============================
+# BROKEN UPLOADS
+# ===============================
+class BrokenUploadTests(TestCase):
+    """A file the CSV reader cannot parse is a form error, not a server error."""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(username="desk"))
+
+    def test_unreadable_csv_is_reported_on_the_form(self):
+        header = b"team,department,event,participant\n"
+        uploads = {
+            'not utf-8': (header + "Théâtre,Arts,,\n".encode('latin-1'), "not UTF-8 text"),
+            'nul byte': (header + b"Drama,Arts,,\x00\n", "NUL byte"),
+            'open quote': (header + b'Drama,Arts,,"Asha\n', "unexpected end of data"),
+            'stray quote': (header + b'Drama,Arts,,"Asha"K\n', "Line 2 is not valid CSV"),
+        }
+        for label, (content, message) in uploads.items():
+            with self.subTest(label):
+                response = self.client.post(reverse('participation_import'), {
+                    'file': SimpleUploadedFile("roster.csv", content, content_type='text/csv'),
+                })
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(message, response.context['form'].errors['file'][0])
+        self.assertFalse(Team.objects.exists())
+
+
+# ===============================
+# SQLITE CACHE
+# ===============================
+class SQLiteCacheTests(SimpleTestCase):
+    """add/incr are atomic across connections and culling drops the least recently used."""
+
+    def make_cache(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return SQLiteCache(os.path.join(directory.name, 'cache.sqlite3'), {'OPTIONS': options})
+
+    def test_add_stores_once_under_contention(self):
+        cache = self.make_cache()
+        won = []
+
+        def contend(n):
+            if cache.add('lock', n):
+                won.append(n)
+
+        run_threads(contend, 8)
+        self.assertEqual(len(won), 1)
+        self.assertEqual(cache.get('lock'), won[0])
+
+        cache.set('lease', 'old', timeout=-1)
+        self.assertTrue(cache.add('lease', 'new'))
+        self.assertFalse(cache.add('lease', 'newer'))
+        self.assertEqual(cache.get('lease'), 'new')
+
+    def test_incr_is_atomic_and_typed(self):
+        cache = self.make_cache()
+        cache.set('hits', 0)
+
+        def bump(n):
+            for _ in range(50):
+                cache.incr('hits')
+
+        run_threads(bump, 8)
+        self.assertEqual(cache.get('hits'), 400)
+        self.assertEqual(cache.decr('hits', 100), 300)
+
+        cache.set('label', 'not a number')
+        with self.assertRaises(TypeError):
+            cache.incr('label')
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        cache.set('stale', 1, timeout=-1)
+        with self.assertRaises(ValueError):
+            cache.incr('stale')
+
+    def test_cull_drops_least_recently_used(self):
+        cache = self.make_cache(MAX_ENTRIES=10, CULL_FREQUENCY=2)
+        for i in range(10):
+            cache.set(f'k{i}', i)
+
+        db = cache._db()
+
+        def accessed(name, when=None):
+            if when is not None:
+                db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (when, cache.make_key(name)))
+            return db.execute(
+                "SELECT accessed FROM cache WHERE key = ?", (cache.make_key(name),)
+            ).fetchone()[0]
+
+        for i in range(10):
+            accessed(f'k{i}', 1000 + i)
+        recent = accessed('k1', time.time() - 1)
+
+        # An old entry is touched by a read; a recent one is not rewritten.
+        self.assertEqual(cache.get('k0'), 0)
+        self.assertEqual(cache.get('k1'), 1)
+        self.assertGreater(accessed('k0'), recent)
+        self.assertEqual(accessed('k1'), recent)
+
+        cache.set('k10', 10)
+        self.assertEqual(
+            sorted(cache.get_many([f'k{i}' for i in range(11)])),
+            ['k0', 'k1', 'k10', 'k7', 'k8', 'k9'],
+        )
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
 
@@ -37,6 +37,7 @@ urlpatterns = [
     # --------------------
     path('ad/participations/', views.participation_list, name='participation_list'),
     path('ad/participations/add/', views.participation_add, name='participation_add'),
+    path('ad/participations/import/', views.participation_import, name='participation_import'),
     path(
     'ad/participations/<int:event_id>/<int:team_id>/edit/',
     views.participation_edit,
@@ -54,6 +55,10 @@ urlpatterns = [
     # --------------------
     path('ad/results/', views.result_list, name='result_list'),
     path('ad/results/add/', views.result_add, name='result_add'),
+    path('ad/events/<int:event_id>/results/', views.result_bulk, name='result_bulk'),
+    path('ad/events/<int:event_id>/results.json', views.result_bulk_api, name='result_bulk_api'),
+    path('ad/events/<int:event_id>/results/publish/', views.result_publish, name='result_publish'),
+    path('ad/events/<int:event_id>/scores/', views.score_sheet, name='score_sheet'),
     path('ad/results/<int:result_id>/edit/', views.result_edit, name='result_edit'),
     path('ad/results/<int:result_id>/delete/', views.result_delete, name='result_delete'),
     path(
@@ -77,6 +82,12 @@ urlpatterns = [
     name='team_detail'
 ),
 
+path(
+    'ad/exports/<slug:dataset>.<slug:fmt>',
+    views.export_data,
+    name='export_data'
+),
+
 path(
     'ad/reports/fest/',
     views.fest_full_report,
@@ -94,12 +105,26 @@ path(
     path('pevents/', views.public_event_list, name='public_event_list'),
     path('event/<int:event_id>/', views.public_event_result, name='public_event_result'),
     path('points/', views.points_table, name='points_table'),
+    path('individual/', views.individual_table, name='individual_table'),
     path(
     'team/<int:team_id>/',
     views.public_team_detail,
     name='public_team_detail'
 ),
 
+
+    # --------------------
+    # JSON API
+    # --------------------
+    path('api/v1/standings/', api.standings_api, name='api_standings'),
+    path('api/v1/individual/', api.individual_api, name='api_individual'),
+    path('api/v1/race/', api.race_api, name='api_race'),
+    path('api/v1/events/', api.events_api, name='api_events'),
+    path('api/v1/events/<int:event_id>/', api.event_api, name='api_event'),
+    path('api/v1/results/', api.results_api, name='api_results'),
+    path('api/v1/teams/', api.teams_api, name='api_teams'),
+    path('api/v1/teams/<int:team_id>/', api.team_api, name='api_team'),
+
     
 
 
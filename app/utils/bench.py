@@ -0,0 +1,79 @@
+import json
+import math
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of an unsorted sequence."""
+    if not values:
+        return 0.0
+    data = sorted(values)
+    k = (len(data) - 1) * (pct / 100)
+    lo = math.floor(k)
+    hi = math.ceil(k)
+    if lo == hi:
+        return data[int(k)]
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+
+def summarize(samples_ms):
+    return {
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'mean_ms': round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+        'runs': len(samples_ms),
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def write_report(path, report):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+def load_report(path):
+    return json.loads(Path(path).read_text())
+
+
+def find_regressions(baseline, current, threshold=0.2, metrics=('p95_ms',)):
+    """
+    Compare two ``{'results': {name: {...}}}`` reports.
+
+    A metric regresses when it grows by more than ``threshold`` (as a
+    fraction of the baseline). Query counts are compared exactly, since
+    one extra query per request is always worth a look.
+    """
+    regressions = []
+    old = baseline.get('results', {})
+
+    for name, row in current.get('results', {}).items():
+        base = old.get(name)
+        if not base:
+            continue
+
+        for metric in metrics:
+            before = base.get(metric)
+            after = row.get(metric)
+            if before is None or after is None:
+                continue
+            if before > 0 and (after - before) / before > threshold:
+                regressions.append((name, metric, before, after))
+
+        if 'queries' in base and row.get('queries', 0) > base['queries']:
+            regressions.append((name, 'queries', base['queries'], row['queries']))
+
+    return regressions
@@ -0,0 +1,137 @@
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.models import DataVersion
+
+
+# (version, changed_at) read once at the start of a request by
+# DataVersionMiddleware; None outside requests, where every call reads
+# the row.
+_current = ContextVar('fest_data_version', default=None)
+
+# name -> (version, value); swapped whole, so readers never see a half-built entry
+_memo = {}
+_MISSING = object()
+
+
+def _read():
+    row = DataVersion.objects.filter(pk=1).values_list('version', 'changed_at').first()
+    if row is None:
+        row = DataVersion.objects.get_or_create(pk=1)[0]
+        row = (row.version, row.changed_at)
+    return row
+
+
+async def _aread():
+    row = await DataVersion.objects.filter(pk=1).values_list('version', 'changed_at').afirst()
+    if row is None:
+        row = await sync_to_async(_read)()
+    return row
+
+
+def _state():
+    state = _current.get()
+    return state if state is not None else _read()
+
+
+def begin_request():
+    """Pin the data version for one request (one indexed read); returns a reset token."""
+    return _current.set(_read())
+
+
+async def abegin_request():
+    """``begin_request`` for the async middleware path (async ORM read)."""
+    return _current.set(await _aread())
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def data_version():
+    """
+    Current fest data version; any write to fest data bumps it. Kept
+    in the database so every worker process sees the same number.
+    """
+    return _state()[0]
+
+
+def bump_data_version():
+    """Increment the shared version atomically and return the new value."""
+    updated = DataVersion.objects.filter(pk=1).update(
+        version=F('version') + 1, changed_at=timezone.now()
+    )
+    if not updated:
+        DataVersion.objects.get_or_create(pk=1)
+        return bump_data_version()
+    state = _read()
+    if _current.get() is not None:
+        # Later reads in the same request must not serve the old data.
+        _current.set(state)
+    return state[0]
+
+
+def data_changed_at():
+    """When the data version last moved, for ``Last-Modified`` headers."""
+    return _state()[1].replace(microsecond=0)
+
+
+def bump_on_commit():
+    """
+    Bump the version once the current transaction commits, so nobody
+    caches pre-commit data under the new version, and bring the static
+    site (if one is configured) up to date in the background.
+    """
+    transaction.on_commit(_data_changed)
+
+
+def _data_changed():
+    bump_data_version()
+    if settings.FEST_STATIC_SITE_DIR:
+        from app.utils.static_site import refresh_in_background
+        refresh_in_background()
+
+
+def cached(name, builder):
+    """
+    Return ``builder()`` memoised in this process until the data
+    version changes.
+
+    On a miss the shared cache is asked first, so after a write one
+    worker builds the value and the others load its copy.
+    """
+    version, changed_at = _state()
+    entry = _memo.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    # The timestamp keeps a fresh database (which starts again at
+    # version 1) from picking up another database's values.
+    key = f"fest:{name}:{version}:{changed_at.timestamp()}"
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.add(key, value)
+    _memo[name] = (version, value)
+    return value
+
+
+async def acached(name, builder):
+    """
+    ``cached`` for async views. A hit in this process costs no query
+    and no thread hop; only a rebuild runs ``builder`` in the sync
+    thread, where the ORM may block.
+    """
+    state = _current.get()
+    if state is None:
+        state = await _aread()
+    entry = _memo.get(name)
+    if entry is not None and entry[0] == state[0]:
+        return entry[1]
+    return await sync_to_async(cached)(name, builder)
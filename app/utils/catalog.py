@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Event
+from app.utils.cache import bump_on_commit
+from app.utils.quotas import move_event
+
+
+DEFAULT_CATALOG = Path(settings.BASE_DIR) / 'app' / 'data' / 'events.json'
+
+REQUIRED = ['stage_type', 'event_type', 'min_team_size', 'max_team_size']
+# Only written when the catalog entry names them, so schedules and
+# scoring edited in the admin survive a reload.
+OPTIONAL = ['scoring', 'venue', 'start_time', 'end_time']
+FIELDS = REQUIRED + OPTIONAL
+
+
+class CatalogDiff:
+    def __init__(self):
+        self.created = []
+        self.updated = []     # (name, {field: (old, new)})
+        self.unchanged = 0
+        self.missing = []     # in the database, not in the catalog
+        self.current = {}     # name -> stored row
+
+    @property
+    def changed(self):
+        return bool(self.created or self.updated)
+
+
+def read_catalog(path=DEFAULT_CATALOG):
+    """
+    Parse and validate the catalog file. Returns ``{name: entry}``;
+    raises ``ValidationError`` listing every bad entry.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('events') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValidationError("The catalog must be a list of events (or {\"events\": [...]}).")
+
+    errors = []
+    catalog = {}
+    for i, raw in enumerate(entries, start=1):
+        name = " ".join(str(raw.get('name') or '').split()) if isinstance(raw, dict) else ''
+        if not name:
+            errors.append(f"Entry {i}: a name is required.")
+            continue
+        if name in catalog:
+            errors.append(f"Entry {i}: '{name}' is listed twice.")
+            continue
+
+        unknown = set(raw) - set(FIELDS) - {'name'}
+        if unknown:
+            errors.append(f"{name}: unknown field(s) {', '.join(sorted(unknown))}.")
+        missing = [f for f in REQUIRED if f not in raw]
+        if missing:
+            errors.append(f"{name}: missing {', '.join(missing)}.")
+            continue
+
+        entry = {'name': name}
+        for field_name in FIELDS:
+            if field_name not in raw:
+                continue
+            field = Event._meta.get_field(field_name)
+            try:
+                value = field.clean(raw[field_name], None)
+            except ValidationError as exc:
+                errors.append(f"{name}: {field_name}: {' '.join(exc.messages)}")
+                continue
+            if field_name in ('start_time', 'end_time') and value and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            entry[field_name] = value
+
+        if entry.get('min_team_size', 0) > entry.get('max_team_size', 0):
+            errors.append(f"{name}: min_team_size is larger than max_team_size.")
+        start, end = entry.get('start_time'), entry.get('end_time')
+        if start and end and end <= start:
+            errors.append(f"{name}: end_time must be after start_time.")
+        catalog[name] = entry
+
+    if errors:
+        raise ValidationError(errors)
+    return catalog
+
+
+def diff_catalog(catalog):
+    """Compare the catalog with the events table (one query)."""
+    diff = CatalogDiff()
+    current = {
+        row['name']: row
+        for row in Event.objects.values('id', 'name', *FIELDS)
+    }
+
+    for name, entry in catalog.items():
+        row = current.get(name)
+        if row is None:
+            diff.created.append(name)
+            continue
+        changes = {
+            f: (row[f], entry[f])
+            for f in FIELDS
+            if f in entry and entry[f] != row[f]
+        }
+        if changes:
+            diff.updated.append((name, changes))
+        else:
+            diff.unchanged += 1
+
+    diff.missing = sorted(set(current) - set(catalog))
+    diff.current = current
+    return diff
+
+
+def load_catalog(path=DEFAULT_CATALOG, dry_run=False):
+    """
+    Upsert the catalog into ``Event``.
+
+    Only new and changed events are written, in one
+    ``bulk_create(update_conflicts=True)`` keyed on ``name``; when
+    nothing differs no write happens at all. Events missing from the
+    catalog are reported, never deleted (they may hold registrations).
+    Returns the ``CatalogDiff``.
+    """
+    catalog = read_catalog(path)
+    diff = diff_catalog(catalog)
+    if dry_run or not diff.changed:
+        return diff
+
+    defaults = {f: Event._meta.get_field(f).get_default() for f in FIELDS}
+    rows = []
+    for name in diff.created + [name for name, _ in diff.updated]:
+        # Fields the entry leaves out keep their stored value.
+        base = diff.current.get(name, defaults)
+        rows.append(Event(name=name, **{f: catalog[name].get(f, base[f]) for f in FIELDS}))
+
+    with transaction.atomic():
+        Event.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=FIELDS,
+        )
+        for name, changes in diff.updated:
+            if 'stage_type' in changes or 'event_type' in changes:
+                row = diff.current[name]
+                event = Event.objects.get(pk=row['id'])
+                move_event(event, row['stage_type'], row['event_type'])
+        bump_on_commit()
+
+    return diff
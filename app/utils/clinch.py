@@ -0,0 +1,124 @@
+import numpy as np
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from app.models import Event, Participation, Result
+from app.utils.cache import cached
+from app.utils.standings import standings
+
+
+CLINCHED = 'clinched'
+ELIMINATED = 'eliminated'
+ALIVE = 'alive'
+
+
+def _best_other(values):
+    """
+    For every index ``i`` the maximum of ``values`` over all other
+    indices, in O(n): the overall maximum, except at the argmax where
+    it is the runner-up.
+    """
+    if len(values) < 2:
+        return np.full(len(values), -np.inf)
+    top = np.argmax(values)
+    first = values[top]
+    second = np.max(np.delete(values, top))
+    best = np.full(len(values), first, dtype=float)
+    best[top] = second
+    return best
+
+
+class Race:
+    """
+    Championship race state for every team at once.
+
+    ``teams`` maps team id to ``{'max_total', 'remaining', 'status'}``;
+    ``rows`` is the overall standings table with those keys added.
+    """
+
+    def __init__(self, rows, remaining_events, eligible, first_place):
+        self.remaining_events = remaining_events
+        ids = [row['id'] for row in rows]
+
+        current = np.array([row['points'] for row in rows], dtype=float)
+        # teams x remaining events: 1 where the team can still score
+        if eligible.size:
+            potential = eligible @ np.full(eligible.shape[1], first_place, dtype=float)
+            remaining = eligible.sum(axis=1)
+        else:
+            potential = np.zeros(len(ids))
+            remaining = np.zeros(len(ids), dtype=int)
+        max_total = current + potential
+
+        # Clinched: even if this team scores nothing more and every
+        # rival wins all its remaining events, nobody catches up.
+        clinched = current > _best_other(max_total)
+        # Eliminated: winning everything still leaves it below a team
+        # that already has more points.
+        eliminated = max_total < _best_other(current)
+
+        self.teams = {}
+        self.rows = []
+        for i, row in enumerate(rows):
+            if clinched[i]:
+                status = CLINCHED
+            elif eliminated[i]:
+                status = ELIMINATED
+            else:
+                status = ALIVE
+            info = {
+                'max_total': int(max_total[i]),
+                'remaining': int(remaining[i]),
+                'status': status,
+            }
+            self.teams[ids[i]] = info
+            self.rows.append(dict(row, **info))
+
+        self.champion = next(
+            (row for row in self.rows if row['status'] == CLINCHED), None
+        )
+        self.contenders = sum(1 for row in self.rows if row['status'] != ELIMINATED)
+
+
+def build_race():
+    """
+    Two queries: events without published results, and which teams
+    entered them. Current points come from the cached standings cube.
+    """
+    rows = standings().table()
+    first_place = max(settings.FEST_POSITION_POINTS.values())
+
+    def published(ref):
+        return Exists(Result.objects.published().filter(event=OuterRef(ref)))
+
+    remaining_events = list(
+        Event.objects
+        .filter(~published('pk'))
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+    row_index = {row['id']: i for i, row in enumerate(rows)}
+    col_index = {pk: j for j, pk in enumerate(remaining_events)}
+    eligible = np.zeros((len(rows), len(remaining_events)), dtype=np.int8)
+
+    if remaining_events:
+        pairs = np.array(list(
+            Participation.objects
+            .filter(~published('event_id'))
+            .values_list('team_id', 'event_id')
+            .distinct()
+        ), dtype=np.int64).reshape(-1, 2)
+        if len(pairs):
+            team_rows = np.array([row_index.get(t, -1) for t in pairs[:, 0]])
+            event_cols = np.array([col_index.get(e, -1) for e in pairs[:, 1]])
+            # Rows written between the two queries are simply skipped.
+            known = (team_rows >= 0) & (event_cols >= 0)
+            eligible[team_rows[known], event_cols[known]] = 1
+
+    return Race(rows, remaining_events, eligible, first_place)
+
+
+def championship_race():
+    """Cached race state; recomputed only after fest data changes."""
+    return cached('standings:race', build_race)
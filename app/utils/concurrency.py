@@ -0,0 +1,107 @@
+from functools import reduce
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from app.utils.cache import bump_on_commit
+
+
+class ConflictError(Exception):
+    """Somebody else changed the row after it was read."""
+
+    default_message = (
+        "This entry was changed at another desk after you opened it. "
+        "Reload the page and enter your change again."
+    )
+
+    def __init__(self, message=None):
+        super().__init__(message or self.default_message)
+
+
+def save_versioned(instance, fields, bump=True):
+    """
+    Write ``fields`` of ``instance`` with a conditional UPDATE.
+
+    The row is only updated if its ``version`` still equals
+    ``instance.version``; the version is bumped in the same statement,
+    so no row lock is held beyond that one UPDATE. Raises
+    ``ConflictError`` if another writer got there first, including when
+    the write would break a unique constraint. Pass ``bump=False`` for
+    rows that public pages do not show, such as draft results.
+    """
+    model = type(instance)
+    values = {}
+    for name in fields:
+        field = model._meta.get_field(name)
+        values[field.attname] = getattr(instance, field.attname)
+
+    try:
+        with transaction.atomic():
+            updated = (
+                model.objects
+                .filter(pk=instance.pk, version=instance.version)
+                .update(version=F('version') + 1, **values)
+            )
+    except IntegrityError:
+        raise ConflictError(
+            "Another desk saved a conflicting entry at the same time. "
+            "Reload the page and check before saving again."
+        )
+
+    if not updated:
+        raise ConflictError()
+
+    instance.version += 1
+    if bump:
+        bump_on_commit()
+    return instance
+
+
+def create_or_conflict(instance):
+    """Insert ``instance``, turning a unique-constraint race into ``ConflictError``."""
+    try:
+        with transaction.atomic():
+            instance.save(force_insert=True)
+    except IntegrityError:
+        raise ConflictError(
+            "Another desk has just saved this entry. "
+            "Reload the list and edit the existing entry instead."
+        )
+    return instance
+
+
+def versions_match(pk_versions):
+    """``Q`` matching rows whose (pk, version) pairs are all unchanged."""
+    return reduce(
+        lambda a, b: a | b,
+        (Q(pk=pk, version=version) for pk, version in pk_versions.items()),
+        Q(pk__in=[]),
+    )
+
+
+def bulk_update_versioned(objs, fields, batch_size=200):
+    """
+    ``bulk_update`` that only writes rows still at ``obj.version - 1``.
+
+    Callers set ``version`` to the version they read plus one and list
+    it in ``fields``. Returns how many rows were written; fewer than
+    ``len(objs)`` means another writer got there first. Batched so the
+    version filter stays a modest OR.
+    """
+    updated = 0
+    for i in range(0, len(objs), batch_size):
+        batch = objs[i:i + batch_size]
+        updated += type(batch[0]).objects.filter(
+            versions_match({obj.pk: obj.version - 1 for obj in batch})
+        ).bulk_update(batch, fields)
+    return updated
+
+
+def delete_versioned(model, pk_versions, batch_size=200):
+    """Delete rows whose (pk, version) pairs are unchanged; returns how many went."""
+    items = list(pk_versions.items())
+    deleted = 0
+    for i in range(0, len(items), batch_size):
+        _, counts = model.objects.filter(versions_match(dict(items[i:i + batch_size]))).delete()
+        deleted += counts.get(model._meta.label, 0)
+    return deleted
@@ -0,0 +1,40 @@
+from django.db.models import Aggregate, TextField, Value
+
+
+# ASCII unit separator: never typed into a name field, so splitting is safe
+SEPARATOR = "\x1f"
+
+
+class GroupConcat(Aggregate):
+    """
+    Concatenate a column per group: ``GROUP_CONCAT`` on SQLite/MySQL,
+    ``STRING_AGG`` on PostgreSQL. Order inside a group is not
+    guaranteed; sort after ``split_concat()`` if it matters.
+    """
+
+    function = 'GROUP_CONCAT'
+    name = 'GroupConcat'
+    output_field = TextField()
+
+    def __init__(self, expression, separator=SEPARATOR, **extra):
+        super().__init__(expression, Value(separator), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function='STRING_AGG', **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template='%(function)s(%(distinct)s%(expressions)s)',
+            arg_joiner=' SEPARATOR ',
+            **extra_context
+        )
+
+
+def split_concat(value, separator=SEPARATOR):
+    if not value:
+        return []
+    return value.split(separator)
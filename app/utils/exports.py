@@ -0,0 +1,281 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from app.models import Participation, Result
+from app.utils.standings import standings
+
+
+CHUNK_SIZE = 2000
+# Rows buffered before a chunk is handed to the response
+BATCH_ROWS = 500
+
+
+# =====================================================
+# DATASETS
+# =====================================================
+def participation_rows():
+    return (
+        Participation.objects
+        .order_by('event__name', 'team__team_name', 'participant_name', 'id')
+        .values_list(
+            'event__name',
+            'event__stage_type',
+            'event__event_type',
+            'team__team_name',
+            'team__department',
+            'participant_name',
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def result_rows():
+    return (
+        Result.objects
+        .order_by('event__name', 'position', 'team__team_name', 'id')
+        .values_list(
+            'event__name',
+            'event__stage_type',
+            'event__event_type',
+            'team__team_name',
+            'team__department',
+            'position',
+            'points',
+            'is_published',
+            'published_at',
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def standing_rows():
+    # The cube is already in memory (one row per team).
+    for row in standings().table():
+        yield (
+            row['rank'], row['name'], row['department'],
+            row['points'], row['gold'], row['silver'], row['bronze'],
+        )
+
+
+DATASETS = {
+    'participations': (
+        ['event', 'stage_type', 'event_type', 'team', 'department', 'participant'],
+        participation_rows,
+    ),
+    'results': (
+        ['event', 'stage_type', 'event_type', 'team', 'department',
+         'position', 'points', 'published', 'published_at'],
+        result_rows,
+    ),
+    'standings': (
+        ['rank', 'team', 'department', 'points', 'gold', 'silver', 'bronze'],
+        standing_rows,
+    ),
+}
+
+
+# =====================================================
+# WRITERS
+# =====================================================
+def _batches(rows, size=BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens UTF-8 names (Malayalam included) correctly
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+
+    for batch in _batches(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+def stream_jsonl(header, rows):
+    for batch in _batches(rows):
+        yield "".join(
+            json.dumps(dict(zip(header, row)), default=str, ensure_ascii=False) + "\n"
+            for row in batch
+        ).encode()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, non-seekable file that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._written += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._written
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="2"><xf/><xf fontId="1" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+SHEET_TAIL = '</sheetData></worksheet>'
+
+# Control characters XML 1.0 cannot carry, e.g. pasted from Word
+XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _cell(value, style=''):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"{style}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c{style}><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.strftime('%Y-%m-%d %H:%M:%S')
+    text = escape(XML_ILLEGAL.sub('', str(value)))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(header, rows, sheet="Export"):
+    """
+    A one-sheet workbook written straight into a streaming zip: the
+    sheet XML is produced row batch by row batch and every compressed
+    chunk is yielded as soon as the zip writer emits it, so nothing but
+    the current batch is held in memory.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, body in XLSX_PARTS.items():
+            archive.writestr(name, body)
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as part:
+            part.write(SHEET_HEAD.encode())
+            part.write(
+                ('<row>' + ''.join(_cell(h, ' s="1"') for h in header) + '</row>').encode()
+            )
+            for batch in _batches(rows):
+                part.write("".join(
+                    '<row>' + ''.join(_cell(v) for v in row) + '</row>'
+                    for row in batch
+                ).encode())
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            part.write(SHEET_TAIL.encode())
+    yield sink.drain()
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export(dataset, fmt):
+    """``(chunks, content_type)`` for one dataset in one format; raises ``KeyError`` for unknown names."""
+    header, rows = DATASETS[dataset]
+    writer, content_type = FORMATS[fmt]
+    if fmt == 'xlsx':
+        return writer(header, rows(), sheet=dataset.title()), content_type
+    return writer(header, rows()), content_type
+
+
+async def astream(chunks):
+    """
+    ``chunks`` as an async iterator for ASGI servers, which read a plain
+    generator to the end before sending anything. Each chunk is pulled
+    in the request's sync thread, where the ORM cursor lives, and sent
+    as soon as it is ready.
+    """
+    chunks = iter(chunks)
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # A client that hangs up must not leave the cursor open.
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
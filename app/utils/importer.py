@@ -0,0 +1,343 @@
+import csv
+import io
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from app.models import Event, Team, Participation, participant_key
+from app.utils.cache import bump_on_commit
+from app.utils.quotas import apply_deltas, counters_for, entry_deltas, entry_errors
+
+
+# Accepted header spellings -> canonical column
+COLUMNS = {
+    'event': 'event',
+    'event name': 'event',
+    'team': 'team',
+    'team name': 'team',
+    'team_name': 'team',
+    'department': 'department',
+    'dept': 'department',
+    'participant': 'participant',
+    'participant name': 'participant',
+    'participant_name': 'participant',
+    'name': 'participant',
+}
+
+NAME_MAX = Participation._meta.get_field('participant_name').max_length
+TEAM_MAX = Team._meta.get_field('team_name').max_length
+DEPT_MAX = Team._meta.get_field('department').max_length
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.errors = []
+        self.teams_created = 0
+        self.participations_created = 0
+        self.dry_run = False
+
+    def error(self, row_no, message):
+        self.errors.append((row_no, message))
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _key(value):
+    return " ".join(str(value or "").split()).casefold()
+
+
+def _clean(value):
+    return " ".join(str(value or "").split())
+
+
+def _normalise_header(header):
+    return [COLUMNS.get(_key(h).replace('-', ' '), _key(h)) for h in header]
+
+
+def read_rows(fileobj, filename):
+    """
+    Yield ``(row_no, {column: value})`` from a CSV or XLSX upload
+    without loading the whole sheet into memory.
+    """
+    suffix = Path(filename or "").suffix.lower()
+
+    if suffix in ('.xlsx', '.xlsm'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("XLSX import needs the openpyxl package installed.")
+
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = _normalise_header(next(rows, ()) or ())
+            for row_no, values in enumerate(rows, start=2):
+                if values and any(v not in (None, "") for v in values):
+                    yield row_no, dict(zip(header, values))
+        finally:
+            workbook.close()
+        return
+
+    if suffix not in ('.csv', '.txt', ''):
+        raise ValueError(f"Unsupported file type '{suffix}'. Upload a .csv or .xlsx file.")
+
+    # Broken files surface as ValueError, which callers report to the user.
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text, strict=True)
+    try:
+        header = _normalise_header(next(reader, []))
+        for row_no, values in enumerate(reader, start=2):
+            if any('\x00' in v for v in values):
+                raise csv.Error("NUL byte in the data")
+            if any(v.strip() for v in values):
+                yield row_no, dict(zip(header, values))
+    except UnicodeDecodeError:
+        raise ValueError("The file is not UTF-8 text. Save it as \"CSV UTF-8\" and upload it again.")
+    except csv.Error as exc:
+        raise ValueError(f"Line {reader.line_num} is not valid CSV ({exc}). Is this a CSV file?")
+
+
+def import_rows(rows, dry_run=False, partial=False, batch_size=500):
+    """
+    Validate and bulk insert teams and participations.
+
+    Each row carries ``team`` and ``department`` and optionally
+    ``event`` and ``participant``; a row without an event only
+    registers the team. Everything is validated in memory against
+    preloaded indexes before the first write. With ``partial=False``
+    any error aborts the whole import, otherwise only the offending
+    rows (and teams that fall outside the event size limits) are skipped.
+    """
+    report = ImportReport()
+    report.dry_run = dry_run
+
+    events = {_key(e.name): e for e in Event.objects.all()}
+
+    teams = {}
+    ambiguous = set()
+    for team in Team.objects.only('id', 'team_name', 'department'):
+        key = _key(team.team_name)
+        if key in teams:
+            ambiguous.add(key)
+        teams[key] = team
+
+    new_teams = {}                # team key -> (team_name, department)
+    entries = []                  # (row_no, event, team key, participant)
+    seen = {}
+
+    # ================= PASS 1: ROWS =================
+    for row_no, row in rows:
+        report.rows += 1
+
+        team_name = _clean(row.get('team'))
+        department = _clean(row.get('department'))
+        event_name = _clean(row.get('event'))
+        participant = _clean(row.get('participant'))
+
+        if not team_name:
+            report.error(row_no, "Team name is required.")
+            continue
+        if len(team_name) > TEAM_MAX or len(department) > DEPT_MAX:
+            report.error(row_no, "Team or department name is too long.")
+            continue
+
+        team_key = _key(team_name)
+        if team_key in ambiguous:
+            report.error(row_no, f"Team '{team_name}' matches more than one existing team.")
+            continue
+
+        if team_key not in teams and team_key not in new_teams:
+            if not department:
+                report.error(row_no, f"New team '{team_name}' needs a department.")
+                continue
+            new_teams[team_key] = (team_name, department)
+
+        if not event_name and not participant:
+            continue  # team-only row
+
+        event = events.get(_key(event_name))
+        if event is None:
+            report.error(row_no, f"Unknown event '{event_name}'.")
+            continue
+        if not participant:
+            report.error(row_no, "Participant name is required.")
+            continue
+        if len(participant) > NAME_MAX:
+            report.error(row_no, "Participant name is too long.")
+            continue
+
+        dup_key = (event.id, team_key, participant)
+        if dup_key in seen:
+            report.error(row_no, f"Duplicate of row {seen[dup_key]}.")
+            continue
+        seen[dup_key] = row_no
+
+        entries.append((row_no, event, team_key, participant))
+
+    # ================= PASS 2: DATABASE STATE =================
+    existing_ids = {teams[k].id: k for k in {e[2] for e in entries} if k in teams}
+
+    existing_names = set()
+    existing_sizes = Counter()
+    for event_id, team_id, name in (
+        Participation.objects
+        .filter(team_id__in=existing_ids)
+        .values_list('event_id', 'team_id', 'participant_name')
+        .iterator(chunk_size=2000)
+    ):
+        team_key = existing_ids[team_id]
+        existing_names.add((event_id, team_key, name))
+        existing_sizes[(event_id, team_key)] += 1
+
+    groups = defaultdict(list)
+    for entry in entries:
+        row_no, event, team_key, participant = entry
+        if (event.id, team_key, participant) in existing_names:
+            report.error(row_no, f"'{participant}' is already registered for {event.name}.")
+            continue
+        groups[(event, team_key)].append(entry)
+
+    valid = []
+    for (event, team_key), group in groups.items():
+        size = existing_sizes[(event.id, team_key)] + len(group)
+        if not event.min_team_size <= size <= event.max_team_size:
+            for row_no, *_ in group:
+                report.error(
+                    row_no,
+                    f"{event.name} allows {event.min_team_size}-{event.max_team_size} "
+                    f"participants per team; this import would give {size}."
+                )
+            continue
+        valid.extend(group)
+
+    # ================= PASS 3: EVENT LIMITS =================
+    # Running counts per student start from the stored counters (one
+    # query), so every row is checked in O(1). Students of new teams
+    # start from zero and are keyed by the team key until created.
+    def person(team_key, participant):
+        team = teams.get(team_key)
+        return (team.id if team else team_key, participant_key(participant))
+
+    counts = counters_for(
+        person(team_key, participant)
+        for _, _, team_key, participant in valid
+        if team_key in teams
+    )
+    allowed = []
+    for entry in sorted(valid, key=lambda e: e[0]):
+        row_no, event, team_key, participant = entry
+        who = person(team_key, participant)
+        errors = entry_errors(event, *who, participant, counts=counts)
+        if errors:
+            report.error(row_no, errors[0])
+            continue
+        cells = counts[who]
+        kind = (event.stage_type, event.event_type)
+        cells[kind] = cells.get(kind, 0) + 1
+        allowed.append(entry)
+
+    if len(allowed) < len(valid):
+        # Dropped rows may leave a team short of the event minimum.
+        sizes = Counter((event.id, team_key) for _, event, team_key, _ in allowed)
+        short = set()
+        for row_no, event, team_key, _ in allowed:
+            size = existing_sizes[(event.id, team_key)] + sizes[(event.id, team_key)]
+            if size < event.min_team_size:
+                short.add(row_no)
+                report.error(
+                    row_no,
+                    f"{event.name} needs at least {event.min_team_size} participants "
+                    f"per team once over-limit rows are left out."
+                )
+        allowed = [entry for entry in allowed if entry[0] not in short]
+    valid = allowed
+
+    report.errors.sort()
+
+    if dry_run or (report.errors and not partial):
+        report.teams_created = len(new_teams) if dry_run else 0
+        report.participations_created = len(valid) if dry_run else 0
+        return report
+
+    # ================= WRITE =================
+    try:
+        # A copy: a rolled back write must not leave new team ids behind.
+        _write(valid, new_teams, dict(teams), batch_size)
+    except ValidationError as exc:
+        # Another desk registered the same students meanwhile.
+        for error in exc.messages:
+            report.error(0, error)
+        return report
+    except IntegrityError:
+        # Another desk added some of these participants after PASS 2.
+        for row_no, event, _, participant in _registered(valid, teams):
+            report.error(
+                row_no,
+                f"'{participant}' was registered for {event.name} at another desk "
+                "during this import.",
+            )
+        if not report.errors:
+            report.error(0, "Registrations changed at another desk during this import. Run it again.")
+        report.errors.sort()
+        return report
+
+    report.teams_created = len(new_teams)
+    report.participations_created = len(valid)
+    return report
+
+
+def _write(valid, new_teams, teams, batch_size):
+    with transaction.atomic():
+        if new_teams:
+            Team.objects.bulk_create(
+                [Team(team_name=n, department=d) for n, d in new_teams.values()],
+                batch_size=batch_size,
+            )
+            names = [n for n, _ in new_teams.values()]
+            for team in Team.objects.filter(team_name__in=names).only('id', 'team_name'):
+                teams.setdefault(_key(team.team_name), team)
+
+        Participation.objects.bulk_create(
+            [
+                Participation(
+                    event_id=event.id,
+                    team_id=teams[team_key].id,
+                    participant_name=participant,
+                    participant_key=participant_key(participant),
+                )
+                for _, event, team_key, participant in valid
+            ],
+            batch_size=batch_size,
+        )
+
+        deltas = Counter()
+        names = {}
+        for _, event, team_key, participant in valid:
+            who = (teams[team_key].id, participant_key(participant))
+            deltas.update(entry_deltas(event, added=[who]))
+            names[who] = participant
+        apply_deltas(deltas, names)
+        bump_on_commit()
+
+
+def _registered(entries, teams):
+    """Entries of existing teams whose participant is now stored for that event."""
+    ids = {teams[k].id for k in {e[2] for e in entries} if k in teams}
+    stored = set(
+        Participation.objects
+        .filter(team_id__in=ids)
+        .values_list('event_id', 'team_id', 'participant_name')
+    )
+    return [
+        entry for entry in entries
+        if entry[2] in teams and (entry[1].id, teams[entry[2]].id, entry[3]) in stored
+    ]
+
+
+def import_file(fileobj, filename, **kwargs):
+    return import_rows(read_rows(fileobj, filename), **kwargs)
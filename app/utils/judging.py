@@ -0,0 +1,253 @@
+import time
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import or_
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from app.models import Event, JudgeScore, Result
+from app.utils.cache import bump_on_commit
+from app.utils.concurrency import ConflictError, bulk_update_versioned, delete_versioned
+from app.utils.results import announce_results
+
+
+METHODS = {'SUM': 0, 'MEAN': 1, 'TRIMMED': 2}
+SCORE_MAX = Decimal('9999.99')
+
+_CHANGED = (
+    "Results were entered at another desk while they were being computed. "
+    "Reload and compute again."
+)
+
+
+def aggregate_scores(matrix, methods):
+    """
+    Combine a (pairs x judges) matrix of marks, NaN where a judge gave
+    no mark, into one score per row using that row's method code:
+    sum, mean, or mean without the single highest and lowest mark
+    (plain mean when fewer than three judges marked).
+    """
+    counts = np.sum(~np.isnan(matrix), axis=1)
+    total = np.nansum(matrix, axis=1)
+    high = np.nanmax(matrix, axis=1)
+    low = np.nanmin(matrix, axis=1)
+
+    mean = total / counts
+    trimmed = np.where(counts >= 3, (total - high - low) / np.maximum(counts - 2, 1), mean)
+    score = np.choose(methods, [total, mean, trimmed])
+    return score, high
+
+
+def rank_within(groups, score, tiebreak):
+    """
+    Competition ranks (1, 2, 2, 4) of ``score`` inside each group, best
+    first; ``tiebreak`` (the highest single mark) separates equal
+    scores. Rows still equal on both share a position.
+
+    Returns ``(order, ranks)``: ``order`` sorts the rows by group then
+    rank, and ``ranks[i]`` belongs to row ``order[i]``.
+    """
+    # Rounded so float noise from the mean does not split real ties
+    score = np.round(score, 4)
+    tiebreak = np.round(tiebreak, 4)
+    order = np.lexsort((-tiebreak, -score, groups))
+
+    g, s, t = groups[order], score[order], tiebreak[order]
+    index = np.arange(len(order))
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = g[1:] != g[:-1]
+    new_tie = new_group.copy()
+    new_tie[1:] |= (s[1:] != s[:-1]) | (t[1:] != t[:-1])
+
+    group_start = np.maximum.accumulate(np.where(new_group, index, 0))
+    tie_start = np.maximum.accumulate(np.where(new_tie, index, 0))
+    return order, tie_start - group_start + 1
+
+
+def rank_events(rows, scoring, position_points=None):
+    """
+    Positions for every event at once.
+
+    ``rows`` is a sequence of ``(event_id, team_id, judge, score)`` and
+    ``scoring`` maps event id to its method. Returns a list of
+    ``(event_id, team_id, position, points, score)`` for every team
+    placed within the paying positions, grouped by event.
+    """
+    position_points = position_points or settings.FEST_POSITION_POINTS
+    if not rows:
+        return []
+
+    events = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    teams = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    marks = np.fromiter((float(r[3]) for r in rows), dtype=float, count=len(rows))
+    _, judge_codes = np.unique([r[2] for r in rows], return_inverse=True)
+
+    # One matrix row per (event, team), one column per judge slot of
+    # that event; events with fewer judges leave NaN padding.
+    pairs, pair_of = np.unique(np.stack([events, teams], axis=1), axis=0, return_inverse=True)
+    event_judges, judge_of = np.unique(
+        np.stack([events, judge_codes], axis=1), axis=0, return_inverse=True
+    )
+    pair_of, judge_of = pair_of.ravel(), judge_of.ravel()
+    first_slot = np.searchsorted(event_judges[:, 0], event_judges[:, 0], side='left')
+    slot = judge_of - first_slot[judge_of]
+
+    matrix = np.full((len(pairs), slot.max() + 1), np.nan)
+    matrix[pair_of, slot] = marks
+
+    methods = np.array([METHODS[scoring.get(int(e), 'SUM')] for e in pairs[:, 0]])
+    score, high = aggregate_scores(matrix, methods)
+    order, ranks = rank_within(pairs[:, 0], score, high)
+
+    points = np.zeros(max(position_points) + 1, dtype=np.int64)
+    for position, value in position_points.items():
+        points[position] = value
+    placed = ranks < len(points)
+
+    return [
+        (int(pairs[i, 0]), int(pairs[i, 1]), int(rank), int(points[rank]), float(score[i]))
+        for i, rank in zip(order[placed], ranks[placed])
+    ]
+
+
+def compute_results(events=None, publish=False):
+    """
+    Turn judges' marks into ``Result`` rows for many events at once.
+
+    With ``events=None`` every event that has marks and no published
+    results is computed. Listed events are always recomputed, which
+    turns their results back into drafts unless ``publish=True``.
+    Everything is written in one transaction: stale results of those
+    events are removed and placed teams updated or inserted in bulk.
+    Deletes and updates only match rows still at the version read here;
+    if a desk changed one in between, nothing is written and
+    ``ConflictError`` is raised.
+    """
+    started = time.perf_counter()
+
+    scored = JudgeScore.objects.all()
+    if events is None:
+        scored = scored.exclude(Exists(
+            Result.objects.published().filter(event=OuterRef('event'))
+        ))
+    else:
+        scored = scored.filter(event__in=events)
+
+    rows = list(scored.values_list('event_id', 'team_id', 'judge', 'score'))
+    event_ids = sorted({r[0] for r in rows})
+    scoring = dict(Event.objects.filter(pk__in=event_ids).values_list('pk', 'scoring'))
+    ranking = time.perf_counter()
+    placed = rank_events(rows, scoring)
+    rank_ms = (time.perf_counter() - ranking) * 1000
+
+    existing = {
+        (event_id, team_id): (pk, version, published)
+        for pk, event_id, team_id, version, published in
+        Result.objects.filter(event_id__in=event_ids)
+        .values_list('pk', 'event_id', 'team_id', 'version', 'is_published')
+    }
+
+    published_at = timezone.now() if publish else None
+    objs = []
+    for event_id, team_id, position, points, _ in placed:
+        pk, version, _ = existing.get((event_id, team_id), (None, -1, False))
+        objs.append(Result(
+            pk=pk,
+            event_id=event_id,
+            team_id=team_id,
+            position=position,
+            points=points,
+            version=version + 1,
+            is_published=publish,
+            published_at=published_at,
+        ))
+
+    keep = {(r.event_id, r.team_id) for r in objs}
+    stale = {pk: version for key, (pk, version, _) in existing.items() if key not in keep}
+    public = publish or any(published for _, _, published in existing.values())
+    to_update = [r for r in objs if r.pk is not None]
+    to_create = [r for r in objs if r.pk is None]
+
+    try:
+        with transaction.atomic():
+            if stale and delete_versioned(Result, stale) != len(stale):
+                raise ConflictError(_CHANGED)
+            if to_update:
+                updated = bulk_update_versioned(
+                    to_update, ['position', 'points', 'version', 'is_published', 'published_at'],
+                )
+                if updated != len(to_update):
+                    raise ConflictError(_CHANGED)
+            if to_create:
+                Result.objects.bulk_create(to_create)
+            if public:
+                bump_on_commit()
+            if publish:
+                for event in Event.objects.filter(pk__in=event_ids):
+                    announce_results(event, True, sum(1 for r in objs if r.event_id == event.pk))
+    except IntegrityError:
+        raise ConflictError(_CHANGED)
+
+    return {
+        'events': len(event_ids),
+        'marks': len(rows),
+        'results': len(objs),
+        'removed': len(stale),
+        'rank_ms': round(rank_ms, 2),
+        'total_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def save_score_sheet(event, marks):
+    """
+    Store one event's score sheet.
+
+    ``marks`` maps ``(team_id, judge)`` to a mark, or to ``None`` to
+    clear it. Raises ``ValidationError`` listing bad marks; otherwise
+    upserts and clears everything in one transaction.
+    """
+    errors = []
+    upserts = []
+    clears = []
+
+    for (team_id, judge), value in marks.items():
+        judge = " ".join(str(judge).split())
+        if value in (None, ''):
+            clears.append((team_id, judge))
+            continue
+        try:
+            mark = Decimal(str(value))
+            if not mark.is_finite():
+                raise InvalidOperation
+            mark = mark.quantize(Decimal('0.01'))
+        except InvalidOperation:
+            errors.append(f"{judge}: '{value}' is not a number.")
+            continue
+        if mark < 0 or mark > SCORE_MAX:
+            errors.append(f"{judge}: marks must be between 0 and {SCORE_MAX}.")
+            continue
+        upserts.append(JudgeScore(event=event, team_id=team_id, judge=judge, score=mark))
+
+    if errors:
+        raise ValidationError(errors)
+
+    with transaction.atomic():
+        if clears:
+            JudgeScore.objects.filter(
+                reduce(or_, (Q(team_id=t, judge=j) for t, j in clears)),
+                event=event,
+            ).delete()
+        if upserts:
+            JudgeScore.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['event', 'team', 'judge'],
+                update_fields=['score'],
+            )
+
+    return {'saved': len(upserts), 'cleared': len(clears)}
@@ -0,0 +1,118 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return not self.cursor
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _scalar(value):
+    if isinstance(value, int):
+        return -2 ** 63 <= value < 2 ** 63
+    return isinstance(value, (str, float))
+
+
+def decode_cursor(token):
+    """The values in ``token``, or ``None`` unless it is a list of plain scalars."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or not all(_scalar(v) for v in values):
+        return None
+    return values
+
+
+def _value(row, field):
+    if isinstance(row, dict):
+        return row[field]
+    return attrgetter(field.replace('__', '.'))(row)
+
+
+def _after(ordering, values):
+    """
+    Build ``(a > x) | (a = x & b > y) | ...`` for a row-wise keyset
+    comparison, honouring ``-field`` for descending columns.
+    """
+    clauses = []
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        op = 'lt' if field.startswith('-') else 'gt'
+        equal = {
+            prev.lstrip('-'): values[j]
+            for j, prev in enumerate(ordering[:i])
+        }
+        clauses.append(Q(**equal, **{f'{name}__{op}': values[i]}))
+    return reduce(lambda a, b: a | b, clauses)
+
+
+def keyset_page(queryset, ordering, cursor=None, size=50):
+    """
+    Return one page of ``queryset`` after ``cursor``.
+
+    ``ordering`` must end in a unique column so the order is total.
+    Works on model instances and ``.values()`` dicts alike. Cost is one
+    range scan of ``size + 1`` rows, whatever page you are on. A cursor
+    that does not fit ``ordering`` (edited by hand, or from another
+    list) gives the first page.
+    """
+    names = [f.lstrip('-') for f in ordering]
+    values = decode_cursor(cursor)
+
+    queryset = queryset.order_by(*ordering)
+    if values and len(values) == len(ordering):
+        try:
+            # Each value is converted for its column here, so a wrong
+            # type fails now rather than when the query runs.
+            queryset = queryset.filter(_after(ordering, values))
+        except (TypeError, ValueError, OverflowError, ValidationError):
+            cursor = None
+    else:
+        cursor = None
+
+    rows = list(queryset[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor([_value(rows[-1], n) for n in names])
+
+    return KeysetPage(rows, next_cursor, cursor)
+
+
+def page_size(request, default=50, maximum=200):
+    try:
+        size = int(request.GET.get('size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
@@ -0,0 +1,214 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from app.models import Participation, participant_key
+from app.utils.cache import bump_on_commit
+from app.utils.concurrency import (
+    ConflictError,
+    create_or_conflict,
+    save_versioned,
+    versions_match,
+)
+from app.utils.quotas import apply_deltas, entry_deltas
+
+
+NAME_MAX = Participation._meta.get_field('participant_name').max_length
+
+
+def _clean_name(name):
+    return " ".join(str(name or "").split())
+
+
+def save_single_participation(participation):
+    """
+    Create one entry, or rename an existing one with ``save_versioned``
+    (``participation.version`` is the version the caller read), and
+    move the student's event counters with it in the same transaction.
+
+    Raises ``ConflictError`` on a concurrent change and
+    ``ValidationError`` if the student would pass an event limit.
+    """
+    event = participation.event
+    team_id = participation.team_id
+    old_key = participation.participant_key if participation.pk else None
+    new_key = participant_key(participation.participant_name)
+    participation.participant_key = new_key
+
+    with transaction.atomic():
+        if participation.pk:
+            save_versioned(participation, ['participant_name', 'participant_key'])
+        else:
+            create_or_conflict(participation)
+        if old_key != new_key:
+            apply_deltas(
+                entry_deltas(
+                    event,
+                    added=[(team_id, new_key)],
+                    removed=[(team_id, old_key)] if old_key is not None else [],
+                ),
+                {(team_id, new_key): participation.participant_name},
+            )
+    return participation
+
+
+def _renames_collide(renamed, current, deletes):
+    """True if a new name is still held by another row of the roster when renames start."""
+    held = {name: pk for pk, name in current.items() if pk not in deletes}
+    return any(held.get(obj.participant_name, obj.pk) != obj.pk for obj in renamed)
+
+
+def save_group_participation(event, team, inserts=(), renames=None, deletes=(), versions=None):
+    """
+    Apply a whole team's roster change for a group event in one go.
+
+    ``inserts`` are new participant names, ``renames`` maps existing
+    participation ids to their new name and ``deletes`` lists ids to
+    remove. The final roster is validated up front (names, duplicates,
+    the event's min/max team size) and then written in one transaction
+    with a fixed number of queries: one filtered delete, one
+    ``bulk_update`` and one ``bulk_create``, whatever the team size.
+
+    Raises ``ValidationError`` with every problem found; nothing is
+    written in that case. Students who would pass an event limit
+    (``FEST_EVENT_LIMITS``) are rejected the same way, after their
+    counters are updated inside the transaction.
+
+    ``versions`` maps participation ids to the version the caller read.
+    Renamed and deleted rows are only written if their version is
+    unchanged, otherwise ``ConflictError`` is raised and the whole
+    change is rolled back.
+    """
+    renames = {int(pk): _clean_name(name) for pk, name in (renames or {}).items()}
+    deletes = {int(pk) for pk in deletes}
+    inserts = [_clean_name(name) for name in inserts]
+
+    current = {}
+    current_versions = {}
+    for pk, name, version in (
+        Participation.objects
+        .filter(event=event, team=team)
+        .values_list('id', 'participant_name', 'version')
+    ):
+        current[pk] = name
+        current_versions[pk] = version
+
+    touched = set(renames) | deletes
+    if touched - set(current):
+        raise ConflictError(
+            "Some participants were removed at another desk. Reload and try again."
+        )
+
+    # Rows without a posted version are checked against what was just
+    # loaded, which still catches writers racing this request.
+    expected = {
+        pk: current_versions[pk]
+        for pk in touched
+    }
+    for pk, version in (versions or {}).items():
+        if int(pk) in expected and version is not None:
+            expected[int(pk)] = int(version)
+    if any(expected[pk] != current_versions[pk] for pk in expected):
+        raise ConflictError()
+
+    errors = []
+
+    roster = {
+        pk: renames.get(pk, name)
+        for pk, name in current.items()
+        if pk not in deletes
+    }
+    final = list(roster.values()) + inserts
+
+    if any(not name for name in final):
+        errors.append("Participant names cannot be empty.")
+    if any(len(name) > NAME_MAX for name in final):
+        errors.append(f"Participant names must be at most {NAME_MAX} characters.")
+
+    seen = set()
+    duplicates = sorted({n for n in final if n in seen or seen.add(n)})
+    if duplicates:
+        errors.append(f"Duplicate participants: {', '.join(duplicates)}.")
+
+    if len(final) < event.min_team_size:
+        errors.append(f"Minimum {event.min_team_size} participants required.")
+    if len(final) > event.max_team_size:
+        errors.append(f"Maximum {event.max_team_size} participants allowed.")
+
+    if errors:
+        raise ValidationError(errors)
+
+    to_update = [
+        Participation(
+            id=pk,
+            event=event,
+            team=team,
+            participant_name=name,
+            participant_key=participant_key(name),
+            version=expected[pk] + 1,
+        )
+        for pk, name in renames.items()
+        if pk not in deletes and current[pk] != name
+    ]
+    to_create = [
+        Participation(
+            event=event,
+            team=team,
+            participant_name=name,
+            participant_key=participant_key(name),
+        )
+        for name in inserts
+    ]
+
+    removed = [current[pk] for pk in deletes]
+    removed += [current[obj.pk] for obj in to_update]
+    added = [obj.participant_name for obj in to_update + to_create]
+    deltas = entry_deltas(
+        event,
+        added=[(team.pk, participant_key(name)) for name in added],
+        removed=[(team.pk, participant_key(name)) for name in removed],
+    )
+    names = {(team.pk, participant_key(name)): name for name in added}
+
+    try:
+        with transaction.atomic():
+            if deletes:
+                deleted, _ = Participation.objects.filter(
+                    versions_match({pk: expected[pk] for pk in deletes}),
+                    event=event,
+                    team=team,
+                ).delete()
+                if deleted != len(deletes):
+                    raise ConflictError()
+            if to_update:
+                unchanged = versions_match({obj.pk: expected[obj.pk] for obj in to_update})
+                if _renames_collide(to_update, current, deletes):
+                    # Names swapped or shifted within the roster: park the
+                    # renamed rows on placeholder names first, so no step
+                    # in between breaks the unique (event, team, name).
+                    parked = Participation.objects.filter(unchanged).bulk_update(
+                        [Participation(pk=obj.pk, participant_name=f"#renaming-{obj.pk}")
+                         for obj in to_update],
+                        ['participant_name'],
+                    )
+                    if parked != len(to_update):
+                        raise ConflictError()
+                updated = Participation.objects.filter(unchanged).bulk_update(
+                    to_update, ['participant_name', 'participant_key', 'version']
+                )
+                if updated != len(to_update):
+                    raise ConflictError()
+            if to_create:
+                Participation.objects.bulk_create(to_create)
+            apply_deltas(deltas, names)
+            bump_on_commit()
+    except IntegrityError:
+        # Another desk inserted the same name after we validated.
+        raise ConflictError(
+            "Another desk has just added one of these participants. Reload and try again."
+        )
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(deletes),
+    }
@@ -0,0 +1,238 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Count, Q
+
+from app.models import Event, Participation, ParticipantCounter
+
+
+ALL = '*'
+
+STAGE_LABELS = dict(Event.STAGE_TYPE_CHOICES)
+TYPE_LABELS = dict(Event.EVENT_TYPE_CHOICES)
+
+
+def _rules(stage_type, event_type):
+    """``(stage, type, limit)`` rules that an event of this kind counts towards."""
+    return [
+        (stage, etype, limit)
+        for (stage, etype), limit in settings.FEST_EVENT_LIMITS.items()
+        if stage in (ALL, stage_type) and etype in (ALL, event_type)
+    ]
+
+
+def _total(cells, stage, etype):
+    return sum(
+        entries for (s, e), entries in cells.items()
+        if stage in (ALL, s) and etype in (ALL, e)
+    )
+
+
+def _describe(name, stage, etype, total, limit):
+    kind = " ".join(
+        label.lower() for label in (
+            STAGE_LABELS.get(stage, ''),
+            TYPE_LABELS.get(etype, ''),
+        ) if label
+    )
+    kind = f"{kind} events" if kind else "events"
+    return f"{name} would be in {total} {kind}; the limit is {limit}."
+
+
+def _people_filter(people):
+    by_team = defaultdict(set)
+    for team_id, key in people:
+        by_team[team_id].add(key)
+    return Q(
+        *[Q(team_id=t, participant_key__in=keys) for t, keys in by_team.items()],
+        _connector=Q.OR,
+    )
+
+
+def counters_for(people):
+    """``{(team_id, key): {(stage_type, event_type): entries}}`` in one query."""
+    counts = defaultdict(dict)
+    people = list(people)
+    if not people:
+        return counts
+    for team_id, key, stage, etype, entries in (
+        ParticipantCounter.objects
+        .filter(_people_filter(people))
+        .values_list('team_id', 'participant_key', 'stage_type', 'event_type', 'entries')
+    ):
+        counts[(team_id, key)][(stage, etype)] = entries
+    return counts
+
+
+def entry_errors(event, team_id, key, name, counts=None, extra=1):
+    """
+    Rules broken if this student enters ``extra`` more events like
+    ``event``. Reads one student's counters, or ``counts`` when the
+    caller already loaded them.
+    """
+    if counts is None:
+        counts = counters_for([(team_id, key)])
+    cells = counts.get((team_id, key), {})
+    errors = []
+    for stage, etype, limit in _rules(event.stage_type, event.event_type):
+        total = _total(cells, stage, etype) + extra
+        if total > limit:
+            errors.append(_describe(name, stage, etype, total, limit))
+    return errors
+
+
+def apply_deltas(deltas, names=None, enforce=True):
+    """
+    Add ``deltas`` (``{(team_id, key, stage_type, event_type): change}``)
+    to the counters with one atomic upsert per cell.
+
+    Call inside the transaction that writes the participations. With
+    ``enforce`` the students who gained an entry are re-read after the
+    increment, so two desks racing on the same student both see the
+    final count, and ``ValidationError`` is raised (rolling everything
+    back) if a limit those entries count towards is exceeded.
+    """
+    deltas = {cell: change for cell, change in deltas.items() if change}
+    if not deltas:
+        return
+
+    table = connection.ops.quote_name(ParticipantCounter._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (team_id, participant_key, stage_type, event_type, entries) "
+            f"VALUES (%s, %s, %s, %s, %s) "
+            f"ON CONFLICT (team_id, participant_key, stage_type, event_type) "
+            f"DO UPDATE SET entries = {table}.entries + excluded.entries",
+            [cell + (change,) for cell, change in deltas.items()],
+        )
+
+    if not enforce:
+        return
+
+    gained = defaultdict(set)
+    for (team_id, key, stage, etype), change in deltas.items():
+        if change > 0:
+            gained[(team_id, key)].add((stage, etype))
+    if not gained:
+        return
+
+    names = names or {}
+    errors = []
+    for person, cells in counters_for(gained).items():
+        rules = {rule for kind in gained[person] for rule in _rules(*kind)}
+        for stage, etype, limit in sorted(rules):
+            total = _total(cells, stage, etype)
+            if total > limit:
+                errors.append(_describe(names.get(person, person[1]), stage, etype, total, limit))
+    if errors:
+        raise ValidationError(errors)
+
+
+def entry_deltas(event, added=(), removed=()):
+    """Counter changes for ``(team_id, key)`` pairs entering or leaving ``event``."""
+    deltas = Counter()
+    for team_id, key in added:
+        deltas[(team_id, key, event.stage_type, event.event_type)] += 1
+    for team_id, key in removed:
+        deltas[(team_id, key, event.stage_type, event.event_type)] -= 1
+    return deltas
+
+
+def release(participations):
+    """Take the rows of a participation queryset out of the counters before deleting them."""
+    deltas = Counter()
+    for row in participations.values_list(
+        'team_id', 'participant_key', 'event__stage_type', 'event__event_type'
+    ):
+        deltas[row] -= 1
+    apply_deltas(deltas, enforce=False)
+
+
+def move_event(event, old_stage_type, old_event_type):
+    """Re-file an event's entrants after its stage or event type changed."""
+    if (old_stage_type, old_event_type) == (event.stage_type, event.event_type):
+        return
+    deltas = Counter()
+    for team_id, key in Participation.objects.filter(event=event).values_list(
+        'team_id', 'participant_key'
+    ):
+        deltas[(team_id, key, old_stage_type, old_event_type)] -= 1
+        deltas[(team_id, key, event.stage_type, event.event_type)] += 1
+    apply_deltas(deltas, enforce=False)
+
+
+def _actual_counts(teams=None):
+    rows = Participation.objects.all()
+    if teams is not None:
+        rows = rows.filter(team__in=teams)
+    return {
+        (team_id, key, stage, etype): entries
+        for team_id, key, stage, etype, entries in (
+            rows
+            .values_list('team_id', 'participant_key', 'event__stage_type', 'event__event_type')
+            .annotate(entries=Count('id'))
+            .order_by()
+        )
+    }
+
+
+def _stored_counts(teams=None):
+    rows = ParticipantCounter.objects.filter(entries__gt=0)
+    if teams is not None:
+        rows = rows.filter(team__in=teams)
+    return {
+        (team_id, key, stage, etype): entries
+        for team_id, key, stage, etype, entries in rows.values_list(
+            'team_id', 'participant_key', 'stage_type', 'event_type', 'entries'
+        )
+    }
+
+
+def verify_counters():
+    """``[(cell, stored, actual)]`` for every counter that has drifted."""
+    actual = _actual_counts()
+    stored = _stored_counts()
+    return sorted(
+        (cell, stored.get(cell, 0), actual.get(cell, 0))
+        for cell in set(actual) | set(stored)
+        if stored.get(cell, 0) != actual.get(cell, 0)
+    )
+
+
+def rebuild_counters(teams=None, batch_size=1000):
+    """Recount from the participations with one grouped query; returns the row count."""
+    counts = _actual_counts(teams)
+    stale = ParticipantCounter.objects.all()
+    if teams is not None:
+        stale = stale.filter(team__in=teams)
+    stale.delete()
+    ParticipantCounter.objects.bulk_create(
+        [
+            ParticipantCounter(
+                team_id=team_id,
+                participant_key=key,
+                stage_type=stage,
+                event_type=etype,
+                entries=entries,
+            )
+            for (team_id, key, stage, etype), entries in counts.items()
+        ],
+        batch_size=batch_size,
+    )
+    return len(counts)
+
+
+def over_limit():
+    """Students already above a limit, e.g. after the limits were lowered."""
+    people = defaultdict(dict)
+    for (team_id, key, stage, etype), entries in _stored_counts().items():
+        people[(team_id, key)][(stage, etype)] = entries
+    found = []
+    for person, cells in people.items():
+        for (stage, etype), limit in settings.FEST_EVENT_LIMITS.items():
+            total = _total(cells, stage, etype)
+            if total > limit:
+                found.append((person, stage, etype, total, limit))
+    return sorted(found)
@@ -0,0 +1,143 @@
+from app.models import Event, Participation, Result, Team
+from app.utils.cache import acached, cached
+from app.utils.clinch import championship_race
+from app.utils.standings import standings
+
+
+# Plain slotted records: no model instances, no lazy relations, so a
+# template can walk them without ever reaching the database.
+class EventInfo:
+    __slots__ = (
+        'id', 'name', 'stage_type', 'event_type', 'venue', 'start_time',
+        'end_time', 'results', 'participants',
+    )
+
+    def __init__(self, id, name, stage_type, event_type, venue, start_time, end_time):
+        self.id = id
+        self.name = name
+        self.stage_type = stage_type
+        self.event_type = event_type
+        self.venue = venue
+        self.start_time = start_time
+        self.end_time = end_time
+        self.results = []          # published ResultInfo, by position
+        self.participants = []     # EntryInfo, in registration order
+
+
+class TeamInfo:
+    __slots__ = ('id', 'team_name', 'department', 'rank', 'tally', 'placings')
+
+    def __init__(self, id, team_name, department):
+        self.id = id
+        self.team_name = team_name
+        self.department = department
+        self.rank = None
+        self.tally = None
+        self.placings = []         # Placing, by position then event name
+
+
+class ResultInfo:
+    __slots__ = ('event', 'team', 'position', 'points')
+
+    def __init__(self, event, team, position, points):
+        self.event = event
+        self.team = team
+        self.position = position
+        self.points = points
+
+
+class EntryInfo:
+    __slots__ = ('team', 'participant_name')
+
+    def __init__(self, team, participant_name):
+        self.team = team
+        self.participant_name = participant_name
+
+
+class Placing:
+    __slots__ = ('event', 'result', 'participants')
+
+    def __init__(self, event, result):
+        self.event = event
+        self.result = result
+        self.participants = []     # names, alphabetical
+
+
+class FestReadModel:
+    """
+    Everything the public pages show, read once per data version.
+
+    ``events`` and ``teams`` map ids to slotted records with published
+    results, entrants and each team's placings already attached;
+    ``event_list`` is the programme order; ``cube`` and ``race`` are
+    the standings and championship race of the same version.
+    """
+
+    def __init__(self):
+        self.events = {
+            row[0]: EventInfo(*row)
+            for row in Event.objects.order_by('pk').values_list(
+                'id', 'name', 'stage_type', 'event_type', 'venue', 'start_time', 'end_time',
+            )
+        }
+        self.event_list = sorted(self.events.values(), key=lambda e: (e.stage_type, e.name))
+        self.teams = {
+            row[0]: TeamInfo(*row)
+            for row in Team.objects.order_by('pk').values_list('id', 'team_name', 'department')
+        }
+
+        placings = {}
+        for event_id, team_id, position, points in (
+            Result.objects.published()
+            .order_by('event_id', 'position', 'team_id')
+            .values_list('event_id', 'team_id', 'position', 'points')
+        ):
+            event = self.events.get(event_id)
+            team = self.teams.get(team_id)
+            if event is None or team is None:
+                continue
+            result = ResultInfo(event, team, position, points)
+            event.results.append(result)
+            placings[(team_id, event_id)] = Placing(event, result)
+
+        for event_id, team_id, name in (
+            Participation.objects
+            .order_by('pk')
+            .values_list('event_id', 'team_id', 'participant_name')
+            .iterator(chunk_size=5000)
+        ):
+            event = self.events.get(event_id)
+            team = self.teams.get(team_id)
+            if event is None or team is None:
+                continue
+            event.participants.append(EntryInfo(team, name))
+            placing = placings.get((team_id, event_id))
+            if placing is not None:
+                placing.participants.append(name)
+
+        for (team_id, _), placing in placings.items():
+            self.teams[team_id].placings.append(placing)
+
+        self.cube = standings()
+        self.race = championship_race()
+        for team in self.teams.values():
+            team.placings.sort(key=lambda p: (p.result.position, p.event.name))
+            for placing in team.placings:
+                placing.participants.sort()
+            team.tally = self.cube.tally(team=team.id)
+            team.rank = self.cube.rank_of(team.id)
+
+
+def fest():
+    """
+    The read model for the current data version. Built in a handful of
+    queries after a change, then served from memory with no queries
+    until the version moves again; the new model replaces the old one
+    in a single assignment, so a request sees one or the other.
+    """
+    return cached('readmodel', FestReadModel)
+
+
+async def afest():
+    """``fest()`` for async views."""
+    return await acached('readmodel', FestReadModel)
@@ -0,0 +1,211 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.models import Participation, Result
+from app.utils.cache import bump_on_commit
+from app.utils.concurrency import ConflictError, bulk_update_versioned, delete_versioned
+from app.signals import results_published
+
+
+def _as_int(value, label, errors, minimum):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        errors.append(f"{label} must be a whole number.")
+        return None
+    if number < minimum:
+        errors.append(f"{label} must be at least {minimum}.")
+        return None
+    return number
+
+
+def max_points(position):
+    """
+    Most points a result at ``position`` may carry: its
+    ``FEST_POSITION_POINTS`` value, 0 off the podium. The clinch
+    calculator relies on nobody scoring more.
+    """
+    return settings.FEST_POSITION_POINTS.get(position, 0)
+
+
+_CHANGED = (
+    "Results of {event} were changed at another desk while you were "
+    "entering them. Reload the sheet and enter them again."
+)
+
+
+def save_event_results(event, rows, replace=False, publish=False):
+    """
+    Save all results of one event in one transaction.
+
+    ``rows`` is an iterable of ``{'team': id, 'position': n, 'points': n}``
+    with an optional ``label`` used in error messages and an optional
+    ``version`` the caller read; if that row changed since, nothing is
+    written and ``ConflictError`` is raised. Existing rows are written
+    with a conditional ``bulk_update`` that only matches unchanged
+    versions (rows without a posted version are held to the version
+    read here), so a desk saving in between is never overwritten.
+    Teams are checked against one preloaded set of participating teams
+    and points against ``max_points(position)``.
+    Equal positions are ties, ranked like ``judging.rank_within``: when
+    n teams share position p, positions p+1 .. p+n-1 stay empty
+    (1, 1, 3). With ``replace=True`` results of
+    teams not listed are removed, so the submission becomes the whole
+    result sheet. Raises ``ValidationError`` listing every problem;
+    nothing is written in that case.
+
+    New results are drafts. Edits to already published results stay
+    published; with ``publish=True`` every result of the event, not
+    only the rows submitted, is published in the same transaction. The fest data version is bumped at most once,
+    and only if something public changed.
+    """
+    participating = set(
+        Participation.objects
+        .filter(event=event)
+        .values_list('team_id', flat=True)
+        .distinct()
+    )
+
+    existing = {
+        team_id: (pk, position, version, published)
+        for pk, team_id, position, version, published in
+        Result.objects.filter(event=event)
+        .values_list('pk', 'team_id', 'position', 'version', 'is_published')
+    }
+
+    errors = []
+    conflicts = []
+    cleaned = []
+    teams_seen = set()
+
+    for i, row in enumerate(rows, start=1):
+        label = row.get('label') or f"Row {i}"
+        team_id = _as_int(row.get('team'), f"{label}: team", errors, 1)
+        position = _as_int(row.get('position'), f"{label}: position", errors, 1)
+        points = _as_int(row.get('points', 0), f"{label}: points", errors, 0)
+        if None in (team_id, position, points):
+            continue
+        if points > max_points(position):
+            errors.append(
+                f"{label}: position {position} is worth at most {max_points(position)} points."
+            )
+            continue
+
+        if team_id not in participating:
+            errors.append(f"{label}: team {team_id} has not participated in {event.name}.")
+            continue
+        if team_id in teams_seen:
+            errors.append(f"{label}: team {team_id} is listed twice.")
+            continue
+
+        pk, _, version, _ = existing.get(team_id, (None, None, -1, False))
+        read = row.get('version')
+        if read not in (None, '') and str(read) != str(version):
+            conflicts.append(label)
+
+        teams_seen.add(team_id)
+        cleaned.append(Result(
+            pk=pk,
+            event=event,
+            team_id=team_id,
+            position=position,
+            points=points,
+            version=version + 1,
+        ))
+
+    if conflicts:
+        raise ConflictError(
+            f"Results for {', '.join(conflicts)} were changed at another desk. "
+            "Reload the sheet and enter them again."
+        )
+
+    held = Counter(r.position for r in cleaned)
+    if not replace:
+        # Positions held by teams outside this batch still count.
+        held.update(
+            position
+            for team_id, (_, position, _, _) in existing.items()
+            if team_id not in teams_seen
+        )
+    for position, count in sorted(held.items()):
+        for skipped in range(position + 1, position + count):
+            if skipped in held:
+                errors.append(
+                    f"Position {skipped} cannot be used: {count} teams tie at position {position}."
+                )
+
+    if errors:
+        raise ValidationError(errors)
+
+    touched = teams_seen if not replace else set(existing) | teams_seen
+    public = any(existing[t][3] for t in touched if t in existing)
+
+    update_fields = ['position', 'points', 'version']
+
+    to_update = [r for r in cleaned if r.pk is not None]
+    to_create = [r for r in cleaned if r.pk is None]
+    # Results of teams left off a replacing sheet, at the version read
+    to_remove = {
+        pk: version
+        for team_id, (pk, _, version, _) in existing.items()
+        if replace and team_id not in teams_seen
+    }
+
+    try:
+        with transaction.atomic():
+            removed = 0
+            if to_remove:
+                removed = delete_versioned(Result, to_remove)
+                if removed != len(to_remove):
+                    raise ConflictError(_CHANGED.format(event=event.name))
+            if to_update and bulk_update_versioned(to_update, update_fields) != len(to_update):
+                raise ConflictError(_CHANGED.format(event=event.name))
+            if to_create:
+                Result.objects.bulk_create(to_create)
+            # Publishing covers the whole event, not just this sheet's rows,
+            # and bumps and announces by itself if any draft went public.
+            newly = publish_event_results(event) if publish else 0
+            if public and not newly:
+                bump_on_commit()
+    except IntegrityError:
+        # Another desk entered a result for one of these teams after we read.
+        raise ConflictError(_CHANGED.format(event=event.name))
+
+    return {'saved': len(cleaned), 'removed': removed, 'published': publish}
+
+
+def announce_results(event, published, count):
+    """Send ``results_published`` once the current transaction commits."""
+    transaction.on_commit(lambda: results_published.send(
+        sender=Result, event=event, published=published, count=count,
+    ))
+
+
+def publish_event_results(event, publish=True):
+    """
+    Make every draft result of ``event`` public in one UPDATE, or with
+    ``publish=False`` withdraw the event's results back to drafts.
+
+    Viewers see the whole sheet change at once: one statement, one
+    data-version bump and one ``results_published`` signal after commit.
+    Returns the number of rows whose visibility changed.
+    """
+    with transaction.atomic():
+        changed = (
+            Result.objects
+            .filter(event=event, is_published=not publish)
+            .update(
+                is_published=publish,
+                published_at=timezone.now() if publish else None,
+                version=F('version') + 1,
+            )
+        )
+        if changed:
+            bump_on_commit()
+            announce_results(event, publish, changed)
+    return changed
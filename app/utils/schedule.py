@@ -0,0 +1,163 @@
+import heapq
+from collections import defaultdict
+
+from django.db.models import Q
+
+from app.models import Event, Participation
+
+
+def overlapping(slots):
+    """
+    Every overlapping pair among ``(start, end, item)`` slots.
+
+    Sweeps the slots in start order keeping a heap of the ones still
+    running, so the cost is O(n log n) plus one step per clash instead
+    of comparing every pair. Touching slots (one ends as the next
+    starts) do not clash.
+    """
+    running = []
+    pairs = []
+    ordered = sorted(slots, key=lambda s: s[:2])
+    for n, (start, end, item) in enumerate(ordered):
+        while running and running[0][0] <= start:
+            heapq.heappop(running)
+        for _, _, other in running:
+            pairs.append((other, item))
+        heapq.heappush(running, (end, n, item))
+    return pairs
+
+
+def _scheduled_events(**filters):
+    return {
+        event['id']: event
+        for event in Event.objects
+        .filter(start_time__isnull=False, end_time__isnull=False, **filters)
+        .values('id', 'name', 'venue', 'start_time', 'end_time')
+    }
+
+
+def _person_clashes(participations, events):
+    """
+    Build the inverted index ``(team_id, participant_key) -> events``
+    from participation rows and sweep each person's events.
+    """
+    index = defaultdict(dict)
+    names = {}
+    for team_id, team_name, key, name, event_id in participations:
+        event = events.get(event_id)
+        if event is None:
+            continue
+        index[(team_id, key)][event_id] = event
+        names[(team_id, key)] = (name, team_name)
+
+    clashes = []
+    for person, booked in index.items():
+        if len(booked) < 2:
+            continue
+        slots = [(e['start_time'], e['end_time'], e['id']) for e in booked.values()]
+        for first, second in overlapping(slots):
+            name, team_name = names[person]
+            clashes.append({
+                'team_id': person[0],
+                'team_name': team_name,
+                'participant_key': person[1],
+                'name': name,
+                'events': (booked[first], booked[second]),
+            })
+    clashes.sort(key=lambda c: (c['events'][0]['start_time'], c['team_name'], c['name']))
+    return clashes
+
+
+def _participation_rows(queryset):
+    return queryset.values_list(
+        'team_id', 'team__team_name', 'participant_key', 'participant_name', 'event_id'
+    )
+
+
+def person_clashes():
+    """Every student booked into two overlapping events, fest-wide."""
+    events = _scheduled_events()
+    rows = _participation_rows(Participation.objects.filter(event_id__in=list(events)))
+    return _person_clashes(rows, events)
+
+
+def clashes_for_people(people, event=None):
+    """
+    Clashes for a few ``(team_id, participant_key)`` pairs only, read
+    through the (team, participant_key) index; used after a roster
+    change. With ``event`` only clashes involving that event are kept.
+    """
+    by_team = defaultdict(set)
+    for team_id, key in people:
+        by_team[team_id].add(key)
+    if not by_team:
+        return []
+
+    rows = list(_participation_rows(Participation.objects.filter(
+        Q(*[Q(team_id=t, participant_key__in=keys) for t, keys in by_team.items()],
+          _connector=Q.OR)
+    )))
+    events = _scheduled_events(pk__in={row[4] for row in rows})
+    clashes = _person_clashes(rows, events)
+    if event is not None:
+        clashes = [c for c in clashes if event.pk in (c['events'][0]['id'], c['events'][1]['id'])]
+    return clashes
+
+
+def clashes_for_roster(event, team):
+    """Clashes for one team's entrants in ``event``."""
+    keys = Participation.objects.filter(event=event, team=team).values_list(
+        'participant_key', flat=True
+    )
+    return clashes_for_people([(team.pk, key) for key in keys], event=event)
+
+
+def venue_clashes(event=None):
+    """
+    Events sharing a venue at overlapping times, fest-wide or for one
+    event. Venue names are compared ignoring case and spacing.
+    """
+    if event is not None:
+        if not (event.venue and event.start_time and event.end_time):
+            return []
+        this = _scheduled_events(pk=event.pk)[event.pk]
+        others = _scheduled_events(
+            venue__iexact=event.venue,
+            start_time__lt=event.end_time,
+            end_time__gt=event.start_time,
+        )
+        return [(this, other) for pk, other in others.items() if pk != event.pk]
+
+    by_venue = defaultdict(list)
+    for e in _scheduled_events().values():
+        if e['venue']:
+            by_venue[" ".join(e['venue'].split()).casefold()].append(e)
+
+    clashes = []
+    for events in by_venue.values():
+        lookup = {e['id']: e for e in events}
+        slots = [(e['start_time'], e['end_time'], e['id']) for e in events]
+        clashes.extend((lookup[a], lookup[b]) for a, b in overlapping(slots))
+    clashes.sort(key=lambda pair: pair[0]['start_time'])
+    return clashes
+
+
+def clashes_for_event(event):
+    """Person and venue clashes touching ``event`` after a schedule change."""
+    if not (event.start_time and event.end_time):
+        return [], []
+    keys = Participation.objects.filter(event=event).values_list('team_id', 'participant_key')
+    return clashes_for_people(keys, event=event), venue_clashes(event)
+
+
+def describe(clash):
+    first, second = clash['events']
+    return (
+        f"{clash['name']} ({clash['team_name']}) is in {first['name']} and "
+        f"{second['name']}, which overlap."
+    )
+
+
+def describe_venue(pair):
+    first, second = pair
+    return f"{first['name']} and {second['name']} overlap at {first['venue']}."
@@ -0,0 +1,165 @@
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Event, Team, Participation, Result, participant_key
+from app.utils.cache import bump_on_commit
+from app.utils.quotas import rebuild_counters
+
+
+# ===============================
+# NAME POOLS
+# ===============================
+DEPARTMENTS = [
+    "Computer Science", "Physics", "Chemistry", "Mathematics",
+    "Botany", "Zoology", "English", "Malayalam", "Commerce",
+    "Economics", "History", "Statistics", "Biotechnology",
+    "Psychology", "Journalism", "Geography",
+]
+
+TEAM_PREFIXES = [
+    "Thunder", "Phoenix", "Cosmos", "Nila", "Kadal", "Agni",
+    "Vayu", "Mayura", "Chakra", "Tarang", "Ilakkam", "Spark",
+]
+
+FIRST_NAMES = [
+    "Aadhya", "Abhinav", "Adithya", "Akhil", "Amal", "Ananya", "Anjali",
+    "Arjun", "Aswathy", "Athira", "Devika", "Diya", "Fathima", "Gokul",
+    "Gopika", "Hari", "Irfan", "Jishnu", "Kavya", "Keerthana", "Krishna",
+    "Lakshmi", "Meera", "Midhun", "Nandana", "Navaneeth", "Nihal",
+    "Parvathy", "Rahul", "Reshma", "Rohit", "Sanjay", "Sneha", "Sreehari",
+    "Swathi", "Vishnu", "Yadhu", "Zainab",
+]
+
+LAST_NAMES = [
+    "K", "M", "P", "R", "S", "T", "V", "Nair", "Menon", "Pillai",
+    "Kurup", "Varma", "Thomas", "Joseph", "Rahman", "Basheer",
+]
+
+POSITION_POINTS = settings.FEST_POSITION_POINTS
+
+
+def _participant_name(rng, used):
+    while True:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name not in used:
+            used.add(name)
+            return name
+        # Pools are small on purpose; widen with a roll number.
+        name = f"{name} {rng.randint(1, 999)}"
+        if name not in used:
+            used.add(name)
+            return name
+
+
+@transaction.atomic
+def seed_fest(
+    teams=12,
+    teams_per_event=None,
+    roster_size=40,
+    result_ratio=0.6,
+    seed=None,
+    clear=False,
+    batch_size=1000,
+):
+    """
+    Generate a synthetic fest on top of the preloaded events.
+
+    Every team gets a roster of ``roster_size`` students who are reused
+    across events, so the data has the same shape as a real fest where
+    one student enters several items. Returns a dict of created counts.
+    """
+    rng = random.Random(seed)
+
+    if clear:
+        Result.objects.all().delete()
+        Participation.objects.all().delete()
+        Team.objects.all().delete()
+
+    events = list(Event.objects.order_by('id'))
+    if not events:
+        raise ValueError(
+            "No events found. Run `manage.py load_events` to load the event catalog."
+        )
+
+    # ================= TEAMS =================
+    start = Team.objects.count()
+    new_teams = [
+        Team(
+            team_name=f"{rng.choice(TEAM_PREFIXES)} {start + i + 1}",
+            department=DEPARTMENTS[(start + i) % len(DEPARTMENTS)],
+        )
+        for i in range(teams)
+    ]
+    Team.objects.bulk_create(new_teams, batch_size=batch_size)
+    team_objs = list(Team.objects.order_by('-id')[:teams])
+
+    rosters = {}
+    for team in team_objs:
+        used = set()
+        rosters[team.id] = [
+            _participant_name(rng, used) for _ in range(max(roster_size, 1))
+        ]
+
+    # ================= PARTICIPATIONS =================
+    per_event = teams_per_event or len(team_objs)
+    per_event = min(per_event, len(team_objs))
+
+    participations = []
+    entries = {}
+
+    for event in events:
+        entered = rng.sample(team_objs, per_event)
+        entries[event.id] = entered
+
+        low = max(event.min_team_size, 1)
+        high = max(event.max_team_size, low)
+
+        for team in entered:
+            roster = rosters[team.id]
+            size = min(rng.randint(low, high), len(roster))
+            for name in rng.sample(roster, size):
+                participations.append(
+                    Participation(
+                        event=event,
+                        team=team,
+                        participant_name=name,
+                        participant_key=participant_key(name),
+                    )
+                )
+
+    Participation.objects.bulk_create(participations, batch_size=batch_size)
+    # Seeded rosters ignore FEST_EVENT_LIMITS; just count what is there.
+    rebuild_counters(teams=team_objs)
+
+    # ================= RESULTS =================
+    results = []
+    published_at = timezone.now()
+    scored = rng.sample(events, int(len(events) * result_ratio))
+
+    for event in scored:
+        podium = rng.sample(entries[event.id], min(3, len(entries[event.id])))
+        for position, team in enumerate(podium, start=1):
+            results.append(
+                Result(
+                    event=event,
+                    team=team,
+                    position=position,
+                    points=POSITION_POINTS[position],
+                    is_published=True,
+                    published_at=published_at,
+                )
+            )
+
+    Result.objects.bulk_create(results, batch_size=batch_size)
+    # bulk_create sends no signals; cached standings must still move on.
+    bump_on_commit()
+
+    return {
+        'events': len(events),
+        'teams': len(team_objs),
+        'participations': len(participations),
+        'results': len(results),
+    }
@@ -0,0 +1,182 @@
+import gzip
+import json
+from decimal import Decimal
+
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from app.models import Event, JudgeScore, ParticipantCounter, Participation, Result, Team
+from app.utils.cache import bump_on_commit
+from app.utils.quotas import rebuild_counters
+
+
+FORMAT = "fest-snapshot"
+FORMAT_VERSION = 1
+
+# Parents first so rows can be inserted in file order. Participant
+# counters are derived data and are rebuilt after an import.
+MODELS = [Event, Team, Participation, Result, JudgeScore]
+
+CHUNK_SIZE = 5000
+BATCH_SIZE = 2000
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _columns(model):
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def _encode(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    return value.isoformat()
+
+
+def export_snapshot(path, compresslevel=5):
+    """
+    Write every fest table to a gzipped JSON-lines file: a header line,
+    then per model one ``{"model", "fields"}`` line followed by one
+    JSON array per row. Rows are streamed from ``values_list``
+    iterators, so memory does not grow with the fest.
+    Returns ``{model label: rows}``.
+    """
+    counts = {}
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=compresslevel) as out:
+        out.write(json.dumps({
+            'format': FORMAT,
+            'version': FORMAT_VERSION,
+            'created': timezone.now().isoformat(),
+            'models': [m._meta.label_lower for m in MODELS],
+        }) + "\n")
+
+        for model in MODELS:
+            label = model._meta.label_lower
+            columns = _columns(model)
+            out.write(json.dumps({'model': label, 'fields': columns}) + "\n")
+
+            rows = (
+                model.objects.order_by('pk')
+                .values_list(*columns)
+                .iterator(chunk_size=CHUNK_SIZE)
+            )
+            n = 0
+            for row in rows:
+                out.write(json.dumps(row, separators=(',', ':'), default=_encode) + "\n")
+                n += 1
+            counts[label] = n
+    return counts
+
+
+def _converters(model, columns):
+    """Per column a ``to_python`` for values JSON carries as strings, else ``None``."""
+    fields = {f.attname: f for f in model._meta.concrete_fields}
+    converters = []
+    for name in columns:
+        field = fields.get(name)
+        if field is None:
+            raise SnapshotError(f"{model._meta.label_lower} has no field '{name}'.")
+        if isinstance(field, (models.DateTimeField, models.DateField, models.DecimalField)):
+            converters.append(field.to_python)
+        else:
+            converters.append(None)
+    return converters
+
+
+def _fest_is_empty():
+    return not any(model.objects.exists() for model in MODELS)
+
+
+def _read(path):
+    """Yield the snapshot's lines decoded; a damaged file raises ``SnapshotError``."""
+    lineno = 1
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as src:
+            header = json.loads(src.readline() or 'null')
+            if not isinstance(header, dict) or header.get('format') != FORMAT:
+                raise SnapshotError(f"{path} is not a fest snapshot.")
+            if header.get('version') != FORMAT_VERSION:
+                raise SnapshotError(f"Unsupported snapshot version {header.get('version')}.")
+            for lineno, line in enumerate(src, start=2):
+                yield json.loads(line)
+    except (OSError, EOFError, UnicodeDecodeError, ValueError) as exc:
+        # Truncated gzip stream, not gzip at all, or a broken JSON line
+        raise SnapshotError(f"{path} is damaged near line {lineno}: {exc}")
+
+
+def import_snapshot(path, replace=False, batch_size=BATCH_SIZE):
+    """
+    Load a snapshot into an empty fest (or wipe it first with
+    ``replace``) in one transaction.
+
+    Rows keep their primary keys and are inserted with ``bulk_create``
+    in batches while foreign key checks are deferred; the constraints
+    are checked once at the end, then sequences are reset and the
+    participant counters rebuilt. A damaged or malformed file raises
+    ``SnapshotError`` and leaves the database as it was.
+    Returns ``{model label: rows}``.
+    """
+    by_label = {m._meta.label_lower: m for m in MODELS}
+    counts = {}
+
+    with transaction.atomic():
+        if replace:
+            ParticipantCounter.objects.all().delete()
+            for model in reversed(MODELS):
+                model.objects.all().delete()
+        elif not _fest_is_empty():
+            raise SnapshotError(
+                "The database already has fest data; use --replace to overwrite it."
+            )
+
+        with connection.constraint_checks_disabled():
+            model = columns = converters = None
+            batch = []
+
+            def flush():
+                if batch:
+                    model.objects.bulk_create(batch, batch_size=batch_size)
+                    batch.clear()
+
+            for item in _read(path):
+                if isinstance(item, dict):
+                    flush()
+                    model = by_label.get(item.get('model'))
+                    if model is None:
+                        raise SnapshotError(f"Unknown model '{item.get('model')}'.")
+                    columns = item['fields']
+                    converters = _converters(model, columns)
+                    counts[model._meta.label_lower] = 0
+                    continue
+
+                if model is None:
+                    raise SnapshotError("Row found before any model header.")
+                if not isinstance(item, list) or len(item) != len(columns):
+                    raise SnapshotError(
+                        f"Malformed {model._meta.label_lower} row: expected {len(columns)} values."
+                    )
+                values = {
+                    name: convert(value) if convert and value is not None else value
+                    for name, convert, value in zip(columns, converters, item)
+                }
+                batch.append(model(**values))
+                counts[model._meta.label_lower] += 1
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+
+        connection.check_constraints(table_names=[m._meta.db_table for m in MODELS])
+
+        statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+        rebuild_counters()
+        bump_on_commit()
+
+    return counts
@@ -0,0 +1,207 @@
+from django.db.models import Count, F, FilteredRelation, Min, Q, Sum
+from django.db.models.functions import Coalesce
+
+from app.models import Participation, Team
+from app.utils.cache import cached
+
+
+ALL = '*'
+
+
+def department_key(name):
+    """Fold the free-text department so "Physics " and "physics" match."""
+    return " ".join(str(name or "").split()).casefold()
+
+
+def _rank(rows):
+    """Sort by points, then medals; rows tied on all four share a rank."""
+    rows.sort(key=lambda r: (-r['points'], -r['gold'], -r['silver'], -r['bronze'], r['name']))
+    previous = None
+    for i, row in enumerate(rows, start=1):
+        score = (row['points'], row['gold'], row['silver'], row['bronze'])
+        if score != previous:
+            rank, previous = i, score
+        row['rank'] = rank
+    return rows
+
+
+class Standings:
+    """
+    Points and medals by team x stage type x event type, with every
+    roll-up (per team, per department, any stage, any event type)
+    precomputed so a slice lookup is one dict access.
+
+    Slices are addressed as ``(stage_type, event_type)``; pass ``ALL``
+    (or ``None``) for either to get the total over that dimension.
+    """
+
+    def __init__(self, rows):
+        self.teams = {}
+        self.departments = {}
+        self.team_counts = {}
+        self.stage_types = set()
+        self.event_types = set()
+        # (scope, key, stage_type, event_type) -> [points, gold, silver, bronze]
+        self._tallies = {}
+        spellings = {}
+
+        for row in rows:
+            team_id = row['id']
+            dept = department_key(row['department'])
+            if team_id not in self.teams:
+                self.teams[team_id] = {
+                    'id': team_id,
+                    'name': row['team_name'],
+                    'department': dept,
+                }
+                self.team_counts[dept] = self.team_counts.get(dept, 0) + 1
+                names = spellings.setdefault(dept, {})
+                spelling = " ".join(row['department'].split())
+                names[spelling] = names.get(spelling, 0) + 1
+                for scope in (('team', team_id), ('department', dept)):
+                    self._tallies.setdefault(scope + (ALL, ALL), [0, 0, 0, 0])
+
+            stage = row['pub__event__stage_type']
+            etype = row['pub__event__event_type']
+            if stage is None:
+                continue
+            self.stage_types.add(stage)
+            self.event_types.add(etype)
+
+            tally = (row['points'], row['gold'], row['silver'], row['bronze'])
+            for scope in (('team', team_id), ('department', dept)):
+                for s in (stage, ALL):
+                    for e in (etype, ALL):
+                        cell = self._tallies.setdefault(scope + (s, e), [0, 0, 0, 0])
+                        for i, value in enumerate(tally):
+                            cell[i] += value
+
+        # Show the spelling most teams used, preferring capitalised ones.
+        for dept, names in spellings.items():
+            self.departments[dept] = max(
+                names, key=lambda name: (names[name], name != name.lower())
+            )
+
+        # Every ranked slice is built up front: a handful of stage and
+        # event types gives a few dozen small tables.
+        self._tables = {}
+        for level in ('team', 'department'):
+            for s in [ALL] + sorted(self.stage_types):
+                for e in [ALL] + sorted(self.event_types):
+                    self._tables[(level, s, e)] = _rank(self._build_table(level, s, e))
+
+        self._ranks = {
+            (row['id'], s, e): row['rank']
+            for (level, s, e), rows in self._tables.items()
+            if level == 'team'
+            for row in rows
+        }
+
+    def tally(self, team=None, department=None, stage_type=None, event_type=None):
+        """``{'points', 'gold', 'silver', 'bronze'}`` for one cell of the cube."""
+        if team is not None:
+            scope = ('team', team)
+        else:
+            scope = ('department', department_key(department))
+        cell = self._tallies.get(scope + (stage_type or ALL, event_type or ALL))
+        points, gold, silver, bronze = cell or (0, 0, 0, 0)
+        return {'points': points, 'gold': gold, 'silver': silver, 'bronze': bronze}
+
+    def table(self, level='team', stage_type=None, event_type=None):
+        """Ranked rows for a slice, or ``[]`` for an unknown slice."""
+        return self._tables.get((level, stage_type or ALL, event_type or ALL), [])
+
+    def _build_table(self, level, stage_type, event_type):
+        rows = []
+        if level == 'department':
+            for dept, name in self.departments.items():
+                tally = self.tally(department=dept, stage_type=stage_type, event_type=event_type)
+                rows.append(dict(tally, key=dept, name=name, teams=self.team_counts[dept]))
+        else:
+            for team in self.teams.values():
+                tally = self.tally(team=team['id'], stage_type=stage_type, event_type=event_type)
+                rows.append(dict(
+                    tally,
+                    id=team['id'],
+                    name=team['name'],
+                    department=self.departments[team['department']],
+                ))
+        return rows
+
+    def rank_of(self, team_id, stage_type=None, event_type=None):
+        return self._ranks.get((team_id, stage_type or ALL, event_type or ALL))
+
+
+def build_standings():
+    """
+    Read the whole cube in one grouped query over published results.
+
+    Teams without any published result still get a row (with no
+    stage/event type), so they show up with zero points.
+    """
+    rows = (
+        Team.objects
+        .annotate(pub=FilteredRelation('results', condition=Q(results__is_published=True)))
+        .values(
+            'id',
+            'team_name',
+            'department',
+            'pub__event__stage_type',
+            'pub__event__event_type',
+        )
+        .annotate(
+            points=Coalesce(Sum('pub__points'), 0),
+            gold=Count('pub', filter=Q(pub__position=1)),
+            silver=Count('pub', filter=Q(pub__position=2)),
+            bronze=Count('pub', filter=Q(pub__position=3)),
+        )
+        .order_by()
+    )
+    return Standings(rows)
+
+
+def standings():
+    """The cached cube, rebuilt after the next publish or data change."""
+    return cached('standings', build_standings)
+
+
+def build_individual():
+    """
+    Individual championship: points per student across SINGLE events,
+    in one aggregate query.
+
+    A student is a ``(team, participant_key)`` pair, so spelling
+    variants of a name within a team count as one person while
+    namesakes in different teams stay apart. Each participation is
+    joined to its team's published result in that event.
+    """
+    rows = (
+        Participation.objects
+        .filter(event__event_type='SINGLE')
+        .annotate(res=FilteredRelation(
+            'event__results',
+            condition=Q(
+                event__results__team=F('team'),
+                event__results__is_published=True,
+            ),
+        ))
+        .filter(res__isnull=False)
+        .values('team_id', 'participant_key')
+        .annotate(
+            name=Min('participant_name'),
+            team_name=Min('team__team_name'),
+            department=Min('team__department'),
+            points=Coalesce(Sum('res__points'), 0),
+            events=Count('res'),
+            gold=Count('res', filter=Q(res__position=1)),
+            silver=Count('res', filter=Q(res__position=2)),
+            bronze=Count('res', filter=Q(res__position=3)),
+        )
+        .order_by()
+    )
+    return _rank(list(rows))
+
+
+def individual_standings():
+    """Cached individual leaderboard, rebuilt after the next data change."""
+    return cached('standings:individual', build_individual)
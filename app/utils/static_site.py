@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from app.models import Event, Participation, Result, Team
+from app.utils.clinch import championship_race
+from app.utils.standings import standings
+
+
+MANIFEST = '.manifest.json'
+
+logger = logging.getLogger(__name__)
+
+
+def output_dir(path=None):
+    return Path(path or settings.FEST_STATIC_SITE_DIR or Path(settings.BASE_DIR) / 'public_site')
+
+
+def _digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(repr(part).encode())
+    return h.hexdigest()
+
+
+class SiteState:
+    """
+    Fingerprints of everything the public pages show, plus each page's
+    dependencies, read in a handful of queries.
+
+    Keys: ``event:<id>`` (event row, published podium, entrants),
+    ``team:<id>`` (name and department), ``tally:<id>`` (points, medals,
+    rank), ``standings`` (the leaderboard) and ``catalog`` (event list).
+    """
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.pages = {}      # path -> (url, sorted dependency keys)
+
+        event_rows = list(Event.objects.order_by('pk').values_list(
+            'pk', 'name', 'stage_type', 'event_type', 'venue', 'start_time', 'end_time',
+        ))
+        team_rows = list(Team.objects.order_by('pk').values_list('pk', 'team_name', 'department'))
+
+        event_parts = defaultdict(list)
+        event_teams = defaultdict(set)
+        team_events = defaultdict(set)
+        for event_id, team_id, position, points in (
+            Result.objects.published()
+            .order_by('event_id', 'position', 'team_id')
+            .values_list('event_id', 'team_id', 'position', 'points')
+        ):
+            event_parts[event_id].append(('r', team_id, position, points))
+            event_teams[event_id].add(team_id)
+            team_events[team_id].add(event_id)
+        for event_id, team_id, name in (
+            Participation.objects
+            .order_by('event_id', 'id')
+            .values_list('event_id', 'team_id', 'participant_name')
+            .iterator(chunk_size=5000)
+        ):
+            event_parts[event_id].append(('p', team_id, name))
+            event_teams[event_id].add(team_id)
+
+        for row in event_rows:
+            self.fingerprints[f'event:{row[0]}'] = _digest(row, event_parts[row[0]])
+        for row in team_rows:
+            self.fingerprints[f'team:{row[0]}'] = _digest(row)
+
+        cube = standings()
+        for team_id, _, _ in team_rows:
+            self.fingerprints[f'tally:{team_id}'] = _digest(
+                cube.tally(team=team_id), cube.rank_of(team_id)
+            )
+        self.fingerprints['standings'] = _digest(championship_race().rows)
+        self.fingerprints['catalog'] = _digest(event_rows)
+
+        self._add(reverse('public_index'), ['standings'])
+        self._add(reverse('public_event_list'), ['catalog'])
+        for event_id, *_ in event_rows:
+            self._add(
+                reverse('public_event_result', args=[event_id]),
+                [f'event:{event_id}'] + [f'team:{t}' for t in event_teams[event_id]],
+            )
+        for team_id, _, _ in team_rows:
+            self._add(
+                reverse('public_team_detail', args=[team_id]),
+                [f'team:{team_id}', f'tally:{team_id}']
+                + [f'event:{e}' for e in team_events[team_id]],
+            )
+
+    def _add(self, url, deps):
+        path = url.strip('/')
+        path = f'{path}/index.html' if path else 'index.html'
+        self.pages[path] = (url, sorted(deps))
+
+
+def _write_atomic(target, data):
+    """Write to a temp file next to ``target`` and rename it over; readers see old or new, never half."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix='.tmp-', suffix=target.suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _read_manifest(root):
+    try:
+        with open(root / MANIFEST, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'fingerprints': {}, 'pages': {}}
+
+
+def render_page(url):
+    """Run the public view for ``url`` as an anonymous GET and return the HTML bytes."""
+    request = RequestFactory().get(url)
+    request.user = AnonymousUser()
+    match = resolve(url)
+    view = match.func
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} rendered with status {response.status_code}")
+    return response.content
+
+
+def render_site(path=None, full=False):
+    """
+    Bring the static copy of the public pages up to date.
+
+    Compares fresh fingerprints with the ones saved at the last run and
+    re-renders only the pages that depend on something that changed
+    (or every page with ``full``). Pages of deleted events and teams
+    are removed. Returns ``{'rendered', 'removed', 'skipped', 'changed'}``.
+    """
+    root = output_dir(path)
+    manifest = _read_manifest(root)
+    old_fingerprints = manifest.get('fingerprints', {})
+    old_pages = manifest.get('pages', {})
+
+    state = SiteState()
+    changed = {
+        key for key in set(state.fingerprints) | set(old_fingerprints)
+        if state.fingerprints.get(key) != old_fingerprints.get(key)
+    }
+
+    rendered = []
+    for page, (url, deps) in state.pages.items():
+        stale = (
+            full
+            or page not in old_pages
+            or not (root / page).exists()
+            or changed.intersection(deps)
+            or changed.intersection(old_pages[page])
+        )
+        if stale:
+            _write_atomic(root / page, render_page(url))
+            rendered.append(page)
+
+    removed = []
+    for page in set(old_pages) - set(state.pages):
+        try:
+            (root / page).unlink()
+            removed.append(page)
+        except FileNotFoundError:
+            pass
+
+    _write_atomic(root / MANIFEST, json.dumps({
+        'fingerprints': state.fingerprints,
+        'pages': {page: deps for page, (_, deps) in state.pages.items()},
+    }).encode())
+
+    return {
+        'rendered': sorted(rendered),
+        'removed': sorted(removed),
+        'skipped': len(state.pages) - len(rendered),
+        'changed': sorted(changed),
+    }
+
+
+# One background refresh per process at a time; requests that arrive
+# while it runs are folded into a single follow-up run.
+_refresh = {'running': False, 'again': False, 'thread': None}
+_refresh_lock = threading.Lock()
+
+
+def refresh_in_background():
+    """
+    Start ``render_site()`` in a daemon thread and return at once, so a
+    publish request does not wait for pages to render. Failures are
+    logged; the next refresh (or ``render_static``) catches up.
+    """
+    with _refresh_lock:
+        if _refresh['running']:
+            _refresh['again'] = True
+            return
+        _refresh['running'] = True
+        _refresh['thread'] = threading.Thread(
+            target=_refresh_loop, name='static-site-refresh', daemon=True
+        )
+        _refresh['thread'].start()
+
+
+def _refresh_loop():
+    try:
+        while True:
+            try:
+                render_site()
+            except Exception:
+                logger.exception("Static site refresh failed")
+            with _refresh_lock:
+                if not _refresh['again']:
+                    _refresh['running'] = False
+                    return
+                _refresh['again'] = False
+    finally:
+        connections.close_all()
@@ -3,25 +3,55 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import AuthenticationForm
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Sum
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
 from reportlab.pdfgen import canvas
 from django.forms import modelformset_factory
 
 
-from .models import Event, Team, Participation, Result
+from .models import Event, Team, Participation, Result, JudgeScore
 from .forms import (
     EventForm,
     TeamForm,
     ParticipationForm,
     ResultForm,
     ParticipationFormSet,
+    ParticipationBaseFormSet,
+    ParticipationImportForm,
+    event_choices,
+    team_choices,
 )
+from .utils.exports import astream, export
+from .utils.importer import import_file
+from .utils.judging import compute_results, save_score_sheet
+from .utils.participations import save_group_participation, save_single_participation
+from .utils.quotas import move_event, release
+from .utils.cache import bump_on_commit
+from .utils.concurrency import ConflictError, create_or_conflict, save_versioned
+from .utils.db import GroupConcat, split_concat
+from .utils.pagination import keyset_page, page_size
+from .utils.readmodel import afest
+from .utils.results import publish_event_results, save_event_results
+from .utils.schedule import (
+    clashes_for_event,
+    clashes_for_people,
+    clashes_for_roster,
+    describe,
+    describe_venue,
+)
+from .utils.standings import individual_standings
 
 
+import json
 import os
+from urllib.parse import urlencode
 from django.contrib.auth.models import User
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_POST
 
 def create_superuser_once(request):
     key = request.GET.get("key")
@@ -86,7 +116,12 @@ def admin_dashboard(request):
     )
 
     return render(request, 'dashboard.html', {
-        'points': points
+        'points': points,
+        'exports': [
+            ('participations', 'All registrations'),
+            ('results', 'All results (drafts included)'),
+            ('standings', 'Team standings'),
+        ],
     })
 
 
@@ -96,7 +131,7 @@ def event_list(request):
     stage = request.GET.get('stage')
     mode = request.GET.get('mode')   # NEW
 
-    events = Event.objects.all().order_by('stage_type', 'name')
+    events = Event.objects.only('id', 'name', 'stage_type', 'event_type')
 
     if stage in ['ON_STAGE', 'OFF_STAGE']:
         events = events.filter(stage_type=stage)
@@ -104,21 +139,38 @@ def event_list(request):
     if mode in ['SINGLE', 'GROUP']:
         events = events.filter(event_type=mode)
 
+    page = keyset_page(
+        events,
+        ['stage_type', 'name', 'id'],
+        cursor=request.GET.get('after'),
+        size=page_size(request),
+    )
+
     return render(request, 'event_list.html', {
-        'events': events,
+        'events': page,
         'selected_stage': stage,
         'selected_mode': mode,   # NEW
+        **_page_links(page, {'stage': stage, 'mode': mode}),
     })
 
 
 
+def _warn_clashes(request, clashes, venues=()):
+    """Surface schedule clashes as warnings; the save itself stands."""
+    for clash in clashes:
+        messages.warning(request, describe(clash))
+    for pair in venues:
+        messages.warning(request, describe_venue(pair))
+
+
 @login_required
 def event_create(request):
     if request.method == 'POST':
         form = EventForm(request.POST)
         if form.is_valid():
-            form.save()
+            event = form.save()
             messages.success(request, "Event created successfully")
+            _warn_clashes(request, *clashes_for_event(event))
             return redirect('event_list')
     else:
         form = EventForm()
@@ -131,10 +183,14 @@ def event_edit(request, event_id):
     event = get_object_or_404(Event, id=event_id)
 
     if request.method == 'POST':
+        kind = (event.stage_type, event.event_type)
         form = EventForm(request.POST, instance=event)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                event = form.save()
+                move_event(event, *kind)
             messages.success(request, "Event updated successfully")
+            _warn_clashes(request, *clashes_for_event(event))
             return redirect('event_list')
     else:
         form = EventForm(instance=event)
@@ -146,7 +202,9 @@ def event_delete(request, event_id):
     event = get_object_or_404(Event, id=event_id)
 
     if request.method == 'POST':
-        event.delete()
+        with transaction.atomic():
+            release(Participation.objects.filter(event=event))
+            event.delete()
         messages.success(request, "Event deleted successfully")
         return redirect('event_list')
 
@@ -155,8 +213,16 @@ def event_delete(request, event_id):
 
 @login_required
 def team_list(request):
-    teams = Team.objects.all().order_by('department')
-    return render(request, 'team_list.html', {'teams': teams})
+    page = keyset_page(
+        Team.objects.only('id', 'team_name', 'department'),
+        ['department', 'id'],
+        cursor=request.GET.get('after'),
+        size=page_size(request),
+    )
+    return render(request, 'team_list.html', {
+        'teams': page,
+        **_page_links(page),
+    })
 
 
 @login_required
@@ -295,43 +361,85 @@ def team_detail(request, team_id):
         'event_data': event_data
     })
 
-from collections import defaultdict
+def _page_links(page, filters=None):
+    """Context for pagination.html, keeping the active filters."""
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    return {
+        'page': page,
+        'next_query': urlencode(dict(filters, after=page.next_cursor or '')),
+        'first_query': urlencode(filters),
+    }
+
+
+def _int_param(request, name):
+    try:
+        return int(request.GET.get(name, ''))
+    except ValueError:
+        return None
+
 
 @login_required
 def participation_list(request):
-    team_id = request.GET.get('team')
+    team_id = _int_param(request, 'team')
+    event_id = _int_param(request, 'event')
+    stage = request.GET.get('stage')
 
-    participations = Participation.objects.select_related(
-        'event', 'team'
-    ).order_by('event__name', 'team__team_name')
+    # One row per (event, team) with the names concatenated in the DB,
+    # so a page costs the same however many registrations exist.
+    grouped = (
+        Participation.objects
+        .values(
+            'event_id', 'event__name', 'event__event_type', 'event__stage_type',
+            'team_id', 'team__team_name', 'team__department',
+        )
+        .annotate(names=GroupConcat('participant_name'))
+    )
 
     if team_id:
-        participations = participations.filter(team_id=team_id)
-
-    grouped = defaultdict(list)
+        grouped = grouped.filter(team_id=team_id)
+    if event_id:
+        grouped = grouped.filter(event_id=event_id)
+    if stage in ['ON_STAGE', 'OFF_STAGE']:
+        grouped = grouped.filter(event__stage_type=stage)
 
-    for p in participations:
-        key = (p.event, p.team)
-        grouped[key].append(p.participant_name)
+    page = keyset_page(
+        grouped,
+        ['event__name', 'team__team_name', 'event_id', 'team_id'],
+        cursor=request.GET.get('after'),
+        size=page_size(request),
+    )
 
     grouped_data = [
         {
-            'event': event,
-            'team': team,
-            'participants': names
+            'event': {
+                'id': row['event_id'],
+                'name': row['event__name'],
+                'event_type': row['event__event_type'],
+                'stage_type': row['event__stage_type'],
+            },
+            'team': {
+                'id': row['team_id'],
+                'team_name': row['team__team_name'],
+                'department': row['team__department'],
+            },
+            'participants': sorted(split_concat(row['names'])),
         }
-        for (event, team), names in grouped.items()
+        for row in page
     ]
 
-    teams = Team.objects.all().order_by('team_name')
+    filters = {'team': team_id, 'event': event_id, 'stage': stage}
 
     return render(
         request,
         'participation_list.html',
         {
             'grouped_data': grouped_data,
-            'teams': teams,
-            'selected_team': team_id,
+            **_page_links(page, filters),
+            'teams': team_choices(),
+            'events': event_choices(),
+            'selected_team': str(team_id or ''),
+            'selected_event': str(event_id or ''),
+            'selected_stage': stage,
         }
     )
 
@@ -345,15 +453,29 @@ def participation_add(request):
     # -------------------------
     # SINGLE EVENT
     # -------------------------
+    status = 200
+
     if event and event.event_type == 'SINGLE':
         if request.method == 'POST':
             form = ParticipationForm(request.POST, event=event)
             if form.is_valid():
                 participation = form.save(commit=False)
                 participation.event = event  # force event
-                participation.save()
-                messages.success(request, "Participant added successfully")
-                return redirect('participation_list')
+                try:
+                    save_single_participation(participation)
+                except ConflictError as exc:
+                    messages.error(request, str(exc))
+                    status = 409
+                except ValidationError as exc:
+                    for error in exc.messages:
+                        messages.error(request, error)
+                else:
+                    messages.success(request, "Participant added successfully")
+                    _warn_clashes(request, clashes_for_people(
+                        [(participation.team_id, participation.participant_key)],
+                        event=event,
+                    ))
+                    return redirect('participation_list')
         else:
             form = ParticipationForm(event=event)
 
@@ -363,7 +485,8 @@ def participation_add(request):
             {
                 'form': form,
                 'event': event
-            }
+            },
+            status=status
         )
 
     # -------------------------
@@ -375,6 +498,7 @@ def participation_add(request):
         ParticipationFormSet = modelformset_factory(
             Participation,
             form=ParticipationForm,
+            formset=ParticipationBaseFormSet,
             extra=event.max_team_size,
             can_delete=False
         )
@@ -393,19 +517,22 @@ def participation_add(request):
             )
 
             if formset.is_valid():
-                participations = formset.save(commit=False)
-
                 # remove empty name rows
-                participations = [
-                    p for p in participations if p.participant_name
+                names = [
+                    form.cleaned_data['participant_name']
+                    for form in formset.forms
+                    if form.cleaned_data.get('participant_name')
                 ]
 
-                # ❌ below minimum
-                if len(participations) < event.min_team_size:
-                    messages.error(
-                        request,
-                        f"Minimum {event.min_team_size} participants required."
-                    )
+                try:
+                    save_group_participation(event, team, inserts=names)
+                except (ValidationError, ConflictError) as exc:
+                    if isinstance(exc, ConflictError):
+                        messages.error(request, str(exc))
+                        status = 409
+                    else:
+                        for error in exc.messages:
+                            messages.error(request, error)
                     return render(
                         request,
                         'participation_group_form.html',
@@ -413,19 +540,15 @@ def participation_add(request):
                             'formset': formset,
                             'event': event,
                             'teams': teams
-                        }
+                        },
+                        status=status
                     )
 
-                # ✅ save valid participants
-                for p in participations:
-                    p.event = event
-                    p.team = team
-                    p.save()
-
                 messages.success(
                     request,
                     "Group participants added successfully"
                 )
+                _warn_clashes(request, clashes_for_roster(event, team))
                 return redirect('participation_list')
 
         else:
@@ -464,6 +587,7 @@ def participation_edit(request, event_id, team_id):
     team = get_object_or_404(Team, id=team_id)
 
     queryset = Participation.objects.filter(event=event, team=team)
+    status = 200
 
     # -------------------------
     # SINGLE EVENT
@@ -482,10 +606,26 @@ def participation_edit(request, event_id, team_id):
                 participation = form.save(commit=False)
                 participation.event = event
                 participation.team = team
-                participation.save()
 
-                messages.success(request, "Participation updated successfully")
-                return redirect('participation_list')
+                version = form.cleaned_data.get('version')
+                if participation.pk and version is not None:
+                    participation.version = version
+
+                try:
+                    save_single_participation(participation)
+                except ConflictError as exc:
+                    messages.error(request, str(exc))
+                    status = 409
+                except ValidationError as exc:
+                    for error in exc.messages:
+                        messages.error(request, error)
+                else:
+                    messages.success(request, "Participation updated successfully")
+                    _warn_clashes(request, clashes_for_people(
+                        [(team.pk, participation.participant_key)],
+                        event=event,
+                    ))
+                    return redirect('participation_list')
         else:
             form = ParticipationForm(
                 instance=participation,
@@ -500,7 +640,8 @@ def participation_edit(request, event_id, team_id):
                 'form': form,
                 'event': event,
                 'team': team
-            }
+            },
+            status=status
         )
 
     # -------------------------
@@ -509,6 +650,7 @@ def participation_edit(request, event_id, team_id):
     ParticipationFormSet = modelformset_factory(
         Participation,
         form=ParticipationForm,
+        formset=ParticipationBaseFormSet,
         extra=0,
         can_delete=True
     )
@@ -524,21 +666,41 @@ def participation_edit(request, event_id, team_id):
         )
 
         if formset.is_valid():
-            participations = formset.save(commit=False)
-
-            for obj in formset.deleted_objects:
-                obj.delete()
-
-            for p in participations:
-                p.event = event
-                p.team = team
-                p.save()
-
-            messages.success(
-                request,
-                "Group participation updated successfully"
-            )
-            return redirect('participation_list')
+            # commit=False only sorts forms into new/changed/deleted
+            formset.save(commit=False)
+
+            try:
+                save_group_participation(
+                    event,
+                    team,
+                    inserts=[
+                        obj.participant_name
+                        for obj in formset.new_objects
+                    ],
+                    renames={
+                        obj.pk: obj.participant_name
+                        for obj, _ in formset.changed_objects
+                    },
+                    deletes=[obj.pk for obj in formset.deleted_objects],
+                    versions={
+                        form.instance.pk: form.cleaned_data.get('version')
+                        for form in formset.initial_forms
+                        if hasattr(form, 'cleaned_data')
+                    },
+                )
+            except ConflictError as exc:
+                messages.error(request, str(exc))
+                status = 409
+            except ValidationError as exc:
+                for error in exc.messages:
+                    messages.error(request, error)
+            else:
+                messages.success(
+                    request,
+                    "Group participation updated successfully"
+                )
+                _warn_clashes(request, clashes_for_roster(event, team))
+                return redirect('participation_list')
 
     else:
         formset = ParticipationFormSet(
@@ -556,7 +718,8 @@ def participation_edit(request, event_id, team_id):
             'formset': formset,
             'event': event,
             'team': team
-        }
+        },
+        status=status
     )
 
 
@@ -572,7 +735,10 @@ def participation_delete(request, event_id, team_id):
         raise Http404("No participation found")
 
     if request.method == 'POST':
-        participations.delete()
+        with transaction.atomic():
+            release(participations)
+            participations.delete()
+            bump_on_commit()
         messages.success(
             request,
             "Team participation deleted successfully"
@@ -590,47 +756,315 @@ def participation_delete(request, event_id, team_id):
     )
 
 
+@login_required
+def participation_import(request):
+    report = None
+
+    if request.method == 'POST':
+        form = ParticipationImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                report = import_file(
+                    upload.file,
+                    upload.name,
+                    dry_run=form.cleaned_data['dry_run'],
+                    partial=form.cleaned_data['partial'],
+                )
+            except ValueError as exc:
+                form.add_error('file', str(exc))
+            else:
+                if report.dry_run:
+                    messages.info(request, "Dry run complete, nothing was saved")
+                elif report.participations_created or report.teams_created:
+                    messages.success(
+                        request,
+                        f"Imported {report.participations_created} participants "
+                        f"and {report.teams_created} new teams"
+                    )
+                elif report.errors:
+                    messages.error(request, "Import aborted, fix the errors below")
+    else:
+        form = ParticipationImportForm()
+
+    return render(
+        request,
+        'participation_import.html',
+        {
+            'form': form,
+            'report': report,
+        }
+    )
+
+
 
 
 
 
 @login_required
 def result_list(request):
-    results = Result.objects.select_related(
-        'event', 'team'
-    ).order_by('event__name', 'position')
+    results = Result.objects.values(
+        'id', 'position', 'is_published', 'event__name', 'team__team_name'
+    )
 
-    return render(request, 'result_list.html', {'results': results})
+    page = keyset_page(
+        results,
+        ['event__name', 'position', 'id'],
+        cursor=request.GET.get('after'),
+        size=page_size(request),
+    )
+
+    return render(request, 'result_list.html', {
+        'results': page,
+        **_page_links(page),
+    })
+
+
+def _event_teams(event):
+    return list(
+        Participation.objects
+        .filter(event=event)
+        .values('team_id', 'team__team_name', 'team__department')
+        .distinct()
+        .order_by('team__team_name', 'team_id')
+    )
+
+
+@login_required
+def result_bulk(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    teams = _event_teams(event)
+    status = 200
+
+    if request.method == 'POST':
+        rows = [
+            {
+                'team': t['team_id'],
+                'position': request.POST.get(f"position-{t['team_id']}"),
+                'points': request.POST.get(f"points-{t['team_id']}") or 0,
+                'version': request.POST.get(f"version-{t['team_id']}"),
+                'label': t['team__team_name'],
+            }
+            for t in teams
+            if request.POST.get(f"position-{t['team_id']}", '').strip()
+        ]
+        publish = request.POST.get('action') == 'publish'
+        try:
+            save_event_results(event, rows, replace=True, publish=publish)
+        except (ValidationError, ConflictError) as exc:
+            if isinstance(exc, ConflictError):
+                messages.error(request, str(exc))
+                status = 409
+            else:
+                for error in exc.messages:
+                    messages.error(request, error)
+            entered = {
+                t['team_id']: (
+                    request.POST.get(f"position-{t['team_id']}", ''),
+                    request.POST.get(f"points-{t['team_id']}", ''),
+                    request.POST.get(f"version-{t['team_id']}", ''),
+                )
+                for t in teams
+            }
+        else:
+            if publish:
+                messages.success(request, f"Results published for {event.name}")
+            else:
+                messages.success(request, f"Draft results saved for {event.name}")
+            return redirect('result_list')
+        published = Result.objects.published().filter(event=event).count()
+    else:
+        entered = {}
+        published = 0
+        for team_id, position, points, version, is_published in (
+            Result.objects.filter(event=event)
+            .values_list('team_id', 'position', 'points', 'version', 'is_published')
+        ):
+            entered[team_id] = (position, points, version)
+            published += is_published
+
+    for t in teams:
+        t['position'], t['points'], t['version'] = entered.get(
+            t['team_id'], ('', '', '')
+        )
+
+    return render(request, 'result_bulk_form.html', {
+        'event': event,
+        'teams': teams,
+        'published': published,
+    }, status=status)
+
+
+@login_required
+@require_POST
+def result_publish(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    publish = request.POST.get('action') != 'withdraw'
+
+    changed = publish_event_results(event, publish=publish)
+    if publish:
+        messages.success(request, f"Published {changed} results for {event.name}")
+    else:
+        messages.success(request, f"Withdrew {changed} results of {event.name} to drafts")
+    return redirect('result_bulk', event_id=event.id)
+
+
+@login_required
+@require_POST
+def result_bulk_api(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+
+    try:
+        payload = json.loads(request.body or b'{}')
+        rows = payload['results']
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {'errors': ['Body must be JSON: {"results": [{"team", "position", "points"}], "replace": bool, "publish": bool}']},
+            status=400
+        )
+
+    try:
+        summary = save_event_results(
+            event,
+            rows,
+            replace=bool(payload.get('replace')),
+            publish=bool(payload.get('publish')),
+        )
+    except ValidationError as exc:
+        return JsonResponse({'errors': exc.messages}, status=400)
+    except ConflictError as exc:
+        return JsonResponse({'errors': [str(exc)]}, status=409)
+
+    return JsonResponse(dict(summary, event=event.id))
+
+
+@login_required
+def score_sheet(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    teams = _event_teams(event)
+    judges = list(
+        JudgeScore.objects.filter(event=event)
+        .order_by('judge')
+        .values_list('judge', flat=True)
+        .distinct()
+    )
+    # Existing judges plus one empty column for adding a judge
+    columns = judges + ['']
+
+    if request.method == 'POST':
+        marks = {}
+        for i, judge in enumerate(columns):
+            if not judge:
+                judge = request.POST.get(f'judge-{i}', '').strip()
+                if not judge:
+                    continue
+            for t in teams:
+                field = f"mark-{t['team_id']}-{i}"
+                if field not in request.POST:
+                    continue
+                value = request.POST[field].strip()
+                # An emptied cell clears that judge's mark
+                if value or i < len(judges):
+                    marks[(t['team_id'], judge)] = value or None
+
+        try:
+            save_score_sheet(event, marks)
+        except ValidationError as exc:
+            for error in exc.messages:
+                messages.error(request, error)
+            entered = {
+                (t['team_id'], i): request.POST.get(f"mark-{t['team_id']}-{i}", '')
+                for t in teams
+                for i in range(len(columns))
+            }
+        else:
+            if request.POST.get('action') == 'compute':
+                try:
+                    summary = compute_results([event])
+                except ConflictError as exc:
+                    messages.error(request, f"Marks saved, but results were not computed. {exc}")
+                    return redirect('score_sheet', event_id=event.id)
+                messages.success(
+                    request,
+                    f"Computed {summary['results']} placed teams for {event.name}; "
+                    "review and publish them here"
+                )
+                return redirect('result_bulk', event_id=event.id)
+            messages.success(request, f"Marks saved for {event.name}")
+            return redirect('score_sheet', event_id=event.id)
+    else:
+        index = {judge: i for i, judge in enumerate(judges)}
+        entered = {
+            (team_id, index[judge]): score
+            for team_id, judge, score in
+            JudgeScore.objects.filter(event=event)
+            .values_list('team_id', 'judge', 'score')
+        }
+
+    for t in teams:
+        t['cells'] = [
+            (i, entered.get((t['team_id'], i), ''))
+            for i in range(len(columns))
+        ]
+
+    return render(request, 'score_sheet.html', {
+        'event': event,
+        'teams': teams,
+        'columns': list(enumerate(columns)),
+    })
 
 
 @login_required
 def result_add(request):
+    status = 200
+
     if request.method == 'POST':
         form = ResultForm(request.POST)
         if form.is_valid():
-            form.save()
-            messages.success(request, "Result added successfully")
-            return redirect('result_list')
+            try:
+                create_or_conflict(form.save(commit=False))
+            except ConflictError as exc:
+                messages.error(request, str(exc))
+                status = 409
+            else:
+                messages.success(request, "Result added successfully")
+                return redirect('result_list')
     else:
         form = ResultForm()
 
-    return render(request, 'result_form.html', {'form': form})
+    return render(request, 'result_form.html', {'form': form}, status=status)
 
 
 @login_required
 def result_edit(request, result_id):
     result = get_object_or_404(Result, id=result_id)
+    status = 200
 
     if request.method == 'POST':
         form = ResultForm(request.POST, instance=result)
         if form.is_valid():
-            form.save()
-            messages.success(request, "Result updated successfully")
-            return redirect('result_list')
+            result = form.save(commit=False)
+            version = form.cleaned_data.get('version')
+            if version is not None:
+                result.version = version
+            try:
+                save_versioned(
+                    result,
+                    ['event', 'team', 'position', 'points'],
+                    bump=result.is_published,
+                )
+            except ConflictError as exc:
+                messages.error(request, str(exc))
+                status = 409
+            else:
+                messages.success(request, "Result updated successfully")
+                return redirect('result_list')
     else:
         form = ResultForm(instance=result)
 
-    return render(request, 'result_form.html', {'form': form})
+    return render(request, 'result_form.html', {'form': form}, status=status)
 
 
 @login_required
@@ -650,52 +1084,34 @@ def result_delete(request, result_id):
 
 
 
-def public_index(request):
-    points = (
-        Team.objects
-        .annotate(
-            total_points=Coalesce(
-                Sum('results__points'),
-                0
-            )
-        )
-        .values(
-            'id',
-            'team_name',
-            'department',
-            'total_points'
-        )
-        .order_by('-total_points', 'team_name')
-    )
-
+# Public pages are async views over the in-memory read model: under
+# ASGI a slow client holds a coroutine, not a worker thread. Their
+# templates must not touch the database (no ``user``/``perms``).
+async def public_index(request):
+    race = (await afest()).race
     return render(request, 'index.html', {
-        'points': points
+        'points': race.rows,
+        'race': race,
     })
 
 
 
-def public_event_list(request):
-    events = Event.objects.all().order_by('stage_type', 'name')
-    return render(request, 'pevent_list.html', {'events': events})
+async def public_event_list(request):
+    return render(request, 'pevent_list.html', {'events': (await afest()).event_list})
 
 
-def public_event_result(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
-    results = Result.objects.filter(
-        event=event
-    ).select_related('team').order_by('position')
-
-    participants = Participation.objects.filter(
-        event=event
-    ).select_related('team')
+async def public_event_result(request, event_id):
+    event = (await afest()).events.get(event_id)
+    if event is None:
+        raise Http404("No event found")
 
     return render(
         request,
         'pevent_result.html',
         {
             'event': event,
-            'results': results,
-            'participants': participants,
+            'results': event.results,
+            'participants': event.participants,
         }
     )
 
@@ -716,78 +1132,57 @@ def ordinal(n):
     return f"{n}{suffix}"
 
 
-def public_team_detail(request, team_id):
-    team = get_object_or_404(Team, id=team_id)
-
-    # ================= TOTAL POINTS =================
-    total_points = (
-        Result.objects
-        .filter(team=team)
-        .aggregate(tp=Coalesce(Sum('points'), 0))
-        ['tp']
-    )
-
-    # ================= RANK CALCULATION =================
-    teams = (
-        Team.objects
-        .annotate(
-            total_points=Coalesce(Sum('results__points'), 0)
-        )
-        .order_by('-total_points', 'team_name')
-    )
-
-    team_rank = 1
-    for idx, t in enumerate(teams, start=1):
-        if t.id == team.id:
-            team_rank = idx
-            break
-
-    # ================= MEDAL COUNTS =================
-    medal_count = Result.objects.filter(team=team).aggregate(
-        gold=Coalesce(Count('id', filter=Q(position=1)), 0),
-        silver=Coalesce(Count('id', filter=Q(position=2)), 0),
-        bronze=Coalesce(Count('id', filter=Q(position=3)), 0),
-    )
-
-    # ================= EVENT DATA =================
-    event_data = []
-    results = Result.objects.filter(team=team).select_related('event')
-
-    for r in results:
-        participants = list(
-            team.participations
-            .filter(event=r.event)
-            .values_list('participant_name', flat=True)
-        )
+async def public_team_detail(request, team_id):
+    team = (await afest()).teams.get(team_id)
+    if team is None:
+        raise Http404("No team found")
 
-        event_data.append({
-            'event': r.event,
-            'participants': participants,
-            'result': r
-        })
+    # Totals, rank, medals and placings come precomputed with the team.
+    team_rank = team.rank or 1
 
     return render(request, 'public_team_detail.html', {
         'team': team,
-        'total_points': total_points,
+        'total_points': team.tally['points'],
         'rank': team_rank,
         'overall_place': ordinal(team_rank),
-        'medal_count': medal_count,
-        'event_data': event_data
+        'medal_count': team.tally,
+        'event_data': team.placings,
     })
 
 
 
 
-def points_table(request):
-    points = (
-        Result.objects
-        .values('team__team_name', 'team__department')
-        .annotate(total_points=Sum('points'))
-        .order_by('-total_points')
-    )
+async def points_table(request):
+    cube = (await afest()).cube
+    level = 'department' if request.GET.get('level') == 'department' else 'team'
+    stage = request.GET.get('stage') or None
+    event_type = request.GET.get('type') or None
+
+    if stage not in cube.stage_types:
+        stage = None
+    if event_type not in cube.event_types:
+        event_type = None
 
     return render(request, 'points_table.html', {
-        'points': points
+        'points': cube.table(level, stage, event_type),
+        'level': level,
+        'stage': stage or '',
+        'event_type': event_type or '',
+        'stage_choices': [
+            (value, label) for value, label in Event.STAGE_TYPE_CHOICES
+            if value in cube.stage_types
+        ],
+        'event_types': sorted(cube.event_types),
+    })
+
+
+def individual_table(request):
+    rows = individual_standings()
+    size = page_size(request, default=100, maximum=1000)
+
+    return render(request, 'individual_table.html', {
+        'points': rows[:size],
+        'total': len(rows),
     })
 
 
@@ -1132,6 +1527,33 @@ def ordinal(n):
     return f"{n}{ {1:'st', 2:'nd', 3:'rd'}.get(n % 10, 'th') }"
 
 
+def _fit_name_font(p, name, max_width, start=40, minimum=28):
+    name_font = start
+
+    while name_font >= minimum:
+        p.setFont("AlexBrush", name_font)
+        if p.stringWidth(name, "AlexBrush", name_font) <= max_width:
+            break
+        name_font -= 1
+
+    return name_font
+
+
+def _fit_body_font(p, body_lines, max_width, start=15, minimum=12):
+    body_font = start
+
+    while body_font >= minimum:
+        p.setFont("Montserrat-SemiBold", body_font)
+        if all(
+            p.stringWidth(line, "Montserrat-SemiBold", body_font) <= max_width
+            for line in body_lines
+        ):
+            break
+        body_font -= 0.5
+
+    return body_font
+
+
 def _draw_certificate(
     p, width, height, *,
     name, team, event, position, points, is_winner=True
@@ -1195,13 +1617,7 @@ def _draw_certificate(
 
     # ================= NAME (AUTO SIZE) =================
     max_width = width - 220
-    name_font = 40
-
-    while name_font >= 28:
-        p.setFont("AlexBrush", name_font)
-        if p.stringWidth(name, "AlexBrush", name_font) <= max_width:
-            break
-        name_font -= 1
+    _fit_name_font(p, name, max_width)
 
     p.drawCentredString(CENTER_X, Y_NAME, name)
 
@@ -1217,17 +1633,7 @@ def _draw_certificate(
         "Dr. Janaki Ammal Campus, Kannur University, Palayad",
     ]
 
-    body_font = 15
-    body_min = 12
-
-    while body_font >= body_min:
-        p.setFont("Montserrat-SemiBold", body_font)
-        if all(
-            p.stringWidth(line, "Montserrat-SemiBold", body_font) <= max_width
-            for line in body_lines
-        ):
-            break
-        body_font -= 0.5
+    body_font = _fit_body_font(p, body_lines, max_width)
 
     p.setFont("Montserrat-SemiBold", body_font)
 
@@ -1558,3 +1964,19 @@ def fest_full_report(request):
     p.showPage()
     p.save()
     return response
+
+
+@login_required
+def export_data(request, dataset, fmt):
+    """Stream one dataset as CSV, JSON lines or XLSX while it is read."""
+    try:
+        chunks, content_type = export(dataset, fmt)
+    except KeyError:
+        raise Http404("Unknown export")
+
+    if isinstance(request, ASGIRequest):
+        chunks = astream(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="{dataset}-{stamp}.{fmt}"'
+    return response
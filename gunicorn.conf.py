@@ -0,0 +1,25 @@
+# ===============================
+# GUNICORN (read automatically when `gunicorn` starts in this directory)
+# ===============================
+# Start command:  gunicorn
+#
+# Workers are classic sync WSGI workers: fastest for normal traffic, and
+# admin pages and exports run and stream as written. Behind a proxy that
+# does not buffer slow clients, set
+# GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker to serve the async
+# public pages from an event loop instead (see `manage.py bench_asgi`).
+import os
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+if worker_class == 'sync':
+    wsgi_app = 'CampusFest.wsgi:application'
+else:
+    wsgi_app = 'CampusFest.asgi:application'
+
+# gunicorn binds to $PORT (set by Render) when it is defined.
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5